@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""Compare query plans and timings of the hot paths before and after the indexes
+
+Builds a throwaway SQLite database, loads a generated dataset of roughly
+1M rows (entries, pairs and classifications), then runs the matching,
+evaluation and statistics queries on the schema without the composite
+indexes (migration 0006) and again after adding them (migration 0007).
+A second dataset spread over evaluation sessions then times the
+session-scoped queries without and with the session indexes of
+migration 0013.
+
+    python benchmark_indexes.py [--pairs 100000] [--repeat 5]
+"""
+import argparse
+import functools
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'polymer_evaluation.settings')
+
+from django.conf import settings
+
+# Never touch the real database
+DATABASE_DIR = tempfile.mkdtemp(prefix='polymer_benchmark_')
+settings.DATABASES['default']['NAME'] = os.path.join(DATABASE_DIR, 'benchmark.sqlite3')
+
+import django
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+from evaluation_app.comparison import PROPERTIES
+
+BEFORE_MIGRATION = '0006_dataversion'
+AFTER_MIGRATION = '0007_hot_path_indexes'
+# Adds the session columns together with their indexes
+SESSION_MIGRATION = '0013_evaluation_session_scope'
+SESSION_INDEXES = {
+    'DataEntry': 'entry_session_order_idx',
+    'MatchedPair': 'pair_session_idx',
+    'Classification': 'classification_session_idx',
+}
+SESSION_COUNT = 5
+FORCE_FIELDS = ['OPLS-AA', 'GAFF', 'CHARMM', 'COMPASS', 'PCFF']
+LABELS = ['TP', 'FP', 'TN', 'FN']
+
+@functools.lru_cache(maxsize=None)
+def historical_apps(migration):
+    return MigrationLoader(connection).project_state(('evaluation_app', migration)).apps
+
+def historical_model(name, migration=BEFORE_MIGRATION):
+    """The model as of ``migration``, matching the tables being filled
+
+    The live models and views follow the latest schema, which the
+    benchmark database does not have.
+    """
+    return historical_apps(migration).get_model('evaluation_app', name)
+
+def insert_rows(model_name, rows, migration=BEFORE_MIGRATION):
+    """Insert dicts of column values with one executemany per table"""
+    model = historical_model(model_name, migration)
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    defaults = {field.column: field.get_default() for field in fields}
+    columns = [field.column for field in fields]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        model._meta.db_table, ', '.join(columns), ', '.join(['%s'] * len(columns))
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [[row.get(column, defaults[column]) for column in columns] for row in rows])
+
+def generate_dataset(pair_count, migration=BEFORE_MIGRATION, session_ids=(None,), seed=42):
+    """Load pair_count pairs plus as many unmatched entries of each type
+
+    Rows are dealt round-robin over ``session_ids``; pairs join the entries
+    of the same position, so every pair stays within one session.
+    """
+    DataEntry = historical_model('DataEntry', migration)
+    MatchedPair = historical_model('MatchedPair', migration)
+    rng = random.Random(seed)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    entries = []
+    for entry_type in ('ground_truth', 'predicted'):
+        for i in range(pair_count * 2):
+            entries.append({
+                'entry_type': entry_type,
+                'session_id': session_ids[i % len(session_ids)],
+                'polymer_system': f'Polymer {rng.randrange(pair_count):07d}',
+                'force_field': rng.choice(FORCE_FIELDS),
+                'marked_no_match': rng.random() < 0.05,
+                'created_at': now,
+            })
+
+    with transaction.atomic():
+        insert_rows('DataEntry', entries, migration)
+        entries = DataEntry.objects.order_by('id')
+        gt_ids = list(entries.filter(entry_type='ground_truth').values_list('id', flat=True))
+        pred_ids = list(entries.filter(entry_type='predicted').values_list('id', flat=True))
+        insert_rows('MatchedPair', [
+            {'ground_truth_id': gt_id, 'predicted_id': pred_id, 'session_id': session_ids[i % len(session_ids)],
+             'created_at': now}
+            for i, (gt_id, pred_id) in enumerate(zip(gt_ids[:pair_count], pred_ids[:pair_count]))
+        ], migration)
+        pair_ids = MatchedPair.objects.order_by('id').values_list('id', flat=True).iterator()
+        insert_rows('Classification', [
+            {'matched_pair_id': pair_id, 'session_id': session_ids[i % len(session_ids)], 'property_name': prop,
+             'classification': rng.choice(LABELS), 'created_at': now}
+            for i, pair_id in enumerate(pair_ids)
+            for prop in PROPERTIES
+        ], migration)
+
+def row_count(migration):
+    return sum(
+        historical_model(name, migration).objects.count() for name in ('DataEntry', 'MatchedPair', 'Classification')
+    )
+
+def hot_queries():
+    """The querysets behind the matching, evaluation and statistics pages"""
+    DataEntry = historical_model('DataEntry')
+    MatchedPair = historical_model('MatchedPair')
+    Classification = historical_model('Classification')
+    return [
+        ('matching: unmatched ground truth in display order',
+         DataEntry.objects.filter(entry_type='ground_truth', marked_no_match=False).exclude(
+             id__in=MatchedPair.objects.values('ground_truth_id')
+         ).order_by('polymer_system', 'force_field').values_list('id', flat=True)),
+        ('matching: pairs newest first',
+         MatchedPair.objects.order_by('-created_at').values_list('id', flat=True)),
+        ('statistics: counts by property and label',
+         Classification.objects.order_by().values('property_name', 'classification').annotate(n=Count('id'))),
+        ('evaluation: first page of FN pairs for one property',
+         MatchedPair.objects.filter(Exists(Classification.objects.filter(
+             matched_pair=OuterRef('pk'), property_name=PROPERTIES[2], classification='FN'
+         ))).order_by('-id').values_list('id', flat=True)[:26]),
+        ('evaluation: pairs still missing a classification',
+         MatchedPair.objects.exclude(
+             classifications__property_name=PROPERTIES[2]
+         ).order_by('-id').values_list('id', flat=True)[:26]),
+    ]
+
+def session_queries(session_id):
+    """The same pages scoped to one evaluation session"""
+    DataEntry = historical_model('DataEntry', SESSION_MIGRATION)
+    MatchedPair = historical_model('MatchedPair', SESSION_MIGRATION)
+    Classification = historical_model('Classification', SESSION_MIGRATION)
+    pairs = MatchedPair.objects.filter(session_id=session_id)
+    return [
+        ('matching: unmatched ground truth of a session in display order',
+         DataEntry.objects.filter(session_id=session_id, entry_type='ground_truth', marked_no_match=False).exclude(
+             id__in=pairs.values('ground_truth_id')
+         ).order_by('polymer_system', 'force_field').values_list('id', flat=True)),
+        ('evaluation: first page of a session\'s pairs',
+         pairs.order_by('-id').values_list('id', flat=True)[:26]),
+        ('statistics: counts of a session by property and label',
+         Classification.objects.filter(session_id=session_id).order_by().values(
+             'property_name', 'classification'
+         ).annotate(n=Count('id'))),
+    ]
+
+def set_session_indexes(create):
+    """Create or drop the session indexes of SESSION_MIGRATION"""
+    with connection.schema_editor() as editor:
+        for model_name, index_name in SESSION_INDEXES.items():
+            model = historical_model(model_name, SESSION_MIGRATION)
+            index = next(index for index in model._meta.indexes if index.name == index_name)
+            if create:
+                editor.add_index(model, index)
+            else:
+                editor.remove_index(model, index)
+
+def clear_tables():
+    """Empty the generated tables so later data migrations have nothing to convert"""
+    with connection.cursor() as cursor:
+        for model_name in ('Classification', 'MatchedPair', 'DataEntry'):
+            cursor.execute(f'DELETE FROM {historical_model(model_name)._meta.db_table}')
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+def best_time(queryset, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        list(queryset.all())
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def measure(label, repeat, queries):
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    print(f"\n=== {label} ===")
+    results = {}
+    for name, queryset in queries:
+        results[name] = best_time(queryset, repeat)
+        print(f"\n{name}: {results[name] * 1000:.1f} ms")
+        for step in query_plan(queryset):
+            print(f"    {step}")
+    return results
+
+def summarize(before, after):
+    print("\n=== Summary ===")
+    for name in before:
+        print(f"{name}: {before[name] * 1000:.1f} ms -> {after[name] * 1000:.1f} ms "
+              f"({before[name] / after[name]:.1f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pairs', type=int, default=100000, help='matched pairs to generate (default 100000)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per query; the best is reported')
+    args = parser.parse_args()
+
+    print(f"Temporary database: {settings.DATABASES['default']['NAME']}")
+    call_command('migrate', 'evaluation_app', BEFORE_MIGRATION, verbosity=0)
+
+    started = time.perf_counter()
+    generate_dataset(args.pairs)
+    print(f"Generated {row_count(BEFORE_MIGRATION):,} rows in {time.perf_counter() - started:.1f}s")
+
+    before = measure('Before: no composite indexes', args.repeat, hot_queries())
+    call_command('migrate', 'evaluation_app', AFTER_MIGRATION, verbosity=0)
+    after = measure('After: composite indexes', args.repeat, hot_queries())
+    summarize(before, after)
+
+    clear_tables()
+    call_command('migrate', 'evaluation_app', SESSION_MIGRATION, verbosity=0)
+    started = time.perf_counter()
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    insert_rows('EvaluationSession', [
+        {'name': f'Session {i}', 'created_at': now} for i in range(SESSION_COUNT)
+    ], SESSION_MIGRATION)
+    session_ids = list(historical_model('EvaluationSession', SESSION_MIGRATION).objects.values_list('id', flat=True))
+    generate_dataset(args.pairs, SESSION_MIGRATION, session_ids)
+    print(f"\nGenerated {row_count(SESSION_MIGRATION):,} rows in {SESSION_COUNT} sessions "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    set_session_indexes(create=False)
+    before = measure('Before: no session indexes', args.repeat, session_queries(session_ids[0]))
+    set_session_indexes(create=True)
+    after = measure('After: session indexes', args.repeat, session_queries(session_ids[0]))
+    summarize(before, after)
+
+    connection.close()
+    shutil.rmtree(DATABASE_DIR, ignore_errors=True)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -30,35 +30,23 @@ def simulate_upload():
     with transaction.atomic():
         # Load ground truth data
         for item in gt_data:
-            DataEntry.objects.update_or_create(
+            entry, _ = DataEntry.objects.update_or_create(
                 entry_type='ground_truth',
                 polymer_system=item['polymer_system'],
-                force_field=item['force_field'],
-                defaults={
-                    'density': item.get('Density (g/cm³)', 'NA'),
-                    'glass_transition_temp': item.get('Glass Transition Temperature (K)', 'NA'),
-                    'radius_of_gyration': item.get('Radius of Gyration (nm)', 'NA'),
-                    'youngs_modulus': item.get('Young\'s Modulus (GPa)', 'NA'),
-                    'diffusion_coefficient': item.get('Diffusion Coefficient (m²/s)', 'NA'),
-                    'viscosity': item.get('Viscosity (Pa s)', 'NA'),
-                }
+                force_field=item['force_field']
             )
+            entry.set_property_values(item)
+            entry.save()
         
         # Load predicted data
         for item in pred_data:
-            DataEntry.objects.update_or_create(
+            entry, _ = DataEntry.objects.update_or_create(
                 entry_type='predicted',
                 polymer_system=item['polymer_system'],
-                force_field=item['force_field'],
-                defaults={
-                    'density': item.get('Density (g/cm³)', 'NA'),
-                    'glass_transition_temp': item.get('Glass Transition Temperature (K)', 'NA'),
-                    'radius_of_gyration': item.get('Radius of Gyration (nm)', 'NA'),
-                    'youngs_modulus': item.get('Young\'s Modulus (GPa)', 'NA'),
-                    'diffusion_coefficient': item.get('Diffusion Coefficient (m²/s)', 'NA'),
-                    'viscosity': item.get('Viscosity (Pa s)', 'NA'),
-                }
+                force_field=item['force_field']
             )
+            entry.set_property_values(item)
+            entry.save()
     
     print("Upload simulation completed!")
 
@@ -0,0 +1,98 @@
+from collections import defaultdict
+from .candidates import CandidateIndex, normalize
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+except ImportError:  # scipy is optional; without it pairs are assigned greedily
+    csr_matrix = min_weight_full_bipartite_matching = None
+
+# Candidates scored per ground truth entry; only these edges enter the assignment
+AUTO_MATCH_CANDIDATES = 10
+
+# Name similarity below which two entries are never paired automatically
+MIN_MATCH_SCORE = 0.35
+
+def optimal_assignment_available():
+    """Whether the global assignment solver can be used"""
+    return min_weight_full_bipartite_matching is not None
+
+def block_entries(entries):
+    """Group entries by normalized force field"""
+    blocks = defaultdict(list)
+    for entry in entries:
+        blocks[normalize(entry.force_field)].append(entry)
+    return blocks
+
+def candidate_edges(ground_truth_entries, predicted_entries, k=AUTO_MATCH_CANDIDATES, min_score=MIN_MATCH_SCORE):
+    """Score the top-k predicted candidates of each ground truth entry
+
+    Returns sparse ``(gt_index, pred_index, score)`` edges into the two lists.
+    """
+    # Entries are blocked by force field already, so score the names only
+    index = CandidateIndex(predicted_entries, force_field_weight=0)
+    positions = {entry.id: i for i, entry in enumerate(predicted_entries)}
+    edges = []
+    for gt_index, entry in enumerate(ground_truth_entries):
+        for score, candidate in index.query(entry, k):
+            if score >= min_score:
+                edges.append((gt_index, positions[candidate.id], score))
+    return edges
+
+def greedy_assignment(edges):
+    """Take edges best-first while both ends are free"""
+    used_gt, used_pred = set(), set()
+    assignment = []
+    for gt_index, pred_index, score in sorted(edges, key=lambda edge: -edge[2]):
+        if gt_index in used_gt or pred_index in used_pred:
+            continue
+        used_gt.add(gt_index)
+        used_pred.add(pred_index)
+        assignment.append((gt_index, pred_index, score))
+    return assignment
+
+def optimal_assignment(edges, gt_count, pred_count):
+    """Maximum-total-score one-to-one assignment over a sparse score matrix
+
+    Every ground truth row gets a private "unassigned" column so a full row
+    matching always exists; real edges cost ``2 - score`` and the dummy
+    columns cost 2, so minimizing cost maximizes the summed score.
+    """
+    if not edges:
+        return []
+    rows = [gt_index for gt_index, _, _ in edges] + list(range(gt_count))
+    cols = [pred_index for _, pred_index, _ in edges] + [pred_count + i for i in range(gt_count)]
+    costs = [2.0 - score for _, _, score in edges] + [2.0] * gt_count
+    matrix = csr_matrix((costs, (rows, cols)), shape=(gt_count, pred_count + gt_count))
+
+    scores = {(gt_index, pred_index): score for gt_index, pred_index, score in edges}
+    matched_rows, matched_cols = min_weight_full_bipartite_matching(matrix)
+    return [
+        (gt_index, pred_index, scores[gt_index, pred_index])
+        for gt_index, pred_index in zip(matched_rows.tolist(), matched_cols.tolist())
+        if pred_index < pred_count
+    ]
+
+def assign_entries(ground_truth_entries, predicted_entries):
+    """Pair entries one-to-one within each force field block
+
+    Returns ``(gt_entry, pred_entry, score)`` tuples. Only the top candidates
+    from the name index are scored, so no dense GT x predicted matrix is
+    ever built.
+    """
+    predicted_blocks = block_entries(predicted_entries)
+    matches = []
+    for key, gt_block in block_entries(ground_truth_entries).items():
+        pred_block = predicted_blocks.get(key)
+        if not pred_block:
+            continue
+        edges = candidate_edges(gt_block, pred_block)
+        if optimal_assignment_available():
+            assignment = optimal_assignment(edges, len(gt_block), len(pred_block))
+        else:
+            assignment = greedy_assignment(edges)
+        matches.extend(
+            (gt_block[gt_index], pred_block[pred_index], score)
+            for gt_index, pred_index, score in assignment
+        )
+    return matches
@@ -0,0 +1,134 @@
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+DEFAULT_TOP_K = 5
+MAX_TOP_K = 50
+
+# Character n-gram length used for fuzzy matching of polymer names
+NGRAM_SIZE = 3
+
+# Force field agreement counts for more than any single name feature
+FORCE_FIELD_WEIGHT = 2.0
+
+# Posting lists longer than this share of the index (and MIN_POSTING_LIMIT)
+# only score candidates, they are not walked to find them
+MAX_DOCUMENT_FREQUENCY = 0.2
+MIN_POSTING_LIMIT = 100
+
+# Entries scored per query; enough to hold the top-k for any sensible k
+MAX_CANDIDATES = 200
+
+NON_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+def normalize(text):
+    """Lowercase, strip accents and replace punctuation with spaces"""
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return NON_ALPHANUMERIC.sub(' ', text.lower()).strip()
+
+def char_ngrams(token, size=NGRAM_SIZE):
+    """Character n-grams of a token padded with spaces at both ends"""
+    padded = f' {token} '
+    return [padded[i:i + size] for i in range(max(len(padded) - size + 1, 1))]
+
+def entry_features(entry):
+    """Count the index features of an entry
+
+    Polymer names contribute whole words and character n-grams, so
+    "Kapton" shares features with "Kapton (PMDA-ODA)". Force field words
+    are kept in their own namespace.
+    """
+    features = Counter()
+    for token in normalize(entry.polymer_system).split():
+        features['w:' + token] += 1
+        for gram in char_ngrams(token):
+            features['g:' + gram] += 1
+    for token in normalize(entry.force_field).split():
+        features['ff:' + token] += 1
+    return features
+
+class CandidateIndex:
+    """Inverted TF-IDF index over the names and force fields of a set of entries
+
+    Queries only visit the posting lists of the features they share with the
+    query entry, so finding the top-k candidates does not compare against
+    every indexed entry. A ``force_field_weight`` of 0 scores names only,
+    e.g. when the entries are already blocked by force field.
+    """
+
+    def __init__(self, entries, force_field_weight=FORCE_FIELD_WEIGHT):
+        self.force_field_weight = force_field_weight
+        self.entries = {}
+        features = {}
+        document_frequency = Counter()
+        for entry in entries:
+            self.entries[entry.id] = entry
+            features[entry.id] = entry_features(entry)
+            document_frequency.update(features[entry.id].keys())
+
+        size = len(self.entries)
+        self.idf = {
+            feature: math.log((size + 1) / (df + 1)) + 1
+            for feature, df in document_frequency.items()
+        }
+        self.posting_limit = max(int(size * MAX_DOCUMENT_FREQUENCY), MIN_POSTING_LIMIT)
+
+        self.vectors = {}
+        self.postings = defaultdict(list)
+        for entry_id, counts in features.items():
+            vector = self.vectorize(counts)
+            self.vectors[entry_id] = vector
+            for feature, weight in vector.items():
+                self.postings[feature].append((entry_id, weight))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def vectorize(self, counts):
+        """Turn feature counts into a unit-length TF-IDF vector"""
+        vector = {}
+        for feature, count in counts.items():
+            idf = self.idf.get(feature)
+            if idf is None:
+                continue
+            weight = (1 + math.log(count)) * idf
+            if feature.startswith('ff:'):
+                weight *= self.force_field_weight
+            if weight:
+                vector[feature] = weight
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {feature: weight / norm for feature, weight in vector.items()} if norm else {}
+
+    def query(self, entry, k=DEFAULT_TOP_K):
+        """Return up to ``k`` (score, entry) tuples, best match first"""
+        vector = self.vectorize(entry_features(entry))
+        if not vector:
+            return []
+
+        # Accumulate scores term at a time, rarest feature first. A posting
+        # list is walked only while the candidates it adds fit in the pool;
+        # other features just add to the candidates already found.
+        scores = defaultdict(float)
+        for feature in sorted(vector, key=lambda feature: len(self.postings[feature])):
+            weight = vector[feature]
+            postings = self.postings[feature]
+            if scores and (len(postings) > self.posting_limit or len(scores) + len(postings) > MAX_CANDIDATES):
+                for entry_id in scores:
+                    scores[entry_id] += weight * self.vectors[entry_id].get(feature, 0.0)
+            else:
+                for entry_id, entry_weight in postings:
+                    scores[entry_id] += weight * entry_weight
+
+        scored = ((score, entry_id) for entry_id, score in scores.items())
+        return [
+            (score, self.entries[entry_id])
+            for score, entry_id in heapq.nlargest(k, scored)
+            if score > 0
+        ]
+
+    def suggest(self, entries, k=DEFAULT_TOP_K):
+        """Map each entry id to its top-k candidates"""
+        return {entry.id: self.query(entry, k) for entry in entries}
@@ -0,0 +1,235 @@
+import hashlib
+import numpy as np
+from .parsing import INVALID, NA, RANGE, UNCERTAIN, parse_column, parse_quantity
+from .properties import TEXT, property_dimension, property_names
+from .rules import DEFAULT_RULE, compile_rule, get_rule, to_scale
+
+# Properties classified for every matched pair, in display order
+PROPERTIES = property_names()
+
+# String properties that are only classified automatically on an exact match
+TEXT_PROPERTIES = property_names(TEXT)
+
+def is_numeric(value, dimension=None):
+    """Check if a value is numeric"""
+    return parse_quantity(value, dimension).kind not in (NA, INVALID)
+
+def parse_range(value, dimension=None):
+    """Parse a range value like '600-700' or '650 ± 50' and return (min, max)"""
+    quantity = parse_quantity(value, dimension)
+    if quantity.kind in (RANGE, UNCERTAIN):
+        return (quantity.lo, quantity.hi)
+    return None
+
+def calculate_range_overlap(range1, range2):
+    """Calculate overlap percentage between two ranges"""
+    if not range1 or not range2:
+        return 0
+    
+    min1, max1 = range1
+    min2, max2 = range2
+    
+    overlap_start = max(min1, min2)
+    overlap_end = min(max1, max2)
+    
+    if overlap_start >= overlap_end:
+        return 0
+    
+    overlap_length = overlap_end - overlap_start
+    range1_length = max1 - min1
+    range2_length = max2 - min2
+    
+    # Calculate overlap percentage based on the smaller range
+    smaller_range = min(range1_length, range2_length)
+    if smaller_range == 0:
+        return 0
+    
+    return (overlap_length / smaller_range) * 100
+
+def within_tolerance(gt_value, pred_value, rule=DEFAULT_RULE, dimension=None):
+    """Check if values are within the rule's tolerance or range overlap
+
+    Unit suffixes are read as units of ``dimension``.
+    """
+    if gt_value == pred_value:
+        return True
+    
+    # Handle NA cases
+    if gt_value == 'NA' or pred_value == 'NA':
+        return False
+    
+    # Check if both are numeric
+    if is_numeric(gt_value, dimension) and is_numeric(pred_value, dimension):
+        # Handle ranges
+        gt_range = parse_range(gt_value, dimension)
+        pred_range = parse_range(pred_value, dimension)
+        if gt_range:
+            gt_range = tuple(to_scale(bound, rule) for bound in gt_range)
+        if pred_range:
+            pred_range = tuple(to_scale(bound, rule) for bound in pred_range)
+        
+        if gt_range and pred_range:
+            # Both are ranges - check the overlap threshold
+            overlap = calculate_range_overlap(gt_range, pred_range)
+            return overlap >= rule.min_overlap
+        
+        elif gt_range:
+            # GT is range, pred is single value
+            pred_float = to_scale(parse_quantity(pred_value, dimension).lo, rule)
+            return gt_range[0] <= pred_float <= gt_range[1]
+        
+        elif pred_range:
+            # Pred is range, GT is single value
+            gt_float = to_scale(parse_quantity(gt_value, dimension).lo, rule)
+            return pred_range[0] <= gt_float <= pred_range[1]
+        
+        else:
+            # Both are single numeric values - the larger of the absolute
+            # and relative tolerance; relative to |GT| so negatives work
+            gt_float = to_scale(parse_quantity(gt_value, dimension).lo, rule)
+            pred_float = to_scale(parse_quantity(pred_value, dimension).lo, rule)
+            diff = abs(gt_float - pred_float)
+            tolerance = max(rule.absolute_tolerance, abs(gt_float) * rule.relative_tolerance / 100)
+            return diff <= tolerance
+    
+    return False
+
+def perform_automatic_comparison(pair, property_name):
+    """Perform automatic comparison and return classification"""
+    gt_value = pair.ground_truth.get_property_value(property_name)
+    pred_value = pair.predicted.get_property_value(property_name)
+    
+    # Handle NA cases - these are always clear
+    gt_is_na = gt_value == 'NA' or gt_value is None
+    pred_is_na = pred_value == 'NA' or pred_value is None
+    
+    if gt_is_na and pred_is_na:
+        return 'TN'  # True Negative
+    if gt_is_na and not pred_is_na:
+        return 'FP'  # False Positive
+    if not gt_is_na and pred_is_na:
+        return 'FN'  # False Negative
+    
+    # For string-based properties (polymer_system, force_field), only classify exact matches
+    if property_name in TEXT_PROPERTIES:
+        if gt_value == pred_value:
+            return 'TP'  # True Positive - exact match
+        else:
+            return None  # Ambiguous - needs human judgment
+    
+    # For numeric properties, check the property's tolerance rule
+    if within_tolerance(gt_value, pred_value, get_rule(property_name), property_dimension(property_name)):
+        return 'TP'  # True Positive
+    else:
+        return 'FN'  # False Negative
+
+def input_hash(gt_value, pred_value):
+    """Fingerprint of the two raw values a classification was made from"""
+    return hashlib.blake2b(f'{gt_value!r}\x1f{pred_value!r}'.encode(), digest_size=8).hexdigest()
+
+def input_hashes(pairs, property_name):
+    """input_hash of one property for each pair"""
+    return [
+        input_hash(pair.ground_truth.get_property_value(property_name), pair.predicted.get_property_value(property_name))
+        for pair in pairs
+    ]
+
+# Classification codes produced by the batch engine; NO_CLASSIFICATION marks
+# cells that need human judgment
+NO_CLASSIFICATION, TP, FP, TN, FN = range(5)
+CODE_LABELS = [None, 'TP', 'FP', 'TN', 'FN']
+
+def parse_value(value, dimension=None):
+    """Parse a raw property value into (lower, upper, is_na, is_range)
+
+    Uses the same parser as is_numeric and parse_range so the batch engine
+    classifies exactly like perform_automatic_comparison. Values that are not
+    numeric get NaN bounds.
+    """
+    lo, hi, kind = parse_quantity(value, dimension)
+    return (lo, hi, kind == NA, kind in (RANGE, UNCERTAIN))
+
+class ParsedColumn:
+    """A property column held as parallel NumPy arrays
+
+    ``lower``/``upper`` are NaN where a value is not numeric. A NaN bound
+    never satisfies a tolerance or overlap check, so NaN literals such as
+    "nan" behave exactly like unparseable strings.
+    """
+
+    def __init__(self, raw, lower, upper, na, is_range):
+        self.raw = np.empty(len(raw), dtype=object)
+        self.raw[:] = raw
+        self.lower = np.asarray(lower, dtype=float)
+        self.upper = np.asarray(upper, dtype=float)
+        self.na = np.asarray(na, dtype=bool)
+        self.is_range = np.asarray(is_range, dtype=bool)
+        self.numeric = ~self.na & ~np.isnan(self.lower)
+
+    def __len__(self):
+        return len(self.raw)
+
+    @classmethod
+    def from_values(cls, values, dimension=None):
+        """Parse raw strings, parsing each distinct value only once"""
+        values = list(values)
+        lower, upper, kind = parse_column(values, dimension)
+        return cls(values, lower, upper, kind == NA, (kind == RANGE) | (kind == UNCERTAIN))
+
+    @classmethod
+    def from_entries(cls, entries, property_name):
+        """Build a column from the values DataEntry parsed at ingest time"""
+        rows = [entry.get_parsed_value(property_name) for entry in entries]
+        if not rows:
+            return cls([], [], [], [], [])
+        raw, lower, upper, na, is_range = zip(*rows)
+        return cls(raw, np.array(lower, dtype=float), np.array(upper, dtype=float), na, is_range)
+
+def compare_columns(property_name, gt_values, pred_values, rule=None):
+    """Classify a whole property column at once
+
+    Returns an array of classification codes, one per (ground truth, predicted)
+    value pair, identical to calling perform_automatic_comparison on each pair.
+    ``rule`` overrides the property's registered comparison rule.
+    """
+    dimension = property_dimension(property_name)
+    gt = gt_values if isinstance(gt_values, ParsedColumn) else ParsedColumn.from_values(gt_values, dimension)
+    pred = pred_values if isinstance(pred_values, ParsedColumn) else ParsedColumn.from_values(pred_values, dimension)
+
+    exact = gt.raw == pred.raw
+    if property_name in TEXT_PROPERTIES:
+        matched = np.where(exact, TP, NO_CLASSIFICATION)
+    else:
+        match = compile_rule(rule or get_rule(property_name))
+        within = exact | match(gt, pred)
+        matched = np.where(within, TP, FN)
+
+    return np.select(
+        [gt.na & pred.na, gt.na, pred.na],
+        [TN, FP, FN],
+        matched
+    ).astype(np.int8)
+
+def classify_pairs(pairs, properties=PROPERTIES, rules=None):
+    """Classify every property of every pair in one batch
+
+    Returns a dict mapping each property to an array of classification codes
+    aligned with ``pairs``. Values are read from the bounds parsed at ingest,
+    so no strings are parsed here. Pairs should be loaded with
+    ``select_related('ground_truth', 'predicted')``. ``rules`` maps property
+    names to ComparisonRules that replace the registered ones, e.g. to see
+    how a changed rule would score the whole dataset.
+    """
+    rules = rules or {}
+    pairs = list(pairs)
+    gt_entries = [pair.ground_truth for pair in pairs]
+    pred_entries = [pair.predicted for pair in pairs]
+    codes = {}
+    for prop in properties:
+        codes[prop] = compare_columns(
+            prop,
+            ParsedColumn.from_entries(gt_entries, prop),
+            ParsedColumn.from_entries(pred_entries, prop),
+            rules.get(prop)
+        )
+    return codes
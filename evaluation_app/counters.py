@@ -0,0 +1,137 @@
+from collections import Counter
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from .metrics import CLASSIFICATION_LABELS
+from .models import Classification, ClassificationCounter
+from .versions import bump_data_version
+
+def session_id(session):
+    """Id of an EvaluationSession, or None for the default session"""
+    return getattr(session, 'pk', session)
+
+def count_classifications(classifications):
+    """Count a queryset of classifications by (session_id, property_name, classification)"""
+    rows = classifications.order_by().values('session_id', 'property_name', 'classification').annotate(n=Count('id'))
+    return Counter({
+        (row['session_id'], row['property_name'], row['classification']): row['n'] for row in rows
+    })
+
+def count_objects(classifications):
+    """Count in-memory Classification objects by (session_id, property_name, classification)"""
+    return Counter((c.session_id, c.property_name, c.classification) for c in classifications)
+
+def apply_deltas(deltas):
+    """Add signed count changes to the counter table
+
+    ``deltas`` maps (session_id, property_name, classification) to the change
+    in count. Call inside the transaction that changes the classifications so
+    the counters commit or roll back together with them. A counter created
+    concurrently by another request is updated instead.
+    """
+    for (session, property_name, classification), delta in deltas.items():
+        if not delta:
+            continue
+        counters = ClassificationCounter.objects.filter(
+            session_id=session,
+            property_name=property_name,
+            classification=classification
+        )
+        if counters.update(count=F('count') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                ClassificationCounter.objects.create(
+                    session_id=session,
+                    property_name=property_name,
+                    classification=classification,
+                    count=delta
+                )
+        except IntegrityError:
+            counters.update(count=F('count') + delta)
+
+def record_created(classifications):
+    """Count newly created classifications in their sessions"""
+    apply_deltas(count_objects(classifications))
+
+def record_deleted(classifications):
+    """Uncount a queryset of classifications that is about to be deleted"""
+    deltas = count_classifications(classifications)
+    apply_deltas({key: -n for key, n in deltas.items()})
+
+def record_changed(property_name, old, new, session=None):
+    """Move one classification from ``old`` to ``new`` (either may be None)"""
+    session = session_id(session)
+    deltas = Counter()
+    if old:
+        deltas[(session, property_name, old)] -= 1
+    if new:
+        deltas[(session, property_name, new)] += 1
+    apply_deltas(deltas)
+
+def reset_counters(session=None):
+    """Remove a session's counters, e.g. when all its classifications are deleted"""
+    ClassificationCounter.objects.filter(session_id=session_id(session)).delete()
+
+def counter_matrices(session=None):
+    """Read overall and per-property counts from the counter table
+
+    Returns ``(overall, per_property)`` in the same shape as
+    metrics.confusion_matrices, touching only O(properties) rows.
+    """
+    rows = ClassificationCounter.objects.filter(session_id=session_id(session)).values(
+        'property_name', 'classification'
+    ).annotate(n=Sum('count')).order_by('property_name')
+
+    overall = dict.fromkeys(CLASSIFICATION_LABELS, 0)
+    per_property = {}
+    for row in rows:
+        if not row['n']:
+            continue
+        counts = per_property.setdefault(row['property_name'], dict.fromkeys(CLASSIFICATION_LABELS, 0))
+        counts[row['classification']] += row['n']
+        overall[row['classification']] += row['n']
+
+    return overall, per_property
+
+def expected_counts():
+    """Recount the raw classification rows of every session"""
+    return count_classifications(Classification.objects.all())
+
+def stored_counts():
+    """Read the counter table as a Counter keyed like expected_counts"""
+    rows = ClassificationCounter.objects.values(
+        'session_id', 'property_name', 'classification'
+    ).annotate(n=Sum('count'))
+    return Counter({
+        (row['session_id'], row['property_name'], row['classification']): row['n'] for row in rows
+    })
+
+def find_mismatches():
+    """Return (session_id, property_name, classification, expected, stored) for every drifted counter"""
+    expected = expected_counts()
+    stored = stored_counts()
+    mismatches = []
+    for key in sorted(set(expected) | set(stored), key=lambda key: (key[0] or 0, key[1:])):
+        if expected[key] != stored[key]:
+            mismatches.append((*key, expected[key], stored[key]))
+    return mismatches
+
+@transaction.atomic
+def rebuild_counters():
+    """Replace the counters of every session with a fresh count of the raw rows
+
+    Bumps the data version so pages cached from the old counts are dropped.
+    """
+    ClassificationCounter.objects.all().delete()
+    counters = [
+        ClassificationCounter(
+            session_id=session,
+            property_name=property_name,
+            classification=classification,
+            count=n
+        )
+        for (session, property_name, classification), n in expected_counts().items()
+    ]
+    ClassificationCounter.objects.bulk_create(counters)
+    bump_data_version()
+    return len(counters)
@@ -0,0 +1,236 @@
+import csv
+import json
+from .comparison import PROPERTIES
+from .models import MatchedPair
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only the columnar exports need it
+    pa = pq = None
+
+# Pairs fetched from the database per round trip while exporting
+EXPORT_CHUNK_SIZE = 2000
+
+# Pairs serialized per chunk of the streamed response
+RECORDS_PER_WRITE = 200
+
+EXPORT_FORMATS = {
+    'json': ('application/json', 'evaluation_results.json'),
+    'jsonl': ('application/x-ndjson', 'evaluation_results.jsonl'),
+    'csv': ('text/csv', 'evaluation_results.csv'),
+    'parquet': ('application/vnd.apache.parquet', 'evaluation_results.parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'evaluation_results.arrows'),
+}
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+# Pairs per Parquet row group / Arrow record batch (one row per pair and property)
+PAIRS_PER_ROW_GROUP = 8192
+
+def iter_pairs(chunk_size=EXPORT_CHUNK_SIZE, session=None):
+    """Walk the matched pairs of a session with their entries and classifications prefetched per chunk"""
+    return MatchedPair.objects.filter(session=session).select_related(
+        'ground_truth', 'predicted__run'
+    ).prefetch_related(
+        'classifications', 'ground_truth__property_values', 'predicted__property_values'
+    ).order_by('id').iterator(chunk_size=chunk_size)
+
+def entry_record(entry):
+    """Serialize one side of a pair"""
+    return {
+        'polymer_system': entry.polymer_system,
+        'force_field': entry.force_field,
+        'properties': {prop: entry.get_property_value(prop) for prop in PROPERTIES},
+    }
+
+def run_name(pair):
+    """Name of the prediction run a pair belongs to, None for predictions without a run"""
+    return pair.predicted.run.name if pair.predicted.run_id else None
+
+def pair_record(pair):
+    """Serialize a matched pair with its run and classifications"""
+    return {
+        'pair_id': pair.id,
+        'run': run_name(pair),
+        'ground_truth': entry_record(pair.ground_truth),
+        'prediction': entry_record(pair.predicted),
+        'classifications': {
+            classification.property_name: classification.classification
+            for classification in pair.classifications.all()
+        },
+    }
+
+def _batched(records, size=RECORDS_PER_WRITE):
+    """Group serialized records so each yielded chunk carries many pairs"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def stream_json(summary, pairs):
+    """Yield the export document as JSON text, one batch of pairs at a time"""
+    yield '{\n  "summary": ' + json.dumps(summary, indent=2, default=str).replace('\n', '\n  ')
+    yield ',\n  "detailed_results": ['
+
+    separator = '\n    '
+    for batch in _batched(pair_record(pair) for pair in pairs):
+        chunk = ',\n    '.join(
+            json.dumps(record, indent=2, default=str).replace('\n', '\n    ')
+            for record in batch
+        )
+        yield separator + chunk
+        separator = ',\n    '
+
+    yield '\n  ]\n}\n'
+
+def stream_json_lines(pairs):
+    """Yield one JSON object per line for every pair"""
+    for batch in _batched(pair_record(pair) for pair in pairs):
+        yield ''.join(json.dumps(record, default=str) + '\n' for record in batch)
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer streaming"""
+
+    def write(self, value):
+        return value
+
+def csv_header():
+    header = ['pair_id', 'run', 'gt_polymer_system', 'gt_force_field', 'pred_polymer_system', 'pred_force_field']
+    for prop in PROPERTIES:
+        header += [f'{prop} [ground_truth]', f'{prop} [predicted]', f'{prop} [classification]']
+    return header
+
+def csv_row(pair):
+    classifications = {
+        classification.property_name: classification.classification
+        for classification in pair.classifications.all()
+    }
+    row = [
+        pair.id,
+        run_name(pair) or '',
+        pair.ground_truth.polymer_system,
+        pair.ground_truth.force_field,
+        pair.predicted.polymer_system,
+        pair.predicted.force_field,
+    ]
+    for prop in PROPERTIES:
+        row += [
+            pair.ground_truth.get_property_value(prop),
+            pair.predicted.get_property_value(prop),
+            classifications.get(prop, ''),
+        ]
+    return row
+
+def stream_csv(pairs):
+    """Yield a CSV table with one row per pair"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(csv_header())
+    for batch in _batched(pairs):
+        yield ''.join(writer.writerow(csv_row(pair)) for pair in batch)
+
+def columnar_export_available():
+    """Whether the Parquet and Arrow exports can be produced"""
+    return pa is not None
+
+def columnar_schema():
+    """Arrow schema for the long (pair, property) export"""
+    side = []
+    for prefix in ('gt', 'pred'):
+        side += [
+            pa.field(f'{prefix}_value', pa.string()),
+            pa.field(f'{prefix}_lower', pa.float64()),
+            pa.field(f'{prefix}_upper', pa.float64()),
+            pa.field(f'{prefix}_is_na', pa.bool_()),
+            pa.field(f'{prefix}_is_range', pa.bool_()),
+        ]
+    return pa.schema([
+        pa.field('pair_id', pa.int64()),
+        pa.field('run', pa.string()),
+        pa.field('gt_polymer_system', pa.string()),
+        pa.field('gt_force_field', pa.string()),
+        pa.field('pred_polymer_system', pa.string()),
+        pa.field('pred_force_field', pa.string()),
+        pa.field('property', pa.string()),
+        *side,
+        pa.field('classification', pa.string()),
+    ])
+
+def columnar_batch(pairs, schema):
+    """Build one record batch with a row per (pair, property)"""
+    columns = {name: [] for name in schema.names}
+    for pair in pairs:
+        classifications = {
+            classification.property_name: classification.classification
+            for classification in pair.classifications.all()
+        }
+        run = run_name(pair)
+        for prop in PROPERTIES:
+            columns['pair_id'].append(pair.id)
+            columns['run'].append(run)
+            columns['gt_polymer_system'].append(pair.ground_truth.polymer_system)
+            columns['gt_force_field'].append(pair.ground_truth.force_field)
+            columns['pred_polymer_system'].append(pair.predicted.polymer_system)
+            columns['pred_force_field'].append(pair.predicted.force_field)
+            columns['property'].append(prop)
+            for prefix, entry in (('gt', pair.ground_truth), ('pred', pair.predicted)):
+                raw, lower, upper, is_na, is_range = entry.get_parsed_value(prop)
+                columns[f'{prefix}_value'].append(raw)
+                columns[f'{prefix}_lower'].append(lower)
+                columns[f'{prefix}_upper'].append(upper)
+                columns[f'{prefix}_is_na'].append(is_na)
+                columns[f'{prefix}_is_range'].append(is_range)
+            columns['classification'].append(classifications.get(prop))
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+class _ByteSink:
+    """Write-only file object that buffers bytes until the response drains them"""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def stream_columnar(pairs, export_format):
+    """Yield a Parquet file or Arrow IPC stream, one row group per batch of pairs
+
+    Each row group is written and handed to the response before the next
+    chunk of pairs is read, so memory is bounded by PAIRS_PER_ROW_GROUP.
+    """
+    schema = columnar_schema()
+    sink = _ByteSink()
+    if export_format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    for batch in _batched(pairs, PAIRS_PER_ROW_GROUP):
+        writer.write_batch(columnar_batch(batch, schema))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
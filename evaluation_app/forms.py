@@ -1,73 +1,70 @@
 from django import forms
 from .models import DataEntry, MatchedPair, Classification, EvaluationSession
-import json
+from .ingestion import RecordStream, RecordFormatError, SUPPORTED_EXTENSIONS
+from .runs import DEFAULT_RUN_NAME
 
 class JSONFileUploadForm(forms.Form):
     """Form for uploading JSON files"""
     ground_truth_file = forms.FileField(
         label='Ground Truth JSON File',
-        help_text='Upload the ground truth data file (JSON format)',
-        required=True
+        help_text='Upload the ground truth data file (JSON array or JSON Lines). Records already stored are skipped; optional once ground truth is loaded.',
+        required=False
     )
     predicted_file = forms.FileField(
         label='Predicted JSON File',
-        help_text='Upload the predicted data file (JSON format)',
+        help_text='Upload the predicted data file (JSON array or JSON Lines)',
         required=True
     )
+    run_name = forms.CharField(
+        label='Prediction Run',
+        help_text='Name of the model version these predictions come from; reuse a name to add to that run',
+        max_length=200,
+        initial=DEFAULT_RUN_NAME,
+        widget=forms.TextInput(attrs={'class': 'form-control'})
+    )
     replace_existing = forms.BooleanField(
-        label='Replace all existing data',
-        help_text='If checked, will delete all existing data, pairs, and classifications. If unchecked, will update existing entries.',
+        label='Replace this run\'s predictions',
+        help_text='If checked, will delete the predictions of this run with their pairs and classifications. Other runs and the ground truth are kept.',
         required=False,
         initial=False
     )
     
+    def __init__(self, *args, session=None, **kwargs):
+        # Evaluation session the files are loaded into
+        self.session = session
+        super().__init__(*args, **kwargs)
+    
     def clean_ground_truth_file(self):
-        file = self.cleaned_data['ground_truth_file']
-        if not file.name.endswith('.json'):
-            raise forms.ValidationError('File must be a JSON file')
-        
-        try:
-            content = file.read().decode('utf-8')
-            data = json.loads(content)
-            if not isinstance(data, list):
-                raise forms.ValidationError('JSON must contain a list of objects')
-            
-            # Validate structure
-            for item in data:
-                if not isinstance(item, dict):
-                    raise forms.ValidationError('Each item must be an object')
-                if 'polymer_system' not in item or 'force_field' not in item:
-                    raise forms.ValidationError('Each item must have polymer_system and force_field')
-            
-            return data
-        except json.JSONDecodeError:
-            raise forms.ValidationError('Invalid JSON format')
-        except UnicodeDecodeError:
-            raise forms.ValidationError('File must be UTF-8 encoded')
+        if not self.cleaned_data.get('ground_truth_file'):
+            if not DataEntry.objects.filter(session=self.session, entry_type='ground_truth').exists():
+                raise forms.ValidationError('Upload a ground truth file first')
+            return None
+        return self._clean_records_file('ground_truth_file')
+    
+    def clean_run_name(self):
+        return self.cleaned_data['run_name'].strip() or DEFAULT_RUN_NAME
     
     def clean_predicted_file(self):
-        file = self.cleaned_data['predicted_file']
-        if not file.name.endswith('.json'):
-            raise forms.ValidationError('File must be a JSON file')
+        return self._clean_records_file('predicted_file')
+    
+    def _clean_records_file(self, field_name):
+        """Return a lazily parsed record stream for an uploaded file
         
+        Only the first record is parsed here so obvious format problems are
+        reported on the form; the remaining records are validated one at a
+        time while they are being ingested.
+        """
+        file = self.cleaned_data[field_name]
+        if not file.name.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise forms.ValidationError('File must be a JSON or JSON Lines file')
+        
+        records = RecordStream(file)
         try:
-            content = file.read().decode('utf-8')
-            data = json.loads(content)
-            if not isinstance(data, list):
-                raise forms.ValidationError('JSON must contain a list of objects')
-            
-            # Validate structure
-            for item in data:
-                if not isinstance(item, dict):
-                    raise forms.ValidationError('Each item must be an object')
-                if 'polymer_system' not in item or 'force_field' not in item:
-                    raise forms.ValidationError('Each item must have polymer_system and force_field')
-            
-            return data
-        except json.JSONDecodeError:
-            raise forms.ValidationError('Invalid JSON format')
-        except UnicodeDecodeError:
-            raise forms.ValidationError('File must be UTF-8 encoded')
+            next(iter(records), None)
+        except RecordFormatError as e:
+            raise forms.ValidationError(str(e))
+        
+        return records
 
 class EvaluationSessionForm(forms.ModelForm):
     """Form for creating evaluation sessions"""
@@ -0,0 +1,232 @@
+import codecs
+import json
+import re
+from itertools import chain, islice
+from django.conf import settings
+from .models import DataEntry, PropertyValue
+from .properties import NUMERIC, property_names
+
+DEFAULT_BATCH_SIZE = 2000
+
+# Size of the text chunks decoded from an upload at a time
+READ_CHUNK_SIZE = 64 * 1024
+
+# Largest single record we will buffer before giving up on the file
+MAX_RECORD_SIZE = 16 * 1024 * 1024
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Characters that may continue a JSON number
+NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+SUPPORTED_EXTENSIONS = ('.json',) + JSON_LINES_EXTENSIONS
+
+def get_batch_size():
+    """Return the configured bulk_create batch size"""
+    return getattr(settings, 'EVALUATION_INGEST_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+def build_entries(entry_type, items, run=None, session=None):
+    """Yield unsaved DataEntry objects, with parsed property values, for JSON records"""
+    # Resolve the registered properties once for the whole file
+    names = property_names(NUMERIC)
+
+    for item in items:
+        entry = DataEntry(
+            entry_type=entry_type,
+            session=session,
+            run=run,
+            polymer_system=item['polymer_system'],
+            force_field=item['force_field']
+        )
+        entry.set_property_values({name: item.get(name, 'NA') for name in names})
+        yield entry
+
+def bulk_load_entries(entry_type, items, batch_size=None, run=None, session=None):
+    """Insert JSON records as DataEntry and PropertyValue rows in bulk_create batches
+
+    Entries are added to evaluation ``session`` and predicted entries to ``run``. Returns the number of entries
+    written. Must be called inside a transaction so a failing batch does not
+    leave a partially loaded file behind.
+    """
+    batch_size = batch_size or get_batch_size()
+    entries = build_entries(entry_type, items, run, session)
+    total = 0
+
+    while True:
+        batch = list(islice(entries, batch_size))
+        if not batch:
+            break
+        # bulk_create sets the primary keys the value rows point at
+        DataEntry.objects.bulk_create(batch, batch_size=batch_size)
+        PropertyValue.objects.bulk_create(
+            [value for entry in batch for value in entry.get_property_values().values()],
+            batch_size=batch_size
+        )
+        total += len(batch)
+
+    return total
+
+class RecordFormatError(ValueError):
+    """Raised when an uploaded file or one of its records is malformed"""
+    pass
+
+def iter_text_chunks(file, chunk_size=READ_CHUNK_SIZE):
+    """Decode an uploaded file as UTF-8 text one chunk at a time"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for chunk in file.chunks(chunk_size):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+    except UnicodeDecodeError:
+        raise RecordFormatError('File must be UTF-8 encoded')
+
+def iter_json_array(chunks):
+    """Incrementally parse a top-level JSON array, yielding one element at a time
+
+    Only the current chunk and the element being decoded are held in memory,
+    so memory use does not grow with the size of the file.
+    """
+    decode = json.JSONDecoder().raw_decode
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    exhausted = False
+    started = False
+    expect_value = True
+    first = True
+
+    while True:
+        # Skip whitespace, pulling in more text when the buffer runs out
+        pos = WHITESPACE.match(buffer, pos).end()
+        if pos == len(buffer):
+            if exhausted:
+                raise RecordFormatError('Invalid JSON format')
+            buffer, pos = '', 0
+            try:
+                buffer = next(chunks)
+            except StopIteration:
+                exhausted = True
+            continue
+
+        char = buffer[pos]
+        if not started:
+            if char != '[':
+                raise RecordFormatError('JSON must contain a list of objects')
+            started = True
+            pos += 1
+            continue
+
+        if char == ']' and (first or not expect_value):
+            pos += 1
+            break
+
+        if not expect_value:
+            if char != ',':
+                raise RecordFormatError('Invalid JSON format')
+            expect_value = True
+            pos += 1
+            continue
+
+        try:
+            item, end = decode(buffer, pos)
+        except json.JSONDecodeError:
+            end = None
+        # The element may continue in the next chunk; a number cut off by the
+        # chunk boundary decodes as its shorter prefix
+        incomplete = end is None or (
+            isinstance(item, (int, float)) and not isinstance(item, bool)
+            and (end == len(buffer) or buffer[end] in NUMBER_CHARS)
+        )
+        if incomplete and not exhausted:
+            if len(buffer) - pos > MAX_RECORD_SIZE:
+                raise RecordFormatError('Invalid JSON format')
+            buffer, pos = buffer[pos:], 0
+            try:
+                buffer += next(chunks)
+            except StopIteration:
+                exhausted = True
+            continue
+        if end is None:
+            raise RecordFormatError('Invalid JSON format')
+
+        yield item
+        pos = end
+        expect_value = False
+        first = False
+
+    # Only whitespace may follow the closing bracket
+    if any(text.strip() for text in chain([buffer[pos:]], chunks)):
+        raise RecordFormatError('Invalid JSON format')
+
+def iter_json_lines(chunks):
+    """Parse JSON Lines text, yielding one object per non-blank line"""
+    buffer = ''
+    line_number = 0
+
+    for chunk in chunks:
+        buffer += chunk
+        lines = buffer.split('\n')
+        buffer = lines.pop()
+        if len(buffer) > MAX_RECORD_SIZE:
+            raise RecordFormatError(f'Line {line_number + len(lines) + 1} is too long')
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield _decode_line(line, line_number)
+
+    if buffer.strip():
+        yield _decode_line(buffer, line_number + 1)
+
+def _decode_line(line, line_number):
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        raise RecordFormatError(f'Invalid JSON on line {line_number}')
+
+def validate_record(item, position):
+    """Check that a record has the fields needed to create a DataEntry"""
+    if not isinstance(item, dict):
+        raise RecordFormatError(f'Item {position}: each item must be an object')
+    if 'polymer_system' not in item or 'force_field' not in item:
+        raise RecordFormatError(f'Item {position}: each item must have polymer_system and force_field')
+    return item
+
+class RecordStream:
+    """Lazily parsed and validated records from an uploaded JSON or JSON Lines file
+
+    Iterating re-reads the file from the start, so the stream can be peeked
+    during form validation and consumed again by the ingestion path.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.json_lines = file.name.lower().endswith(JSON_LINES_EXTENSIONS)
+
+    def __iter__(self):
+        self.file.seek(0)
+        chunks = iter_text_chunks(self.file)
+
+        if self.json_lines:
+            items = iter_json_lines(chunks)
+        else:
+            # A .json file that starts with an object is treated as JSON Lines
+            first_char, chunks = _sniff_first_char(chunks)
+            items = iter_json_lines(chunks) if first_char == '{' else iter_json_array(chunks)
+
+        for position, item in enumerate(items, start=1):
+            yield validate_record(item, position)
+
+def _sniff_first_char(chunks):
+    """Return the first non-whitespace character and an iterator over all chunks"""
+    seen = []
+    for chunk in chunks:
+        seen.append(chunk)
+        stripped = chunk.lstrip()
+        if stripped:
+            return stripped[0], chain(seen, chunks)
+    return '', iter(seen)
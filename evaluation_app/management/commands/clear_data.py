@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from evaluation_app.models import EvaluationSession
+from evaluation_app.sessions import DEFAULT_SESSION_PARAM
+from evaluation_app.teardown import teardown
+
+class Command(BaseCommand):
+    help = 'Delete evaluation data with set-based deletes in one transaction'
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument(
+            '--all',
+            action='store_true',
+            help='Empty every evaluation table, the sessions included',
+        )
+        scope.add_argument(
+            '--session',
+            help=f'Id of the session to clear, or "{DEFAULT_SESSION_PARAM}" for the default session',
+        )
+
+    def handle(self, *args, **options):
+        session = None
+        session_id = options['session']
+        if session_id and session_id != DEFAULT_SESSION_PARAM:
+            if session_id.isdigit():
+                session = EvaluationSession.objects.filter(pk=session_id).first()
+            if session is None:
+                raise CommandError(f'No evaluation session with id {session_id}')
+
+        summary = teardown(session, everything=options['all'])
+
+        for table, rows in summary['rows'].items():
+            self.stdout.write(f'  {table}: {rows:,}')
+        scope = 'all sessions' if options['all'] else (session or 'the default session')
+        self.stdout.write(self.style.SUCCESS(
+            f"Cleared {scope}: removed {summary['total']:,} rows in {summary['elapsed']:.2f}s"
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from evaluation_app.counters import find_mismatches, rebuild_counters
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized classification counters from the raw Classification rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only compare the counters against the raw rows; exit with an error if they differ',
+        )
+
+    def handle(self, *args, **options):
+        mismatches = find_mismatches()
+
+        for session, property_name, classification, expected, stored in mismatches:
+            self.stdout.write(
+                f'session {session or "default"} {property_name} {classification}: '
+                f'expected {expected}, stored {stored}'
+            )
+
+        if options['verify']:
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} counter(s) out of date')
+            self.stdout.write(self.style.SUCCESS('Counters match the classification rows'))
+            return
+
+        rows = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {rows} counter(s), fixed {len(mismatches)} mismatch(es)'
+        ))
@@ -0,0 +1,66 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from evaluation_app.rescoring import RESCORE_CHUNK_SIZE, parallel_scoring_available, rescore
+
+class Command(BaseCommand):
+    help = 'Recompute automatic classifications made under outdated comparison rules'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=f'Worker processes classifying chunks in parallel (default 1; up to {os.cpu_count() or 1} '
+                 'on this machine). Needs fork; elsewhere chunks are scored in one process',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RESCORE_CHUNK_SIZE,
+            help=f'Pairs per chunk (default {RESCORE_CHUNK_SIZE})',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every property of every pair, not just the outdated cells',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing anything',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--workers and --chunk-size must be positive')
+
+        if options['workers'] > 1 and not parallel_scoring_available():
+            self.stderr.write('Worker processes need fork, which this platform lacks; scoring in one process')
+
+        summary = rescore(
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+            full=options['full']
+        )
+
+        if not summary['properties']:
+            self.stdout.write(self.style.SUCCESS('All automatic classifications are up to date'))
+            return
+        self.stdout.write(f"Properties rescored: {', '.join(summary['properties'])}")
+
+        elapsed = summary['elapsed']
+        rate = summary['pairs'] / elapsed if elapsed else 0
+        self.stdout.write(
+            f"Scored {summary['pairs']:,} pairs ({summary['cells']:,} cells) in {elapsed:.2f}s "
+            f"with {options['workers']} worker(s): {rate:,.0f} pairs/s"
+        )
+        self.stdout.write(f"Kept {summary['human']:,} human classification(s)")
+        self.stdout.write(f"Updated the rule version or input hash of {summary['restamped']:,} unchanged classification(s)")
+
+        changes = summary['changes']
+        for (prop, old, new), count in sorted(changes.items(), key=lambda item: (item[0][0], -item[1])):
+            self.stdout.write(f"  {prop}: {old or '-'} -> {new or '-'}  {count:,}")
+
+        verb = 'Would change' if options['dry_run'] else 'Changed'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {sum(changes.values()):,} classification(s)"))
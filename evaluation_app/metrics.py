@@ -0,0 +1,197 @@
+import numpy as np
+from django.db.models import Count, Q
+from .models import Classification, MatchedPair
+
+CLASSIFICATION_LABELS = ['TP', 'FP', 'TN', 'FN']
+
+# Bootstrap resamples per confidence interval and the interval's coverage;
+# the fixed seed makes repeated runs report the same interval
+BOOTSTRAP_RESAMPLES = 10000
+CONFIDENCE_LEVEL = 0.95
+BOOTSTRAP_SEED = 0
+
+def calculate_metrics(tp, fp, tn, fn):
+    """Calculate precision, recall, F1 score, and accuracy"""
+    total = tp + fp + tn + fn
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0
+    f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+    accuracy = (tp + tn) / total if total > 0 else 0
+
+    return {
+        'precision': precision,
+        'recall': recall,
+        'f1_score': f1_score,
+        'accuracy': accuracy,
+    }
+
+def confusion_matrices(classifications=None):
+    """Get overall and per-property TP/FP/TN/FN counts from one grouped query
+
+    Returns ``(overall, per_property)`` where ``overall`` maps each label to
+    its count and ``per_property`` maps property names to the same kind of
+    dict, ordered by property name.
+    """
+    if classifications is None:
+        classifications = Classification.objects.all()
+
+    rows = classifications.order_by().values('property_name').annotate(
+        tp_count=Count('id', filter=Q(classification='TP')),
+        fp_count=Count('id', filter=Q(classification='FP')),
+        tn_count=Count('id', filter=Q(classification='TN')),
+        fn_count=Count('id', filter=Q(classification='FN')),
+    ).order_by('property_name')
+
+    overall = dict.fromkeys(CLASSIFICATION_LABELS, 0)
+    per_property = {}
+    for row in rows:
+        counts = {label: row[f'{label.lower()}_count'] for label in CLASSIFICATION_LABELS}
+        per_property[row['property_name']] = counts
+        for label in CLASSIFICATION_LABELS:
+            overall[label] += counts[label]
+
+    return overall, per_property
+
+def metrics_table(per_property, key='property_name'):
+    """Build template rows of counts and metrics for each property
+
+    ``key`` names the row field holding the dict key, for tables grouped by
+    something other than the property.
+    """
+    return [
+        {
+            key: name,
+            'counts': counts,
+            'total': sum(counts.values()),
+            'metrics': calculate_metrics(counts['TP'], counts['FP'], counts['TN'], counts['FN']),
+        }
+        for name, counts in per_property.items()
+    ]
+
+def grouped_matrices(group_by, classifications=None):
+    """Get counts per group, overall and per property, from one grouped query
+
+    ``group_by`` is a lookup from Classification, e.g. the force field of the
+    pair's ground truth entry. Returns ``(per_group, per_property)`` where
+    ``per_group`` maps group values to label counts and ``per_property``
+    maps each group value to a dict of per-property counts.
+    """
+    if classifications is None:
+        classifications = Classification.objects.all()
+
+    rows = classifications.order_by().values(
+        group_by, 'property_name', 'classification'
+    ).annotate(n=Count('id')).order_by(group_by)
+
+    per_group = {}
+    per_property = {}
+    for row in rows:
+        group = row[group_by]
+        counts = per_group.setdefault(group, dict.fromkeys(CLASSIFICATION_LABELS, 0))
+        cell = per_property.setdefault(group, {}).setdefault(
+            row['property_name'], dict.fromkeys(CLASSIFICATION_LABELS, 0)
+        )
+        counts[row['classification']] += row['n']
+        cell[row['classification']] += row['n']
+
+    return per_group, per_property
+
+def force_field_matrices(classifications=None):
+    """grouped_matrices by the force field of each pair's ground truth entry"""
+    return grouped_matrices('matched_pair__ground_truth__force_field', classifications)
+
+def run_matrices(classifications=None):
+    """grouped_matrices by the prediction run of each pair's predicted entry"""
+    return grouped_matrices('matched_pair__predicted__run__name', classifications)
+
+def grouped_table(per_group, per_property, properties, key):
+    """Build template rows for each group, with the F1 of each property
+
+    ``key`` names the row field holding the group value. ``property_f1``
+    follows the order of ``properties`` and is None where a group has no
+    classifications of that property.
+    """
+    rows = metrics_table(per_group, key=key)
+    for row in rows:
+        cells = per_property[row[key]]
+        row['property_f1'] = [
+            calculate_metrics(cells[prop]['TP'], cells[prop]['FP'], cells[prop]['TN'], cells[prop]['FN'])['f1_score']
+            if prop in cells else None
+            for prop in properties
+        ]
+    return rows
+
+def pair_label_counts(classifications=None, pair_count=None):
+    """Count TP/FP/TN/FN per matched pair with one grouped query
+
+    Returns an ``(n_pairs, 4)`` array of label counts per pair over all
+    properties; columns follow CLASSIFICATION_LABELS. Pairs without any
+    classification are zero rows; there are ``pair_count`` rows in total
+    (every matched pair by default), as the bootstrap resamples pairs.
+    """
+    if classifications is None:
+        classifications = Classification.objects.all()
+    if pair_count is None:
+        pair_count = MatchedPair.objects.count()
+
+    rows = classifications.order_by().values('matched_pair_id').annotate(**{
+        label: Count('id', filter=Q(classification=label)) for label in CLASSIFICATION_LABELS
+    }).values_list(*CLASSIFICATION_LABELS)
+    counts = np.array(list(rows), dtype=np.int32).reshape(-1, len(CLASSIFICATION_LABELS))
+    missing = max(pair_count - len(counts), 0)
+    return np.concatenate([counts, np.zeros((missing, len(CLASSIFICATION_LABELS)), dtype=np.int32)])
+
+def bootstrap_intervals(pair_counts, resamples=BOOTSTRAP_RESAMPLES, confidence=CONFIDENCE_LEVEL, seed=BOOTSTRAP_SEED):
+    """Percentile bootstrap confidence intervals over matched pairs
+
+    ``pair_counts`` is an ``(n_pairs, 4)`` array from pair_label_counts.
+    Drawing n pairs with replacement only matters through how often each
+    distinct row of counts is drawn, so each resample is one multinomial
+    draw over the distinct rows and all resamples are scored at once.
+    Returns a dict mapping each metric of calculate_metrics to
+    ``(low, high)``, or None when there are no pairs.
+    """
+    pair_counts = np.asarray(pair_counts)
+    if not len(pair_counts):
+        return None
+
+    patterns, frequency = np.unique(pair_counts, axis=0, return_counts=True)
+    return pattern_intervals(patterns, frequency, resamples, confidence, seed)
+
+def pattern_intervals(patterns, frequency, resamples=BOOTSTRAP_RESAMPLES, confidence=CONFIDENCE_LEVEL, seed=BOOTSTRAP_SEED):
+    """bootstrap_intervals of pairs given as distinct rows of counts and how many pairs have each"""
+    patterns, frequency = np.asarray(patterns), np.asarray(frequency)
+    pair_count = frequency.sum()
+    if not pair_count:
+        return None
+
+    rng = np.random.default_rng(seed)
+    draws = rng.multinomial(pair_count, frequency / pair_count, size=resamples)
+    tp, fp, tn, fn = (draws @ patterns).T.astype(float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), 0)
+        f1_score = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0)
+        total = tp + fp + tn + fn
+        accuracy = np.where(total > 0, (tp + tn) / total, 0)
+
+    tail = (1 - confidence) / 2
+    samples = {'precision': precision, 'recall': recall, 'f1_score': f1_score, 'accuracy': accuracy}
+    return {
+        metric: tuple(float(bound) for bound in np.quantile(values, [tail, 1 - tail]))
+        for metric, values in samples.items()
+    }
+
+def property_intervals(counts, pair_count, **options):
+    """bootstrap_intervals of one property from its label totals
+
+    A pair has at most one label per property, so its row of counts is
+    either zero or a single label, and the totals alone fix how often each
+    row occurs.
+    """
+    # One row per label, then the zero row of pairs without a label
+    patterns = np.vstack([np.eye(len(CLASSIFICATION_LABELS), dtype=np.int32), np.zeros(len(CLASSIFICATION_LABELS))])
+    frequency = [counts[label] for label in CLASSIFICATION_LABELS]
+    frequency.append(max(pair_count - sum(frequency), 0))
+    return pattern_intervals(patterns, frequency, **options)
@@ -0,0 +1,181 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:40
+
+import math
+
+from django.db import migrations, models
+
+
+PROPERTY_FIELDS = [
+    'density',
+    'glass_transition_temp',
+    'radius_of_gyration',
+    'youngs_modulus',
+    'diffusion_coefficient',
+    'viscosity',
+]
+
+
+def parse_value(value):
+    """Snapshot of the parsing rules at the time of this migration"""
+    if value is None or value == 'NA':
+        return (None, None, True, False)
+    if isinstance(value, str) and '-' in value and not value.startswith('-'):
+        parts = value.split('-')
+        if len(parts) == 2:
+            try:
+                return (float(parts[0].strip()), float(parts[1].strip()), False, True)
+            except ValueError:
+                pass
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return (None, None, False, False)
+    return (number, number, False, False)
+
+
+def backfill_parsed_values(apps, schema_editor):
+    DataEntry = apps.get_model('evaluation_app', 'DataEntry')
+    updated_fields = []
+    for field in PROPERTY_FIELDS:
+        updated_fields += [f'{field}_lower', f'{field}_upper', f'{field}_is_na', f'{field}_is_range']
+
+    entries = list(DataEntry.objects.all())
+    for entry in entries:
+        for field in PROPERTY_FIELDS:
+            lower, upper, is_na, is_range = parse_value(getattr(entry, field))
+            setattr(entry, f'{field}_lower', None if lower is None or math.isnan(lower) else lower)
+            setattr(entry, f'{field}_upper', None if upper is None or math.isnan(upper) else upper)
+            setattr(entry, f'{field}_is_na', is_na)
+            setattr(entry, f'{field}_is_range', is_range)
+    DataEntry.objects.bulk_update(entries, updated_fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation_app', '0003_remove_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataentry',
+            name='density_is_na',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='density_is_range',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='density_lower',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='density_upper',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='diffusion_coefficient_is_na',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='diffusion_coefficient_is_range',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='diffusion_coefficient_lower',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='diffusion_coefficient_upper',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='glass_transition_temp_is_na',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='glass_transition_temp_is_range',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='glass_transition_temp_lower',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='glass_transition_temp_upper',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='radius_of_gyration_is_na',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='radius_of_gyration_is_range',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='radius_of_gyration_lower',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='radius_of_gyration_upper',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='viscosity_is_na',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='viscosity_is_range',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='viscosity_lower',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='viscosity_upper',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='youngs_modulus_is_na',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='youngs_modulus_is_range',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='youngs_modulus_lower',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='youngs_modulus_upper',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_parsed_values, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_classifications(apps, schema_editor):
+    """Start the counters from the classifications that already exist"""
+    Classification = apps.get_model('evaluation_app', 'Classification')
+    ClassificationCounter = apps.get_model('evaluation_app', 'ClassificationCounter')
+    rows = Classification.objects.order_by().values('property_name', 'classification').annotate(n=Count('id'))
+    ClassificationCounter.objects.bulk_create([
+        ClassificationCounter(property_name=row['property_name'], classification=row['classification'], count=row['n'])
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation_app', '0004_dataentry_parsed_values'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassificationCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('property_name', models.CharField(max_length=100)),
+                ('classification', models.CharField(choices=[('TP', 'True Positive'), ('FP', 'False Positive'), ('TN', 'True Negative'), ('FN', 'False Negative')], max_length=2)),
+                ('count', models.BigIntegerField(default=0)),
+                ('session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='counters', to='evaluation_app.evaluationsession')),
+            ],
+            options={
+                'unique_together': {('session', 'property_name', 'classification')},
+            },
+        ),
+        migrations.RunPython(count_existing_classifications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation_app', '0006_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='classification',
+            index=models.Index(fields=['property_name', 'classification', 'matched_pair'], name='classification_lookup_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dataentry',
+            index=models.Index(fields=['entry_type', 'polymer_system', 'force_field', 'marked_no_match'], name='entry_type_match_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matchedpair',
+            index=models.Index(fields=['-created_at'], name='pair_created_idx'),
+        ),
+    ]
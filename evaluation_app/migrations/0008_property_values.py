@@ -0,0 +1,205 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Wide DataEntry columns and the JSON keys they held when this migration was written
+PROPERTY_FIELDS = [
+    ('Density (g/cm³)', 'density'),
+    ('Glass Transition Temperature (K)', 'glass_transition_temp'),
+    ('Radius of Gyration (nm)', 'radius_of_gyration'),
+    ('Young\'s Modulus (GPa)', 'youngs_modulus'),
+    ('Diffusion Coefficient (m²/s)', 'diffusion_coefficient'),
+    ('Viscosity (Pa s)', 'viscosity'),
+]
+
+
+def copy_property_values(apps, schema_editor):
+    """Move the parsed wide columns into one PropertyValue row per property"""
+    DataEntry = apps.get_model('evaluation_app', 'DataEntry')
+    PropertyValue = apps.get_model('evaluation_app', 'PropertyValue')
+    values = []
+    for entry in DataEntry.objects.order_by('id').iterator(chunk_size=2000):
+        for name, field in PROPERTY_FIELDS:
+            values.append(PropertyValue(
+                entry_id=entry.id,
+                property_name=name,
+                raw=getattr(entry, field),
+                lower=getattr(entry, f'{field}_lower'),
+                upper=getattr(entry, f'{field}_upper'),
+                is_na=getattr(entry, f'{field}_is_na'),
+                is_range=getattr(entry, f'{field}_is_range'),
+            ))
+        if len(values) >= 2000:
+            PropertyValue.objects.bulk_create(values)
+            values = []
+    PropertyValue.objects.bulk_create(values)
+
+
+def copy_back_property_values(apps, schema_editor):
+    """Restore the wide columns from the PropertyValue rows"""
+    DataEntry = apps.get_model('evaluation_app', 'DataEntry')
+    PropertyValue = apps.get_model('evaluation_app', 'PropertyValue')
+    fields = dict(PROPERTY_FIELDS)
+    entries = {entry.id: entry for entry in DataEntry.objects.all()}
+    for value in PropertyValue.objects.filter(property_name__in=fields).iterator(chunk_size=2000):
+        field = fields[value.property_name]
+        entry = entries[value.entry_id]
+        setattr(entry, field, value.raw)
+        setattr(entry, f'{field}_lower', value.lower)
+        setattr(entry, f'{field}_upper', value.upper)
+        setattr(entry, f'{field}_is_na', value.is_na)
+        setattr(entry, f'{field}_is_range', value.is_range)
+    updated_fields = []
+    for _, field in PROPERTY_FIELDS:
+        updated_fields += [field, f'{field}_lower', f'{field}_upper', f'{field}_is_na', f'{field}_is_range']
+    DataEntry.objects.bulk_update(entries.values(), updated_fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation_app', '0007_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('property_name', models.CharField(max_length=100)),
+                ('raw', models.CharField(blank=True, max_length=50, null=True)),
+                ('lower', models.FloatField(blank=True, null=True)),
+                ('upper', models.FloatField(blank=True, null=True)),
+                ('is_na', models.BooleanField(default=True)),
+                ('is_range', models.BooleanField(default=False)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='property_values', to='evaluation_app.dataentry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['property_name', 'entry'], name='property_value_lookup_idx')],
+                'unique_together': {('entry', 'property_name')},
+            },
+        ),
+        migrations.RunPython(copy_property_values, copy_back_property_values),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='density',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='density_is_na',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='density_is_range',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='density_lower',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='density_upper',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='diffusion_coefficient',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='diffusion_coefficient_is_na',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='diffusion_coefficient_is_range',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='diffusion_coefficient_lower',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='diffusion_coefficient_upper',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='glass_transition_temp',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='glass_transition_temp_is_na',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='glass_transition_temp_is_range',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='glass_transition_temp_lower',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='glass_transition_temp_upper',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='radius_of_gyration',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='radius_of_gyration_is_na',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='radius_of_gyration_is_range',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='radius_of_gyration_lower',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='radius_of_gyration_upper',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='viscosity',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='viscosity_is_na',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='viscosity_is_range',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='viscosity_lower',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='viscosity_upper',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='youngs_modulus',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='youngs_modulus_is_na',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='youngs_modulus_is_range',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='youngs_modulus_lower',
+        ),
+        migrations.RemoveField(
+            model_name='dataentry',
+            name='youngs_modulus_upper',
+        ),
+    ]
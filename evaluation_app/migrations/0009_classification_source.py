@@ -0,0 +1,163 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:12
+
+from django.db import migrations, models
+
+
+# Properties the comparison engine classified when this migration was written
+TEXT_PROPERTIES = ['polymer_system', 'force_field']
+PROPERTIES = TEXT_PROPERTIES + [
+    'Density (g/cm³)',
+    'Glass Transition Temperature (K)',
+    'Radius of Gyration (nm)',
+    'Young\'s Modulus (GPa)',
+    'Diffusion Coefficient (m²/s)',
+    'Viscosity (Pa s)',
+]
+
+# Classifications compared per chunk; keeps the entry id lists below SQLite's parameter limit
+CHUNK_SIZE = 400
+
+# Classification ids per UPDATE
+ID_BATCH_SIZE = 900
+
+
+# Snapshot of the comparison rules that wrote the existing labels; later
+# rule changes must not turn those labels into reviewer overrides
+
+def is_numeric(value):
+    if value is None or value == 'NA':
+        return False
+    if parse_range(value):
+        return True
+    try:
+        float(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def parse_range(value):
+    if isinstance(value, str) and '-' in value and not value.startswith('-'):
+        parts = value.split('-')
+        if len(parts) == 2:
+            try:
+                return (float(parts[0].strip()), float(parts[1].strip()))
+            except ValueError:
+                pass
+    return None
+
+
+def range_overlap(range1, range2):
+    overlap = min(range1[1], range2[1]) - max(range1[0], range2[0])
+    smaller = min(range1[1] - range1[0], range2[1] - range2[0])
+    if overlap <= 0 or smaller == 0:
+        return 0
+    return overlap / smaller * 100
+
+
+def within_tolerance(gt_value, pred_value, tolerance_percent=5):
+    if gt_value == pred_value:
+        return True
+    if gt_value == 'NA' or pred_value == 'NA':
+        return False
+    if not (is_numeric(gt_value) and is_numeric(pred_value)):
+        return False
+    gt_range = parse_range(gt_value)
+    pred_range = parse_range(pred_value)
+    try:
+        if gt_range and pred_range:
+            return range_overlap(gt_range, pred_range) >= 80
+        if gt_range:
+            return gt_range[0] <= float(pred_value) <= gt_range[1]
+        if pred_range:
+            return pred_range[0] <= float(gt_value) <= pred_range[1]
+        gt_float = float(gt_value)
+        return abs(gt_float - float(pred_value)) <= gt_float * tolerance_percent / 100
+    except ValueError:
+        return False
+
+
+def automatic_label(property_name, gt_value, pred_value):
+    """Label the comparison engine of the time gave a cell, None when it left it for review"""
+    gt_is_na = gt_value == 'NA' or gt_value is None
+    pred_is_na = pred_value == 'NA' or pred_value is None
+    if gt_is_na:
+        return 'TN' if pred_is_na else 'FP'
+    if pred_is_na:
+        return 'FN'
+    if property_name in TEXT_PROPERTIES:
+        return 'TP' if gt_value == pred_value else None
+    return 'TP' if within_tolerance(gt_value, pred_value) else 'FN'
+
+
+def classify_chunk(chunk, DataEntry, PropertyValue):
+    """Return the ids of the classifications in ``chunk`` the engine would not have made"""
+    entry_ids = {row[3] for row in chunk} | {row[4] for row in chunk}
+    text = {
+        entry_id: {'polymer_system': polymer_system, 'force_field': force_field}
+        for entry_id, polymer_system, force_field in DataEntry.objects.filter(
+            id__in=entry_ids
+        ).values_list('id', 'polymer_system', 'force_field')
+    }
+    raw = {
+        (entry_id, name): value
+        for entry_id, name, value in PropertyValue.objects.filter(
+            entry_id__in=entry_ids
+        ).values_list('entry_id', 'property_name', 'raw')
+    }
+
+    def value(entry_id, prop):
+        if prop in TEXT_PROPERTIES:
+            return text[entry_id][prop]
+        return raw.get((entry_id, prop), 'NA')
+
+    return [
+        classification_id
+        for classification_id, prop, label, gt_id, pred_id in chunk
+        if automatic_label(prop, value(gt_id, prop), value(pred_id, prop)) != label
+    ]
+
+
+def mark_human_classifications(apps, schema_editor):
+    """Mark the existing classifications the comparison engine would not have made as human
+
+    Reviewers and the engine wrote the same rows before sources were
+    recorded. A text cell the engine left for review, or a label that
+    disagrees with the engine of the time, can only have come from a
+    reviewer, and rescoring must keep it.
+    """
+    Classification = apps.get_model('evaluation_app', 'Classification')
+    DataEntry = apps.get_model('evaluation_app', 'DataEntry')
+    PropertyValue = apps.get_model('evaluation_app', 'PropertyValue')
+
+    rows = Classification.objects.filter(property_name__in=PROPERTIES).order_by('id').values_list(
+        'id', 'property_name', 'classification', 'matched_pair__ground_truth_id', 'matched_pair__predicted_id'
+    )
+    human = []
+    chunk = []
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            human += classify_chunk(chunk, DataEntry, PropertyValue)
+            chunk = []
+    if chunk:
+        human += classify_chunk(chunk, DataEntry, PropertyValue)
+
+    for start in range(0, len(human), ID_BATCH_SIZE):
+        Classification.objects.filter(id__in=human[start:start + ID_BATCH_SIZE]).update(source='human')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation_app', '0008_property_values'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classification',
+            name='source',
+            field=models.CharField(choices=[('auto', 'Automatic comparison'), ('human', 'Human review')], default='auto', max_length=10),
+        ),
+        migrations.RunPython(mark_human_classifications, migrations.RunPython.noop),
+    ]
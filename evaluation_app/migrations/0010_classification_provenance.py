@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation_app', '0009_classification_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classification',
+            name='input_hash',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='classification',
+            name='rule_version',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='classification',
+            index=models.Index(fields=['property_name', 'source', 'rule_version'], name='classification_provenance_idx'),
+        ),
+    ]
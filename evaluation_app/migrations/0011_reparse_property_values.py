@@ -0,0 +1,156 @@
+import math
+import re
+from functools import lru_cache
+
+from django.db import migrations
+
+
+# Snapshot of the unit-aware parser at the time of this migration
+NA, INVALID, VALUE, APPROX, RANGE, UNCERTAIN = range(6)
+
+NA_QUANTITY = (math.nan, math.nan, NA)
+INVALID_QUANTITY = (math.nan, math.nan, INVALID)
+
+TEMPERATURE = 'temperature'
+DENSITY = 'density'
+LENGTH = 'length'
+MODULUS = 'modulus'
+DIFFUSIVITY = 'diffusivity'
+VISCOSITY = 'viscosity'
+
+# Dimension of each built-in property; other properties accept no unit suffix
+DIMENSIONS = {
+    'Density (g/cm³)': DENSITY,
+    'Glass Transition Temperature (K)': TEMPERATURE,
+    'Radius of Gyration (nm)': LENGTH,
+    'Young\'s Modulus (GPa)': MODULUS,
+    'Diffusion Coefficient (m²/s)': DIFFUSIVITY,
+    'Viscosity (Pa s)': VISCOSITY,
+}
+
+UNITS = {
+    TEMPERATURE: {'K': (1, 0), '°C': (1, 273.15)},
+    DENSITY: {'g/cm3': (1, 0), 'g/cc': (1, 0), 'g/mL': (1, 0), 'kg/m3': (1e-3, 0)},
+    LENGTH: {'nm': (1, 0), 'Å': (0.1, 0)},
+    MODULUS: {'GPa': (1, 0), 'MPa': (1e-3, 0)},
+    DIFFUSIVITY: {'m2/s': (1, 0), 'cm2/s': (1e-4, 0)},
+    VISCOSITY: {'Pa s': (1, 0), 'mPa s': (1e-3, 0), 'cP': (1e-3, 0)},
+}
+
+SUPERSCRIPTS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺', '0123456789-+')
+SUPERSCRIPT_RUN = re.compile('[⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺]+')
+
+NUMBER = r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?'
+UNIT = r'(?:\s*(?P<unit>[^\d\s.+-].*?))?'
+
+TIMES_TEN = re.compile(r'(\d)\s*[x×*·]\s*10\s*\^\s*([+-]?\d+)')
+BARE_POWER = re.compile(r'(?<![\d.])10\s*\^\s*([+-]?\d+)')
+APPROXIMATE = re.compile(r'^(?:~|∼|≈|approx\.?|ca\.?|about)\s*', re.IGNORECASE)
+UNCERTAINTY = re.compile(rf'^(?P<lo>{NUMBER})\s*(?:±|\+/-|\+-)\s*(?P<hi>{NUMBER}){UNIT}$')
+BOUNDS = re.compile(rf'^(?P<lo>{NUMBER})\s*(?:-|–|—|to)\s*(?P<hi>{NUMBER}){UNIT}$')
+SINGLE = re.compile(rf'^(?P<lo>{NUMBER}){UNIT}$')
+
+
+def normalize_unit(unit):
+    unit = unit.translate(SUPERSCRIPTS).replace('^', '')
+    unit = re.sub(r'[·⋅*]', ' ', unit)
+    return ' '.join(unit.split())
+
+
+def normalize_text(text):
+    text = text.strip().replace('−', '-')
+    text = SUPERSCRIPT_RUN.sub(lambda run: '^' + run[0].translate(SUPERSCRIPTS), text)
+    text = TIMES_TEN.sub(r'\1e\2', text)
+    return BARE_POWER.sub(r'1e\1', text)
+
+
+def convert(lo, hi, unit, dimension):
+    if not unit:
+        return lo, hi
+    conversion = UNITS.get(dimension, {}).get(normalize_unit(unit))
+    if conversion is None:
+        return None
+    factor, offset = conversion
+    return lo * factor + offset, hi * factor + offset
+
+
+@lru_cache(maxsize=65536)
+def parse_text(text, dimension):
+    text = normalize_text(text)
+    approximate = APPROXIMATE.match(text)
+    if approximate:
+        text = text[approximate.end():]
+
+    match = UNCERTAINTY.match(text)
+    if match:
+        center, spread = float(match['lo']), abs(float(match['hi']))
+        lo, hi, kind = center - spread, center + spread, UNCERTAIN
+    else:
+        match = BOUNDS.match(text) or SINGLE.match(text)
+        if match is None:
+            try:
+                number = float(text)
+            except ValueError:
+                return INVALID_QUANTITY
+            return (number, number, APPROX if approximate else VALUE)
+        lo = float(match['lo'])
+        hi = float(match['hi']) if 'hi' in match.groupdict() else lo
+        kind = RANGE if 'hi' in match.groupdict() else VALUE
+
+    bounds = convert(lo, hi, match['unit'], dimension)
+    if bounds is None:
+        return INVALID_QUANTITY
+    lo, hi = sorted(bounds)
+    if kind == VALUE and approximate:
+        kind = APPROX
+    return (lo, hi, kind)
+
+
+def parse_quantity(value, dimension=None):
+    """Parse one raw value into ``(lo, hi, kind)`` with the unit suffixes of ``dimension``"""
+    if value is None or value == 'NA':
+        return NA_QUANTITY
+    if not isinstance(value, str):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return INVALID_QUANTITY
+        return (number, number, VALUE)
+    return parse_text(value, dimension)
+
+
+def reparse_property_values(apps, schema_editor):
+    """Re-parse stored values whose bounds the unit-aware parser reads differently
+
+    Uncertainties, approximations, unit suffixes and scientific-notation
+    ranges used to be stored as unparseable. Run ``manage.py rescore``
+    afterwards to reclassify the affected pairs.
+    """
+    PropertyValue = apps.get_model('evaluation_app', 'PropertyValue')
+    changed = []
+    for value in PropertyValue.objects.order_by('id').iterator(chunk_size=2000):
+        lo, hi, kind = parse_quantity(value.raw, DIMENSIONS.get(value.property_name))
+        parsed = (
+            None if math.isnan(lo) else lo,
+            None if math.isnan(hi) else hi,
+            kind == NA,
+            kind in (RANGE, UNCERTAIN),
+        )
+        if parsed != (value.lower, value.upper, value.is_na, value.is_range):
+            value.lower, value.upper, value.is_na, value.is_range = parsed
+            changed.append(value)
+        if len(changed) >= 2000:
+            PropertyValue.objects.bulk_update(changed, ['lower', 'upper', 'is_na', 'is_range'])
+            changed = []
+    PropertyValue.objects.bulk_update(changed, ['lower', 'upper', 'is_na', 'is_range'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation_app', '0010_classification_provenance'),
+    ]
+
+    operations = [
+        migrations.RunPython(reparse_property_values, migrations.RunPython.noop),
+    ]
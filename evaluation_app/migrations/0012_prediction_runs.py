@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_default_run(apps, schema_editor):
+    """Put the predictions loaded before runs existed into a 'default' run"""
+    DataEntry = apps.get_model('evaluation_app', 'DataEntry')
+    PredictionRun = apps.get_model('evaluation_app', 'PredictionRun')
+    predicted = DataEntry.objects.filter(entry_type='predicted')
+    if predicted.exists():
+        run = PredictionRun.objects.create(name='default')
+        predicted.update(run=run)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation_app', '0011_reparse_property_values'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PredictionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('description', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='evaluation_app.predictionrun'),
+        ),
+        migrations.RunPython(assign_default_run, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation_app', '0012_prediction_runs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classification',
+            name='session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='classifications', to='evaluation_app.evaluationsession'),
+        ),
+        migrations.AddField(
+            model_name='dataentry',
+            name='session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='evaluation_app.evaluationsession'),
+        ),
+        migrations.AddField(
+            model_name='matchedpair',
+            name='session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pairs', to='evaluation_app.evaluationsession'),
+        ),
+        migrations.AddField(
+            model_name='predictionrun',
+            name='session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='evaluation_app.evaluationsession'),
+        ),
+        migrations.AlterField(
+            model_name='predictionrun',
+            name='name',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.AlterUniqueTogether(
+            name='predictionrun',
+            unique_together={('session', 'name')},
+        ),
+        migrations.AddIndex(
+            model_name='classification',
+            index=models.Index(fields=['session', 'property_name', 'classification'], name='classification_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dataentry',
+            index=models.Index(fields=['session', 'entry_type', 'polymer_system', 'force_field'], name='entry_session_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matchedpair',
+            index=models.Index(fields=['session', '-id'], name='pair_session_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:53
+
+from django.db import migrations, models
+
+
+def mark_ground_truth_per_run(apps, schema_editor):
+    """Move the no-match flags of ground truth entries to the runs of their session
+
+    A flagged ground truth entry was hidden from every run, so it stays
+    marked in each existing run. Without a run the flag is kept.
+    """
+    DataEntry = apps.get_model('evaluation_app', 'DataEntry')
+    PredictionRun = apps.get_model('evaluation_app', 'PredictionRun')
+    NoMatchMark = DataEntry.no_match_runs.through
+
+    flagged = DataEntry.objects.filter(entry_type='ground_truth', marked_no_match=True)
+    runs = {}
+    for run_id, session_id in PredictionRun.objects.values_list('id', 'session_id'):
+        runs.setdefault(session_id, []).append(run_id)
+    moved = []
+    marks = []
+    for entry_id, session_id in flagged.values_list('id', 'session_id').iterator():
+        if session_id in runs:
+            moved.append(entry_id)
+            marks.extend(NoMatchMark(dataentry_id=entry_id, predictionrun_id=run_id) for run_id in runs[session_id])
+    NoMatchMark.objects.bulk_create(marks, batch_size=500)
+    for start in range(0, len(moved), 900):
+        DataEntry.objects.filter(id__in=moved[start:start + 900]).update(marked_no_match=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation_app', '0013_evaluation_session_scope'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataentry',
+            name='no_match_runs',
+            field=models.ManyToManyField(blank=True, related_name='no_match_entries', to='evaluation_app.predictionrun'),
+        ),
+        migrations.RunPython(mark_ground_truth_per_run, migrations.RunPython.noop),
+    ]
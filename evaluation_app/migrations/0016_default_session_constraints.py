@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:54
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_default_session_duplicates(apps, schema_editor):
+    """Remove the duplicates unique_together let through in the default session
+
+    Duplicate counters are summed into the oldest row. Later runs sharing a
+    name get their id appended, so none of their predictions are lost.
+    """
+    ClassificationCounter = apps.get_model('evaluation_app', 'ClassificationCounter')
+    PredictionRun = apps.get_model('evaluation_app', 'PredictionRun')
+
+    counters = ClassificationCounter.objects.filter(session=None)
+    duplicates = counters.values('property_name', 'classification').annotate(
+        rows=Count('id'), first=Min('id'), total=Sum('count')
+    ).filter(rows__gt=1)
+    for row in duplicates:
+        ClassificationCounter.objects.filter(id=row['first']).update(count=row['total'])
+        counters.filter(
+            property_name=row['property_name'], classification=row['classification']
+        ).exclude(id=row['first']).delete()
+
+    runs = PredictionRun.objects.filter(session=None)
+    duplicates = runs.values('name').annotate(rows=Count('id'), first=Min('id')).filter(rows__gt=1)
+    for row in duplicates:
+        for run in runs.filter(name=row['name']).exclude(id=row['first']):
+            run.name = f'{run.name[:180]} ({run.id})'
+            run.save(update_fields=['name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation_app', '0015_dataentry_no_match_runs'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_default_session_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='classificationcounter',
+            constraint=models.UniqueConstraint(condition=models.Q(('session__isnull', True)), fields=('property_name', 'classification'), name='counter_default_session_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='predictionrun',
+            constraint=models.UniqueConstraint(condition=models.Q(('session__isnull', True)), fields=('name',), name='run_default_session_name_unique'),
+        ),
+    ]
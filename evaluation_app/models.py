@@ -1,84 +1,252 @@
 from django.db import models
 import json
+import math
+from collections import defaultdict, namedtuple
 from django.core.exceptions import ValidationError
+from .comparison import parse_value
+from .properties import NUMERIC, TEXT, property_definitions, property_dimension, property_names
+
+# Entries whose property values are loaded per query; keeps the IN list
+# below SQLite's parameter limit
+VALUE_LOOKUP_BATCH_SIZE = 900
+
+# Properties stored directly as DataEntry columns
+TEXT_FIELDS = property_names(TEXT)
+
+# A stored value read without building a model instance; has the same
+# attributes as PropertyValue for everything that only reads values
+ParsedValue = namedtuple('ParsedValue', ['raw', 'lower', 'upper', 'is_na', 'is_range'])
+
+class PredictionRun(models.Model):
+    """A named set of predicted entries, e.g. the output of one model version
+    
+    Ground truth entries belong to no run and are shared by every run of
+    their session, so a new model version is evaluated without re-uploading
+    the ground truth.
+    """
+    # Evaluation session the run belongs to; None is the default session
+    session = models.ForeignKey('EvaluationSession', on_delete=models.CASCADE, blank=True, null=True, related_name='runs')
+    name = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['session', 'name']
+        constraints = [
+            # NULL sessions never clash under unique_together, so names in the
+            # default session need their own constraint
+            models.UniqueConstraint(
+                fields=['name'], condition=models.Q(session__isnull=True), name='run_default_session_name_unique'
+            ),
+        ]
+    
+    def __str__(self):
+        return self.name
 
 class DataEntry(models.Model):
-    """Model to store ground truth and predicted data entries"""
+    """Model to store ground truth and predicted data entries
+    
+    Numeric property values live in PropertyValue rows, one per registered
+    property, so adding a property needs no migration.
+    """
     ENTRY_TYPE_CHOICES = [
         ('ground_truth', 'Ground Truth'),
         ('predicted', 'Predicted'),
     ]
     
     entry_type = models.CharField(max_length=20, choices=ENTRY_TYPE_CHOICES)
+    session = models.ForeignKey('EvaluationSession', on_delete=models.CASCADE, blank=True, null=True, related_name='entries')
+    # Run of a predicted entry; ground truth entries have none
+    run = models.ForeignKey(PredictionRun, on_delete=models.CASCADE, blank=True, null=True, related_name='entries')
     polymer_system = models.CharField(max_length=200)
     force_field = models.CharField(max_length=100)
     
-    # Property fields
-    density = models.CharField(max_length=50, blank=True, null=True)
-    glass_transition_temp = models.CharField(max_length=50, blank=True, null=True)
-    radius_of_gyration = models.CharField(max_length=50, blank=True, null=True)
-    youngs_modulus = models.CharField(max_length=50, blank=True, null=True)
-    diffusion_coefficient = models.CharField(max_length=50, blank=True, null=True)
-    viscosity = models.CharField(max_length=50, blank=True, null=True)
-    
-    # Track if entry has been marked as "no match"
+    # Track if a predicted entry has been marked as "no match"
     marked_no_match = models.BooleanField(default=False)
+    # Runs a ground truth entry is marked as "no match" in; the entry is
+    # shared by the runs, so a mark only hides it within its own run
+    no_match_runs = models.ManyToManyField(PredictionRun, blank=True, related_name='no_match_entries')
     
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # {property_name: PropertyValue or ParsedValue} once loaded or set; None until then
+    _property_values = None
+    _property_values_changed = False
+    
     class Meta:
         # Removed unique_together constraint to allow all entries
         verbose_name_plural = "Data entries"
+        indexes = [
+            # Unmatched-entry lists on the matching page, in display order
+            models.Index(
+                fields=['entry_type', 'polymer_system', 'force_field', 'marked_no_match'],
+                name='entry_type_match_order_idx'
+            ),
+            # The same lists within one evaluation session
+            models.Index(
+                fields=['session', 'entry_type', 'polymer_system', 'force_field'],
+                name='entry_session_order_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.entry_type}: {self.polymer_system} - {self.force_field}"
     
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if self._property_values_changed:
+            self.property_values.all().delete()
+            PropertyValue.objects.bulk_create(self._property_values.values())
+            self._property_values_changed = False
+            if not adding:
+                # Automatic classifications of this entry's pairs are now stale
+                Classification.objects.filter(
+                    models.Q(matched_pair__ground_truth=self) | models.Q(matched_pair__predicted=self),
+                    source=Classification.AUTOMATIC
+                ).update(rule_version='')
+    
+    def set_property_values(self, values):
+        """Replace the numeric property values, parsing each raw value once
+        
+        ``values`` maps property names to raw values; registered numeric
+        properties that are missing are stored as 'NA'. The rows are written
+        by save() or by the caller with bulk_create.
+        """
+        self._property_values = {
+            name: PropertyValue.parse(self, name, values.get(name, 'NA'))
+            for name in property_names(NUMERIC)
+        }
+        self._property_values_changed = True
+    
+    def get_property_values(self):
+        """Return {property_name: value}, querying only if not loaded yet"""
+        if self._property_values is None:
+            self._property_values = {value.property_name: value for value in self.property_values.all()}
+        return self._property_values
+    
+    def get_parsed_value(self, property_name):
+        """Get (raw, lower, upper, is_na, is_range) for a property without re-parsing"""
+        if property_name in TEXT_FIELDS:
+            raw = getattr(self, property_name)
+            return (raw, None, None, raw is None or raw == 'NA', False)
+        value = self.get_property_values().get(property_name)
+        if value is None:
+            return ('NA', None, None, True, False)
+        return (value.raw, value.lower, value.upper, value.is_na, value.is_range)
+    
     def get_property_value(self, property_name):
         """Get the value of a specific property"""
-        property_mapping = {
-            'polymer_system': self.polymer_system,
-            'force_field': self.force_field,
-            'Density (g/cm³)': self.density,
-            'Glass Transition Temperature (K)': self.glass_transition_temp,
-            'Radius of Gyration (nm)': self.radius_of_gyration,
-            'Young\'s Modulus (GPa)': self.youngs_modulus,
-            'Diffusion Coefficient (m²/s)': self.diffusion_coefficient,
-            'Viscosity (Pa s)': self.viscosity,
-        }
-        return property_mapping.get(property_name, 'NA')
+        return self.get_parsed_value(property_name)[0]
     
-    @property
-    def density_value(self):
-        return self.density or 'NA'
+    def get_display_value(self, property_name):
+        """Get a property value for display, with missing numbers shown as NA"""
+        value = self.get_property_value(property_name)
+        if property_name in TEXT_FIELDS:
+            return value
+        return value or 'NA'
     
     @property
-    def glass_transition_temp_value(self):
-        return self.glass_transition_temp or 'NA'
+    def display_values(self):
+        """(label, value) for every numeric property, for entry cards"""
+        return [
+            (definition.label, self.get_display_value(definition.name))
+            for definition in property_definitions(NUMERIC)
+        ]
+
+class PropertyValue(models.Model):
+    """One numeric property value of a data entry, in long format
     
-    @property
-    def radius_of_gyration_value(self):
-        return self.radius_of_gyration or 'NA'
+    The raw string is kept for display and export; the bounds and flags are
+    parsed once when the value is stored. Single values have lower == upper
+    and unparseable values have null bounds.
+    """
+    entry = models.ForeignKey(DataEntry, on_delete=models.CASCADE, related_name='property_values')
+    property_name = models.CharField(max_length=100)
+    raw = models.CharField(max_length=50, blank=True, null=True)
+    lower = models.FloatField(blank=True, null=True)
+    upper = models.FloatField(blank=True, null=True)
+    is_na = models.BooleanField(default=True)
+    is_range = models.BooleanField(default=False)
     
-    @property
-    def youngs_modulus_value(self):
-        return self.youngs_modulus or 'NA'
+    class Meta:
+        unique_together = ['entry', 'property_name']
+        indexes = [
+            # Per-property scans, e.g. re-scoring one property
+            models.Index(fields=['property_name', 'entry'], name='property_value_lookup_idx'),
+        ]
     
-    @property
-    def diffusion_coefficient_value(self):
-        return self.diffusion_coefficient or 'NA'
+    def __str__(self):
+        return f"{self.entry_id} - {self.property_name}: {self.raw}"
     
-    @property
-    def viscosity_value(self):
-        return self.viscosity or 'NA'
+    @classmethod
+    def parse(cls, entry, property_name, raw):
+        """Build an unsaved value with its parsed bounds and flags"""
+        lower, upper, is_na, is_range = parse_value(raw, property_dimension(property_name))
+        return cls(
+            entry=entry,
+            property_name=property_name,
+            raw=raw,
+            lower=None if math.isnan(lower) else lower,
+            upper=None if math.isnan(upper) else upper,
+            is_na=is_na,
+            is_range=is_range
+        )
+
+def load_property_values(entries, properties=None):
+    """Load the property values of many entries with a few batched queries
+    
+    Fills the per-entry cache used by get_parsed_value, so comparing or
+    rendering the entries afterwards runs no further queries. Pass
+    ``properties`` to read only the rows of those properties; other
+    properties then read as NA.
+    """
+    entries = [entry for entry in entries if entry.pk is not None]
+    # The same row may be loaded as several objects, e.g. by select_related
+    by_id = defaultdict(list)
+    for entry in entries:
+        entry._property_values = {}
+        by_id[entry.pk].append(entry)
+    ids = list(by_id)
+    
+    for start in range(0, len(ids), VALUE_LOOKUP_BATCH_SIZE):
+        values = PropertyValue.objects.filter(entry_id__in=ids[start:start + VALUE_LOOKUP_BATCH_SIZE])
+        if properties is not None:
+            values = values.filter(property_name__in=properties)
+        rows = values.values_list('entry_id', 'property_name', 'raw', 'lower', 'upper', 'is_na', 'is_range')
+        for entry_id, property_name, *parsed in rows:
+            value = ParsedValue(*parsed)
+            for entry in by_id[entry_id]:
+                entry._property_values[property_name] = value
+    return entries
+
+def load_pair_values(pairs, properties=None):
+    """Load the property values of both entries of many pairs
+    
+    Entries that already have their values (set, loaded or prefetched) are
+    skipped. ``properties`` works as in load_property_values.
+    """
+    return load_property_values((
+        entry
+        for pair in pairs
+        for entry in (pair.ground_truth, pair.predicted)
+        if entry._property_values is None and 'property_values' not in getattr(entry, '_prefetched_objects_cache', {})
+    ), properties)
 
 class MatchedPair(models.Model):
     """Model to store manually matched ground truth and predicted pairs"""
+    session = models.ForeignKey('EvaluationSession', on_delete=models.CASCADE, blank=True, null=True, related_name='pairs')
     ground_truth = models.ForeignKey(DataEntry, on_delete=models.CASCADE, related_name='gt_pairs')
     predicted = models.ForeignKey(DataEntry, on_delete=models.CASCADE, related_name='pred_pairs')
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         unique_together = ['ground_truth', 'predicted']
+        indexes = [
+            models.Index(fields=['-created_at'], name='pair_created_idx'),
+            # Newest-first pair pages of one session
+            models.Index(fields=['session', '-id'], name='pair_session_idx'),
+        ]
     
     def __str__(self):
         return f"GT: {self.ground_truth.polymer_system} - Pred: {self.predicted.polymer_system}"
@@ -92,19 +260,57 @@ class Classification(models.Model):
         ('FN', 'False Negative'),
     ]
     
+    # Automatic classifications may be recomputed when the comparison rules
+    # change; human ones are never overwritten
+    AUTOMATIC = 'auto'
+    HUMAN = 'human'
+    SOURCE_CHOICES = [
+        (AUTOMATIC, 'Automatic comparison'),
+        (HUMAN, 'Human review'),
+    ]
+    
+    # Always the session of the matched pair, stored for session-wide aggregates
+    session = models.ForeignKey('EvaluationSession', on_delete=models.CASCADE, blank=True, null=True, related_name='classifications')
     matched_pair = models.ForeignKey(MatchedPair, on_delete=models.CASCADE, related_name='classifications')
     property_name = models.CharField(max_length=100)
     classification = models.CharField(max_length=2, choices=CLASSIFICATION_CHOICES)
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default=AUTOMATIC)
+    # rules.rule_version of the rule an automatic classification was made
+    # under ('' once stale) and comparison.input_hash of the values it saw
+    rule_version = models.CharField(max_length=16, blank=True, default='')
+    input_hash = models.CharField(max_length=16, blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         unique_together = ['matched_pair', 'property_name']
+        indexes = [
+            # Grouped counts and the evaluation page's classification filter;
+            # matched_pair makes the index covering for both
+            models.Index(
+                fields=['property_name', 'classification', 'matched_pair'],
+                name='classification_lookup_idx'
+            ),
+            # Finding the cells made under an outdated rule when rescoring
+            models.Index(
+                fields=['property_name', 'source', 'rule_version'],
+                name='classification_provenance_idx'
+            ),
+            # Per-session counts, answered from the index alone
+            models.Index(
+                fields=['session', 'property_name', 'classification'],
+                name='classification_session_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.matched_pair} - {self.property_name}: {self.classification}"
 
 class EvaluationSession(models.Model):
-    """Model to track evaluation sessions"""
+    """Model to track evaluation sessions
+    
+    Entries, runs, pairs and classifications belong to one session; rows
+    without a session make up the default session.
+    """
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -114,11 +320,50 @@ class EvaluationSession(models.Model):
         return self.name
     
     def get_statistics(self):
-        """Get TP/FP/TN/FN statistics for this session"""
-        classifications = Classification.objects.filter(matched_pair__in=self.matchedpair_set.all())
+        """Get TP/FP/TN/FN statistics for this session with one indexed aggregate"""
         stats = {'TP': 0, 'FP': 0, 'TN': 0, 'FN': 0}
-        
-        for classification in classifications:
-            stats[classification.classification] += 1
+        for classification, n in self.classifications.order_by().values_list(
+            'classification'
+        ).annotate(n=models.Count('id')).values_list('classification', 'n'):
+            stats[classification] += n
         
         return stats
+
+class ClassificationCounter(models.Model):
+    """Materialized TP/FP/TN/FN counts per evaluation session and property
+    
+    Kept in step with Classification rows by the views that change them, so
+    statistics can be read without scanning every classification. Rebuild
+    with ``manage.py rebuild_counters`` if they ever drift.
+    """
+    session = models.ForeignKey(EvaluationSession, on_delete=models.CASCADE, blank=True, null=True, related_name='counters')
+    property_name = models.CharField(max_length=100)
+    classification = models.CharField(max_length=2, choices=Classification.CLASSIFICATION_CHOICES)
+    count = models.BigIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['session', 'property_name', 'classification']
+        constraints = [
+            # NULL sessions never clash under unique_together, so the default
+            # session's counters need their own constraint
+            models.UniqueConstraint(
+                fields=['property_name', 'classification'],
+                condition=models.Q(session__isnull=True),
+                name='counter_default_session_unique'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.session or 'Default session'} - {self.property_name}: {self.classification} = {self.count}"
+
+class DataVersion(models.Model):
+    """Counter bumped on every change to entries, pairs or classifications
+    
+    Clients compare it (as an ETag) to find out whether what they rendered
+    is still current without reloading anything.
+    """
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Data version {self.version}"
@@ -0,0 +1,143 @@
+import math
+import re
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+
+# What a raw value turned out to be
+NA, INVALID, VALUE, APPROX, RANGE, UNCERTAIN = range(6)
+KIND_NAMES = ['na', 'invalid', 'value', 'approx', 'range', 'uncertain']
+
+# Bounds of a parsed value; lo == hi for single values, NaN when invalid.
+# Uncertainties ("550 ± 20") become the range they span.
+Quantity = namedtuple('Quantity', ['lo', 'hi', 'kind'])
+
+NA_QUANTITY = Quantity(math.nan, math.nan, NA)
+INVALID_QUANTITY = Quantity(math.nan, math.nan, INVALID)
+
+# Distinct raw strings remembered; extraction output repeats values heavily
+PARSE_CACHE_SIZE = 65536
+
+# Dimensions a property can be measured in; each accepts its own unit suffixes
+TEMPERATURE = 'temperature'
+DENSITY = 'density'
+LENGTH = 'length'
+MODULUS = 'modulus'
+DIFFUSIVITY = 'diffusivity'
+VISCOSITY = 'viscosity'
+
+# Unit suffixes accepted after a number, per dimension, as (factor, offset)
+# into the unit the property names use (K, g/cm³, nm, GPa, m²/s, Pa s). A
+# suffix of another dimension makes the value invalid. Keys are normalized
+# with normalize_unit and are case sensitive (MPa vs mPa s).
+UNITS = {
+    TEMPERATURE: {'K': (1, 0), '°C': (1, 273.15)},
+    DENSITY: {'g/cm3': (1, 0), 'g/cc': (1, 0), 'g/mL': (1, 0), 'kg/m3': (1e-3, 0)},
+    LENGTH: {'nm': (1, 0), 'Å': (0.1, 0)},
+    MODULUS: {'GPa': (1, 0), 'MPa': (1e-3, 0)},
+    DIFFUSIVITY: {'m2/s': (1, 0), 'cm2/s': (1e-4, 0)},
+    VISCOSITY: {'Pa s': (1, 0), 'mPa s': (1e-3, 0), 'cP': (1e-3, 0)},
+}
+
+SUPERSCRIPTS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺', '0123456789-+')
+SUPERSCRIPT_RUN = re.compile('[⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺]+')
+
+NUMBER = r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?'
+UNIT = r'(?:\s*(?P<unit>[^\d\s.+-].*?))?'
+
+# "1.2×10^-9", "1.2 x 10⁻⁹" and "10^-9" become plain E notation
+TIMES_TEN = re.compile(r'(\d)\s*[x×*·]\s*10\s*\^\s*([+-]?\d+)')
+BARE_POWER = re.compile(r'(?<![\d.])10\s*\^\s*([+-]?\d+)')
+APPROXIMATE = re.compile(r'^(?:~|∼|≈|approx\.?|ca\.?|about)\s*', re.IGNORECASE)
+UNCERTAINTY = re.compile(rf'^(?P<lo>{NUMBER})\s*(?:±|\+/-|\+-)\s*(?P<hi>{NUMBER}){UNIT}$')
+BOUNDS = re.compile(rf'^(?P<lo>{NUMBER})\s*(?:-|–|—|to)\s*(?P<hi>{NUMBER}){UNIT}$')
+SINGLE = re.compile(rf'^(?P<lo>{NUMBER}){UNIT}$')
+
+def normalize_unit(unit):
+    """Spell a unit suffix the way UNITS does"""
+    unit = unit.translate(SUPERSCRIPTS).replace('^', '')
+    unit = re.sub(r'[·⋅*]', ' ', unit)
+    return ' '.join(unit.split())
+
+def normalize_text(text):
+    """Unify minus signs and powers of ten before matching"""
+    text = text.strip().replace('−', '-')
+    text = SUPERSCRIPT_RUN.sub(lambda run: '^' + run[0].translate(SUPERSCRIPTS), text)
+    text = TIMES_TEN.sub(r'\1e\2', text)
+    return BARE_POWER.sub(r'1e\1', text)
+
+def _convert(lo, hi, unit, dimension):
+    """Apply a unit suffix to the bounds; None unless it is a unit of ``dimension``"""
+    if not unit:
+        return lo, hi
+    conversion = UNITS.get(dimension, {}).get(normalize_unit(unit))
+    if conversion is None:
+        return None
+    factor, offset = conversion
+    return lo * factor + offset, hi * factor + offset
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_text(text, dimension):
+    text = normalize_text(text)
+    approximate = APPROXIMATE.match(text)
+    if approximate:
+        text = text[approximate.end():]
+
+    match = UNCERTAINTY.match(text)
+    if match:
+        center, spread = float(match['lo']), abs(float(match['hi']))
+        lo, hi, kind = center - spread, center + spread, UNCERTAIN
+    else:
+        match = BOUNDS.match(text) or SINGLE.match(text)
+        if match is None:
+            # Spellings only float() knows, such as "inf" and "nan"
+            try:
+                number = float(text)
+            except ValueError:
+                return INVALID_QUANTITY
+            return Quantity(number, number, APPROX if approximate else VALUE)
+        lo = float(match['lo'])
+        hi = float(match['hi']) if 'hi' in match.groupdict() else lo
+        kind = RANGE if 'hi' in match.groupdict() else VALUE
+
+    bounds = _convert(lo, hi, match['unit'], dimension)
+    if bounds is None:
+        return INVALID_QUANTITY
+    lo, hi = sorted(bounds)
+    if kind == VALUE and approximate:
+        kind = APPROX
+    return Quantity(lo, hi, kind)
+
+def parse_quantity(value, dimension=None):
+    """Parse one raw property value into a Quantity
+
+    Understands plain and scientific numbers ("1.2e-9", "1.2×10^-9"),
+    ranges with hyphens, dashes or "to" ("600–700"), uncertainties
+    ("550 ± 20"), approximations ("~600") and the unit suffixes UNITS lists
+    for ``dimension``; without a dimension no suffix is accepted. Only None
+    and 'NA' are missing values. Results are cached by string and dimension.
+    """
+    if value is None or value == 'NA':
+        return NA_QUANTITY
+    if not isinstance(value, str):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return INVALID_QUANTITY
+        return Quantity(number, number, VALUE)
+    return _parse_text(value, dimension)
+
+def parse_column(values, dimension=None):
+    """Parse a column of raw values in one pass, each distinct value once
+
+    Returns ``(lo, hi, kind)`` NumPy arrays aligned with ``values``.
+    """
+    values = list(values)
+    positions = {}
+    index = np.fromiter(
+        (positions.setdefault(value, len(positions)) for value in values),
+        dtype=np.intp,
+        count=len(values)
+    )
+    parsed = np.array([parse_quantity(value, dimension) for value in positions], dtype=float).reshape(-1, 3)
+    return parsed[index, 0], parsed[index, 1], parsed[index, 2].astype(np.int8)
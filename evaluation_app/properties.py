@@ -0,0 +1,66 @@
+from collections import namedtuple
+from django.conf import settings
+from .parsing import DENSITY, DIFFUSIVITY, LENGTH, MODULUS, TEMPERATURE, VISCOSITY
+
+# One registered property. ``name`` is the JSON key and display name, ``slug``
+# a short identifier, ``label`` the caption on entry cards and ``dimension``
+# picks the unit suffixes its values may carry.
+PropertyDefinition = namedtuple('PropertyDefinition', ['name', 'slug', 'label', 'kind', 'dimension'])
+
+# Text properties live in DataEntry columns and only match exactly; numeric
+# properties are stored as PropertyValue rows and compared with tolerances
+TEXT = 'text'
+NUMERIC = 'numeric'
+
+_registry = {}
+
+def register_property(name, slug, label=None, kind=NUMERIC, dimension=None):
+    """Add a property to the registry
+
+    New numeric properties are stored as PropertyValue rows, so registering
+    one needs no schema change.
+    """
+    if name in _registry:
+        raise ValueError(f'Property {name!r} is already registered')
+    if kind not in (TEXT, NUMERIC):
+        raise ValueError(f'Unknown property kind {kind!r}')
+    definition = PropertyDefinition(name, slug, label or name, kind, dimension)
+    _registry[name] = definition
+    return definition
+
+def get_property(name):
+    """Return the definition of a registered property"""
+    return _registry[name]
+
+def property_dimension(name):
+    """Dimension of a property's unit suffixes, None for unregistered properties"""
+    definition = _registry.get(name)
+    return definition.dimension if definition else None
+
+def property_by_slug(slug):
+    """Return the definition with the given slug"""
+    for definition in _registry.values():
+        if definition.slug == slug:
+            return definition
+    raise KeyError(slug)
+
+def property_definitions(kind=None):
+    """Registered properties in display order, optionally of one kind"""
+    return [definition for definition in _registry.values() if kind is None or definition.kind == kind]
+
+def property_names(kind=None):
+    """Names of the registered properties in display order"""
+    return [definition.name for definition in property_definitions(kind)]
+
+register_property('polymer_system', 'polymer_system', 'Polymer System', TEXT)
+register_property('force_field', 'force_field', 'Force Field', TEXT)
+register_property('Density (g/cm³)', 'density', 'Density', dimension=DENSITY)
+register_property('Glass Transition Temperature (K)', 'glass_transition_temp', 'Glass Transition', dimension=TEMPERATURE)
+register_property('Radius of Gyration (nm)', 'radius_of_gyration', 'Radius of Gyration', dimension=LENGTH)
+register_property('Young\'s Modulus (GPa)', 'youngs_modulus', 'Young\'s Modulus', dimension=MODULUS)
+register_property('Diffusion Coefficient (m²/s)', 'diffusion_coefficient', 'Diffusion Coefficient', dimension=DIFFUSIVITY)
+register_property('Viscosity (Pa s)', 'viscosity', 'Viscosity', dimension=VISCOSITY)
+
+# Site-specific properties as (name, slug, label[, kind[, dimension]]) tuples
+for extra in getattr(settings, 'EVALUATION_EXTRA_PROPERTIES', []):
+    register_property(*extra)
@@ -0,0 +1,263 @@
+import multiprocessing
+import time
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial, reduce
+from operator import or_
+from django.db import connections, transaction
+from django.db.models import Case, Exists, F, OuterRef, Q, Value, When
+from . import counters
+from .comparison import CODE_LABELS, PROPERTIES, TEXT_PROPERTIES, classify_pairs, input_hashes
+from .models import Classification, MatchedPair, load_pair_values
+from .rules import rule_version
+from .versions import bump_data_version
+
+# Pairs classified per task handed to a worker process
+RESCORE_CHUNK_SIZE = 5000
+
+# Pair ids per UPDATE or DELETE; keeps the IN list below SQLite's parameter limit
+ID_BATCH_SIZE = 900
+
+# One automatic cell to write. ``new`` is None when the cell now needs human
+# judgment; ``version_only`` marks cells whose label and inputs are unchanged
+# and that only need the current rule version.
+CellChange = namedtuple(
+    'CellChange',
+    ['pair_id', 'session_id', 'property_name', 'old', 'new', 'rule_version', 'input_hash', 'version_only']
+)
+
+def outdated_cells(properties):
+    """Automatic classifications of the given properties made under another rule version
+
+    Cells without an input hash predate provenance tracking; the incremental
+    rescore leaves them alone and only a full rescore revisits them.
+    """
+    conditions = []
+    for prop in properties:
+        version = rule_version(prop)
+        # Two index ranges rather than a scan of every cell of the property
+        conditions.append(Q(property_name=prop) & (Q(rule_version__lt=version) | Q(rule_version__gt=version)))
+    return Classification.objects.filter(
+        reduce(or_, conditions), source=Classification.AUTOMATIC
+    ).exclude(input_hash='')
+
+def stale_properties():
+    """Properties with at least one outdated automatic classification"""
+    return [prop for prop in PROPERTIES if outdated_cells([prop]).exists()]
+
+def pairs_to_score(properties, full=False):
+    """All pairs for a full rescore, otherwise those with outdated cells"""
+    pairs = MatchedPair.objects.all()
+    if not full:
+        pairs = pairs.filter(Exists(outdated_cells(properties).filter(matched_pair=OuterRef('pk'))))
+    return pairs
+
+def pair_id_ranges(pairs, chunk_size=RESCORE_CHUNK_SIZE):
+    """Split a pair queryset into (first_id, last_id) ranges of chunk_size pairs"""
+    ranges = []
+    first = last = None
+    count = 0
+    for pair_id in pairs.order_by('id').values_list('id', flat=True).iterator(chunk_size=10000):
+        if first is None:
+            first = pair_id
+        last = pair_id
+        count += 1
+        if count == chunk_size:
+            ranges.append((first, last))
+            first, count = None, 0
+    if first is not None:
+        ranges.append((first, last))
+    return ranges
+
+def score_range(id_range, properties=PROPERTIES, full=True):
+    """Classify the given properties of the pairs in one id range
+
+    Returns ``(pair_count, human_count, changes)`` where ``changes`` holds a
+    CellChange for every automatic cell whose label or provenance differs.
+    Only the values of ``properties`` are
+    read, and unless ``full`` only pairs with outdated cells are scored.
+    Human classifications are counted but never changed. Only reads, so it
+    can run in a worker process.
+    """
+    pairs = list(
+        pairs_to_score(properties, full).select_related('ground_truth', 'predicted').only(
+            'session', 'ground_truth__polymer_system', 'ground_truth__force_field',
+            'predicted__polymer_system', 'predicted__force_field'
+        ).filter(id__range=id_range).order_by('id')
+    )
+    load_pair_values(pairs, [prop for prop in properties if prop not in TEXT_PROPERTIES])
+    first_id, last_id = id_range
+    current = {
+        (pair_id, prop): (classification, source, version, digest)
+        for pair_id, prop, classification, source, version, digest in Classification.objects.filter(
+            matched_pair_id__gte=first_id, matched_pair_id__lte=last_id, property_name__in=properties
+        ).values_list('matched_pair_id', 'property_name', 'classification', 'source', 'rule_version', 'input_hash')
+    }
+
+    codes = classify_pairs(pairs, properties)
+    human = 0
+    changes = []
+    for prop in properties:
+        version = rule_version(prop)
+        for pair, code, digest in zip(pairs, codes[prop], input_hashes(pairs, prop)):
+            old, source, old_version, old_digest = current.get((pair.id, prop), (None, None, None, None))
+            if source == Classification.HUMAN:
+                human += 1
+                continue
+            new = CODE_LABELS[code]
+            if new != old or (new and (old_version, old_digest) != (version, digest)):
+                version_only = new == old and digest == old_digest
+                changes.append(CellChange(pair.id, pair.session_id, prop, old, new, version, digest, version_only))
+    return len(pairs), human, changes
+
+def apply_changes(changes):
+    """Write one chunk of rescored cells and update the counters
+
+    Every write is limited to automatic rows, so a label a reviewer saves
+    after the chunk was scored is never overwritten. Relabeled cells are
+    updated with one statement per property, label change and batch, and
+    counted by the rows each statement changed; missing cells are inserted
+    with conflicts ignored and counted from the rows that appeared. Cells
+    that only need the new rule version are restamped the same way.
+    """
+    inserts = defaultdict(list)
+    relabeled = defaultdict(list)
+    restamped = defaultdict(list)
+    cleared = defaultdict(list)
+    for change in changes:
+        if not change.new:
+            cleared[change.session_id, change.property_name, change.old].append(change.pair_id)
+        elif change.version_only:
+            restamped[change.property_name, change.rule_version].append(change.pair_id)
+        elif change.old is None:
+            inserts[change.session_id, change.property_name, change.new].append(Classification(
+                session_id=change.session_id,
+                matched_pair_id=change.pair_id,
+                property_name=change.property_name,
+                classification=change.new,
+                source=Classification.AUTOMATIC,
+                rule_version=change.rule_version,
+                input_hash=change.input_hash
+            ))
+        else:
+            key = (change.session_id, change.property_name, change.old, change.new, change.rule_version)
+            relabeled[key].append((change.pair_id, change.input_hash))
+
+    deltas = Counter()
+    automatic = Classification.objects.filter(source=Classification.AUTOMATIC)
+    with transaction.atomic():
+        for (session, prop, new), cells in inserts.items():
+            for start in range(0, len(cells), ID_BATCH_SIZE):
+                batch = cells[start:start + ID_BATCH_SIZE]
+                targets = Classification.objects.filter(
+                    property_name=prop, matched_pair_id__in=[cell.matched_pair_id for cell in batch]
+                )
+                before = targets.count()
+                Classification.objects.bulk_create(batch, ignore_conflicts=True)
+                deltas[(session, prop, new)] += targets.count() - before
+        for (session, prop, old, new, version), cells in relabeled.items():
+            # Three parameters per cell: the id list and the CASE of input hashes
+            for start in range(0, len(cells), ID_BATCH_SIZE // 3):
+                batch = cells[start:start + ID_BATCH_SIZE // 3]
+                changed = automatic.filter(
+                    property_name=prop,
+                    classification=old,
+                    matched_pair_id__in=[pair_id for pair_id, _ in batch]
+                ).update(
+                    classification=new,
+                    rule_version=version,
+                    input_hash=Case(
+                        *[When(matched_pair_id=pair_id, then=Value(digest)) for pair_id, digest in batch],
+                        default=F('input_hash')
+                    )
+                )
+                deltas[(session, prop, old)] -= changed
+                deltas[(session, prop, new)] += changed
+        for (prop, version), pair_ids in restamped.items():
+            for start in range(0, len(pair_ids), ID_BATCH_SIZE):
+                automatic.filter(
+                    property_name=prop,
+                    matched_pair_id__in=pair_ids[start:start + ID_BATCH_SIZE]
+                ).update(rule_version=version)
+        for (session, prop, old), pair_ids in cleared.items():
+            for start in range(0, len(pair_ids), ID_BATCH_SIZE):
+                removed, _ = automatic.filter(
+                    property_name=prop,
+                    classification=old,
+                    matched_pair_id__in=pair_ids[start:start + ID_BATCH_SIZE]
+                ).delete()
+                deltas[(session, prop, old)] -= removed
+        counters.apply_deltas(deltas)
+
+def _close_connections():
+    """Drop the database connections a forked worker inherited from its parent"""
+    connections.close_all()
+
+def parallel_scoring_available():
+    """Whether score_ranges can fork workers; fork is unavailable on Windows"""
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+def score_ranges(ranges, properties=PROPERTIES, full=True, workers=1):
+    """Yield score_range results, spread over a pool of forked processes when workers > 1
+
+    Without fork the ranges are scored in this process.
+    """
+    score = partial(score_range, properties=properties, full=full)
+    if workers <= 1 or not parallel_scoring_available():
+        yield from map(score, ranges)
+        return
+
+    # Children must open their own connections, never share the parent's
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('fork'),
+        initializer=_close_connections
+    ) as pool:
+        yield from pool.map(score, ranges)
+
+def rescore(workers=1, chunk_size=RESCORE_CHUNK_SIZE, dry_run=False, full=False):
+    """Bring the automatic classifications up to date with the current comparison rules
+
+    By default only the cells made under an outdated rule version (or marked
+    stale when an entry's values changed) are recomputed, and only the
+    properties that have such cells are read. ``full`` recomputes every
+    property of every pair. Workers only classify; the results are written
+    here, one transaction per chunk.
+
+    Returns a summary with the properties and number of pairs and cells
+    scored, the human cells kept, a Counter of (property, old, new) label
+    changes, the number of cells whose provenance alone was updated and the
+    elapsed time.
+    """
+    started = time.perf_counter()
+    properties = list(PROPERTIES) if full else stale_properties()
+    pair_count = human_count = restamped = 0
+    diff = Counter()
+
+    if properties:
+        ranges = pair_id_ranges(pairs_to_score(properties, full), chunk_size)
+        for pairs, human, changes in score_ranges(ranges, properties, full, workers):
+            pair_count += pairs
+            human_count += human
+            for change in changes:
+                if change.old == change.new:
+                    restamped += 1
+                else:
+                    diff[(change.property_name, change.old, change.new)] += 1
+            if changes and not dry_run:
+                apply_changes(changes)
+
+    if diff and not dry_run:
+        with transaction.atomic():
+            bump_data_version()
+
+    return {
+        'properties': properties,
+        'pairs': pair_count,
+        'cells': pair_count * len(properties),
+        'human': human_count,
+        'changes': diff,
+        'restamped': restamped,
+        'elapsed': time.perf_counter() - started,
+    }
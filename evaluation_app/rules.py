@@ -0,0 +1,125 @@
+import hashlib
+import math
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+from django.conf import settings
+from .properties import TEXT, get_property
+
+# How two numeric values of one property are judged to agree.
+# ``relative_tolerance`` is a percentage of |ground truth| and
+# ``absolute_tolerance`` a fixed margin; a single value matches when it is
+# within the larger of the two. With ``log_scale`` values are compared as
+# log10, so the absolute tolerance is in decades. Two ranges match when their
+# overlap covers ``min_overlap`` percent of the smaller one.
+ComparisonRule = namedtuple(
+    'ComparisonRule',
+    ['relative_tolerance', 'absolute_tolerance', 'log_scale', 'min_overlap']
+)
+
+TOLERANCE_PERCENT = 5
+MIN_RANGE_OVERLAP = 80
+
+# Default tolerance for properties compared on a log scale, in decades (~26%)
+LOG_TOLERANCE_DECADES = 0.1
+
+DEFAULT_RULE = ComparisonRule(float(TOLERANCE_PERCENT), 0.0, False, float(MIN_RANGE_OVERLAP))
+
+# Bump when the comparison logic itself changes so every stored automatic
+# classification is considered stale
+RULE_ENGINE_VERSION = 3
+
+_rules = {}
+
+def register_rule(property_name, relative_tolerance=TOLERANCE_PERCENT, absolute_tolerance=0.0,
+                  log_scale=False, min_overlap=MIN_RANGE_OVERLAP):
+    """Set the comparison rule of a property, replacing any previous one"""
+    if relative_tolerance < 0 or absolute_tolerance < 0:
+        raise ValueError('Tolerances must not be negative')
+    rule = ComparisonRule(float(relative_tolerance), float(absolute_tolerance), bool(log_scale), float(min_overlap))
+    _rules[property_name] = rule
+    return rule
+
+def get_rule(property_name):
+    """Return the rule of a property, the default rule if none is registered"""
+    return _rules.get(property_name, DEFAULT_RULE)
+
+def rule_version(property_name):
+    """Short fingerprint of how a property is compared right now
+
+    Stored with each automatic classification; a classification whose
+    version differs was made under another rule and needs rescoring.
+    """
+    try:
+        is_text = get_property(property_name).kind == TEXT
+    except KeyError:
+        is_text = False
+    spec = (RULE_ENGINE_VERSION, 'exact') if is_text else (RULE_ENGINE_VERSION, tuple(get_rule(property_name)))
+    return hashlib.blake2b(repr(spec).encode(), digest_size=8).hexdigest()
+
+def to_scale(value, rule):
+    """Map one number onto the rule's comparison scale; NaN if it has no log"""
+    if not rule.log_scale:
+        return value
+    return math.log10(value) if value > 0 else math.nan
+
+def _py_max(a, b):
+    """Element-wise equivalent of the builtin max(a, b), including NaN handling"""
+    return np.where(b > a, b, a)
+
+def _py_min(a, b):
+    """Element-wise equivalent of the builtin min(a, b), including NaN handling"""
+    return np.where(b < a, b, a)
+
+@lru_cache(maxsize=None)
+def compile_rule(rule):
+    """Compile a rule into a function matching two parsed columns element-wise
+
+    The function takes two columns with ``lower``, ``upper``, ``is_range`` and
+    ``numeric`` arrays and returns a boolean array, so a rule is applied to a
+    whole property column in one pass.
+    """
+    relative = rule.relative_tolerance / 100
+
+    def scale(values):
+        if not rule.log_scale:
+            return values
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.log10(np.where(values > 0, values, np.nan))
+
+    def match(gt, pred):
+        gt_lower, gt_upper = scale(gt.lower), scale(gt.upper)
+        pred_lower, pred_upper = scale(pred.lower), scale(pred.upper)
+
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            # Both ranges - overlap relative to the smaller range
+            overlap_start = _py_max(gt_lower, pred_lower)
+            overlap_end = _py_min(gt_upper, pred_upper)
+            smaller_range = _py_min(gt_upper - gt_lower, pred_upper - pred_lower)
+            has_overlap = ~(overlap_start >= overlap_end) & (smaller_range != 0)
+            overlap = np.where(has_overlap, (overlap_end - overlap_start) / smaller_range * 100, 0)
+            range_match = overlap >= rule.min_overlap
+
+            # One range and one single value - the value must fall inside the range
+            pred_in_gt = (gt_lower <= pred_lower) & (pred_lower <= gt_upper)
+            gt_in_pred = (pred_lower <= gt_lower) & (gt_lower <= pred_upper)
+
+            # Both single values - the larger of the absolute and relative tolerance
+            tolerance = _py_max(np.float64(rule.absolute_tolerance), np.abs(gt_lower) * relative)
+            value_match = np.abs(gt_lower - pred_lower) <= tolerance
+
+        matched = np.select(
+            [gt.is_range & pred.is_range, gt.is_range, pred.is_range],
+            [range_match, pred_in_gt, gt_in_pred],
+            value_match
+        )
+        return gt.numeric & pred.numeric & matched
+
+    return match
+
+register_rule('Diffusion Coefficient (m²/s)', relative_tolerance=0, absolute_tolerance=LOG_TOLERANCE_DECADES, log_scale=True)
+register_rule('Viscosity (Pa s)', relative_tolerance=0, absolute_tolerance=LOG_TOLERANCE_DECADES, log_scale=True)
+
+# Site-specific rules as {property_name: {option: value}}
+for name, options in getattr(settings, 'EVALUATION_COMPARISON_RULES', {}).items():
+    register_rule(name, **options)
@@ -0,0 +1,123 @@
+from collections import Counter, defaultdict
+from . import counters
+from .models import Classification, DataEntry, MatchedPair, PredictionRun, PropertyValue
+from .properties import NUMERIC, property_names
+from .teardown import delete_rows, run_steps
+
+DEFAULT_RUN_NAME = 'default'
+
+# Session key remembering the run shown on the matching and evaluation pages
+ACTIVE_RUN_SESSION_KEY = 'prediction_run_id'
+
+def get_active_run(request, session=None):
+    """Return the run of evaluation ``session`` the user is working on
+
+    A ``run`` query parameter switches runs and is remembered in the
+    session; without one the remembered run is used, falling back to the
+    newest run. None when the evaluation session has no run yet.
+    """
+    runs = PredictionRun.objects.filter(session=session)
+    run_id = request.GET.get('run') or request.session.get(ACTIVE_RUN_SESSION_KEY)
+    run = None
+    if run_id and str(run_id).isdigit():
+        run = runs.filter(id=run_id).first()
+    if run is None:
+        run = runs.order_by('-created_at', '-id').first()
+    if run is not None and request.session.get(ACTIVE_RUN_SESSION_KEY) != run.id:
+        request.session[ACTIVE_RUN_SESSION_KEY] = run.id
+    return run
+
+def run_choices(active_run):
+    """Runs of the active run's session for the run selector; no query without a run"""
+    if active_run is None:
+        return []
+    return PredictionRun.objects.filter(session=active_run.session_id).order_by('-created_at', '-id')
+
+def set_active_run(request, run):
+    """Make ``run`` the run later requests work on"""
+    request.session[ACTIVE_RUN_SESSION_KEY] = run.id
+
+def match_key(entry):
+    """Key under which a prediction can stand in for another run's prediction"""
+    return (entry.polymer_system, entry.force_field)
+
+def _raw(value):
+    """A raw value as the PropertyValue column stores it"""
+    return None if value is None else str(value)
+
+def record_key(polymer_system, force_field, values):
+    """Identity of a ground truth record: its system, force field and raw values"""
+    return (polymer_system, force_field, tuple(_raw(value) for value in values))
+
+def stored_ground_truth_keys(session=None):
+    """Count the record keys of a session's ground truth entries with two queries"""
+    names = property_names(NUMERIC)
+    values = defaultdict(dict)
+    for entry_id, name, raw in PropertyValue.objects.filter(
+        entry__session=session, entry__entry_type='ground_truth'
+    ).values_list('entry_id', 'property_name', 'raw').iterator(chunk_size=10000):
+        values[entry_id][name] = raw
+    return Counter(
+        record_key(polymer_system, force_field, [values[entry_id].get(name, 'NA') for name in names])
+        for entry_id, polymer_system, force_field in DataEntry.objects.filter(
+            session=session, entry_type='ground_truth'
+        ).values_list('id', 'polymer_system', 'force_field').iterator(chunk_size=10000)
+    )
+
+def new_ground_truth(items, session=None):
+    """Yield the ground truth records that are not stored in ``session`` yet
+
+    Records are compared by system, force field and raw values, as a
+    multiset: a file uploaded again adds nothing, while a record that occurs
+    more often than it is stored is added the missing number of times.
+    """
+    names = property_names(NUMERIC)
+    stored = stored_ground_truth_keys(session)
+    for item in items:
+        key = record_key(item['polymer_system'], item['force_field'], [item.get(name, 'NA') for name in names])
+        if stored[key]:
+            stored[key] -= 1
+            continue
+        yield item
+
+def clear_run(run):
+    """Delete the predictions of a run with their pairs and classifications
+
+    The counters are updated to match and the rows go with set-based
+    deletes. Returns {table: rows removed}; call inside a transaction.
+    """
+    counters.record_deleted(Classification.objects.filter(matched_pair__predicted__run=run))
+    return delete_rows(run_steps(run))
+
+def carry_over_matches(run):
+    """Match a run's predictions the way other runs matched the ground truth
+
+    For every ground truth entry that is matched in another run of the same
+    session but not yet in ``run``, the newest earlier match decides: an unmatched prediction of
+    ``run`` with the same polymer system and force field as that match is
+    paired with it. Ground truth marked as no match in ``run`` is skipped.
+    Returns the (ground_truth, predicted) entry pairs to create.
+    """
+    run_pairs = MatchedPair.objects.filter(predicted__run=run)
+    available = defaultdict(list)
+    for entry in DataEntry.objects.filter(
+        entry_type='predicted', run=run, marked_no_match=False
+    ).exclude(id__in=run_pairs.values('predicted_id')).order_by('id'):
+        available[match_key(entry)].append(entry)
+    if not available:
+        return []
+
+    earlier = MatchedPair.objects.filter(session=run.session_id).exclude(predicted__run=run).exclude(
+        ground_truth_id__in=run_pairs.values('ground_truth_id')
+    ).exclude(ground_truth__no_match_runs=run).select_related('ground_truth', 'predicted').order_by('-id')
+
+    matches = []
+    seen = set()
+    for pair in earlier.iterator(chunk_size=2000):
+        if pair.ground_truth_id in seen:
+            continue
+        seen.add(pair.ground_truth_id)
+        candidates = available.get(match_key(pair.predicted))
+        if candidates:
+            matches.append((pair.ground_truth, candidates.pop(0)))
+    return matches
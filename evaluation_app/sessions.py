@@ -0,0 +1,36 @@
+from .models import EvaluationSession
+
+# Session key remembering the evaluation session the user works in
+ACTIVE_SESSION_KEY = 'evaluation_session_id'
+
+# ``session`` query parameter value selecting the default session
+DEFAULT_SESSION_PARAM = 'default'
+
+def get_active_session(request):
+    """Return the evaluation session the user works in, None for the default session
+
+    A ``session`` query parameter switches sessions and is remembered in the
+    Django session. The default session costs no query.
+    """
+    session_id = request.GET.get('session')
+    if session_id == DEFAULT_SESSION_PARAM:
+        request.session.pop(ACTIVE_SESSION_KEY, None)
+        return None
+    if not session_id:
+        session_id = request.session.get(ACTIVE_SESSION_KEY)
+    if not session_id or not str(session_id).isdigit():
+        return None
+
+    session = EvaluationSession.objects.filter(id=session_id).first()
+    if session is None:
+        request.session.pop(ACTIVE_SESSION_KEY, None)
+    elif request.session.get(ACTIVE_SESSION_KEY) != session.id:
+        request.session[ACTIVE_SESSION_KEY] = session.id
+    return session
+
+def set_active_session(request, session):
+    """Make ``session`` (None for the default session) the one later requests work in"""
+    if session is None:
+        request.session.pop(ACTIVE_SESSION_KEY, None)
+    else:
+        request.session[ACTIVE_SESSION_KEY] = session.id
@@ -0,0 +1,80 @@
+import time
+from django.db import transaction
+from .models import (
+    Classification, ClassificationCounter, DataEntry, EvaluationSession, MatchedPair, PredictionRun,
+    PropertyValue
+)
+from .versions import bump_data_version
+
+# Rows of the ground truth "no match" marks per run
+NoMatchMark = DataEntry.no_match_runs.through
+
+def raw_delete(queryset):
+    """Delete the rows of a queryset with one DELETE statement and return how many went
+
+    Unlike QuerySet.delete() no row is loaded, collected or signalled in
+    Python, so callers must delete dependent rows first.
+    """
+    return queryset._raw_delete(queryset.db)
+
+def delete_rows(steps):
+    """Run (label, queryset) deletes in the given order, returning {label: rows removed}"""
+    return {label: raw_delete(queryset) for label, queryset in steps}
+
+def session_steps(session):
+    """Deletes removing all data of one session, dependent rows first"""
+    entries = DataEntry.objects.filter(session=session)
+    return [
+        ('classifications', Classification.objects.filter(session=session)),
+        ('counters', ClassificationCounter.objects.filter(session=session)),
+        ('pairs', MatchedPair.objects.filter(session=session)),
+        ('no_match_marks', NoMatchMark.objects.filter(dataentry_id__in=entries.values('id'))),
+        ('property_values', PropertyValue.objects.filter(entry_id__in=entries.values('id'))),
+        ('entries', entries),
+        ('runs', PredictionRun.objects.filter(session=session)),
+    ]
+
+def table_steps():
+    """Deletes emptying every evaluation table, the sessions included"""
+    return [
+        ('classifications', Classification.objects.all()),
+        ('counters', ClassificationCounter.objects.all()),
+        ('pairs', MatchedPair.objects.all()),
+        ('no_match_marks', NoMatchMark.objects.all()),
+        ('property_values', PropertyValue.objects.all()),
+        ('entries', DataEntry.objects.all()),
+        ('runs', PredictionRun.objects.all()),
+        ('sessions', EvaluationSession.objects.all()),
+    ]
+
+def run_steps(run):
+    """Deletes removing one run's predictions with their pairs, classifications and no-match marks
+
+    The run's counters are not touched; uncount the classifications first.
+    """
+    entries = DataEntry.objects.filter(entry_type='predicted', run=run)
+    pairs = MatchedPair.objects.filter(predicted__run=run)
+    return [
+        ('classifications', Classification.objects.filter(matched_pair_id__in=pairs.values('id'))),
+        ('pairs', pairs),
+        ('no_match_marks', NoMatchMark.objects.filter(predictionrun=run)),
+        ('property_values', PropertyValue.objects.filter(entry_id__in=entries.values('id'))),
+        ('entries', entries),
+    ]
+
+def teardown(session=None, everything=False):
+    """Delete the data of one session, or with ``everything`` of every session
+
+    All deletes run set-based in one transaction, which also bumps the data
+    version. Returns a summary with the rows removed per table, their total
+    and the elapsed time.
+    """
+    started = time.perf_counter()
+    with transaction.atomic():
+        rows = delete_rows(table_steps() if everything else session_steps(session))
+        bump_data_version()
+    return {
+        'rows': rows,
+        'total': sum(rows.values()),
+        'elapsed': time.perf_counter() - started,
+    }
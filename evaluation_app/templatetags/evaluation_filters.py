@@ -7,6 +7,11 @@ def get_item(dictionary, key):
     """Get item from dictionary by key"""
     return dictionary.get(key)
 
+@register.filter
+def property_display(entry, property_name):
+    """Display value of a registered property of a data entry"""
+    return entry.get_display_value(property_name)
+
 @register.filter
 def multiply(value, arg):
     """Multiply the value by the argument"""
@@ -23,4 +28,4 @@ def divide(value, arg):
             return 0
         return int(value) / int(arg)
     except (ValueError, TypeError):
-        return 0 
\ No newline at end of file
+        return 0 
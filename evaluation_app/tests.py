@@ -1,3 +1,1078 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import tempfile
+from io import BytesIO, StringIO
+from itertools import product
+from unittest import mock, skipUnless
+import numpy as np
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .assignment import greedy_assignment, optimal_assignment, optimal_assignment_available
+from .candidates import CandidateIndex
+from .comparison import (
+    CODE_LABELS, PROPERTIES, classify_pairs, compare_columns, perform_automatic_comparison
+)
+from .counters import apply_deltas, counter_matrices, find_mismatches, rebuild_counters
+from .exporters import columnar_export_available
+from .ingestion import RecordFormatError, RecordStream, bulk_load_entries, iter_json_array, iter_json_lines
+from .metrics import bootstrap_intervals, calculate_metrics, pair_label_counts, property_intervals
+from .models import (
+    Classification, ClassificationCounter, DataEntry, DataVersion, EvaluationSession, MatchedPair,
+    PredictionRun, PropertyValue, load_property_values
+)
+from .parsing import (
+    APPROX, DENSITY, INVALID, MODULUS, NA, RANGE, TEMPERATURE, UNCERTAIN, VALUE, VISCOSITY, parse_column,
+    parse_quantity
+)
+from .properties import NUMERIC, property_by_slug, property_names
+from .rescoring import apply_changes, parallel_scoring_available, rescore, score_range
+from .rules import ComparisonRule, register_rule, rule_version
+from .versions import get_data_version
+from .views import create_automatic_classifications_for_pairs
 
-# Create your tests here.
+# Raw values covering NA handling, ranges, tolerance edges and unparseable strings
+EDGE_VALUES = [
+    'NA', None, '', 'abc', '0', '0.0', '1', '1.0', '1.04', '1.06', '-5', '-5.1',
+    '1e-9', '1.2e-9', '2.5e-9', '1e-10', '1e-9-2e-9', 'nan', 'inf', ' 2 ', '600', '650', '600-700', '610-690',
+    '650-800', '700-600', '600-600', '0-0', '5-nan', '1-2-3', '-1-2',
+    '650 ± 50', '~600', '600–700', '1.2×10^-9', '326.85 °C', '1200 kg/m3', '5 bananas',
+]
+
+def make_entry(entry_type, value):
+    """Build an unsaved entry with the same value in every property"""
+    entry = DataEntry(entry_type=entry_type, polymer_system=value, force_field=value)
+    entry.set_property_values(dict.fromkeys(property_names(NUMERIC), value))
+    return entry
+
+def create_entry(entry_type, polymer_system, force_field='OPLS-AA', **values):
+    """Save an entry with numeric values given by property slug, e.g. density='1.2'"""
+    entry = DataEntry(entry_type=entry_type, polymer_system=polymer_system, force_field=force_field)
+    entry.set_property_values({property_by_slug(slug).name: value for slug, value in values.items()})
+    entry.save()
+    return entry
+
+class BatchComparisonTests(SimpleTestCase):
+    def test_batch_engine_matches_per_pair_rules(self):
+        pairs = [
+            MatchedPair(ground_truth=make_entry('ground_truth', gt), predicted=make_entry('predicted', pred))
+            for gt, pred in product(EDGE_VALUES, repeat=2)
+        ]
+        codes = classify_pairs(pairs)
+
+        for prop in PROPERTIES:
+            for pair, code in zip(pairs, codes[prop]):
+                expected = perform_automatic_comparison(pair, prop)
+                self.assertEqual(
+                    CODE_LABELS[code], expected,
+                    f'{prop}: {pair.ground_truth.polymer_system!r} vs {pair.predicted.polymer_system!r}'
+                )
+
+    def test_raw_and_ingest_parsed_columns_agree(self):
+        gt_values, pred_values = zip(*product(EDGE_VALUES, repeat=2))
+        pairs = [
+            MatchedPair(ground_truth=make_entry('ground_truth', gt), predicted=make_entry('predicted', pred))
+            for gt, pred in zip(gt_values, pred_values)
+        ]
+        codes = classify_pairs(pairs)
+
+        for prop in PROPERTIES:
+            self.assertEqual(list(compare_columns(prop, gt_values, pred_values)), list(codes[prop]))
+
+def chunked(text, size):
+    """Split text into chunks of ``size`` characters, as an upload is read"""
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+class RecordParserTests(SimpleTestCase):
+    RECORDS = [
+        {'polymer_system': 'PS', 'force_field': 'OPLS-AA', 'Density (g/cm³)': '1.05'},
+        {'polymer_system': 'PMMA "atactic"', 'force_field': 'GAFF', 'note': '[, ]\\', 'n': [1, -2.5e-3, None]},
+        {'polymer_system': 'PE', 'force_field': 'TraPPE', 'Viscosity (Pa s)': 12345},
+    ]
+
+    def test_any_chunking_gives_the_same_records(self):
+        array = json.dumps(self.RECORDS, indent=1, ensure_ascii=False)
+        lines = '\n'.join(json.dumps(record, ensure_ascii=False) for record in self.RECORDS) + '\n\n'
+        numbers = ' [ 123 , -4.5e6 , "x" , true , null ] '
+        for size in (1, 2, 3, len(array)):
+            self.assertEqual(list(iter_json_array(chunked(array, size))), self.RECORDS, size)
+            self.assertEqual(list(iter_json_lines(chunked(lines, size))), self.RECORDS, size)
+            self.assertEqual(list(iter_json_array(chunked(numbers, size))), json.loads(numbers), size)
+
+    def test_malformed_arrays_are_rejected(self):
+        for text in ['[{"a": 1}] x', '[{"a": 1}]]', '[1,]', '[,1]', '[1 2]', '[{"a": 1}', '{"a": 1}', '']:
+            for size in (1, 3):
+                with self.assertRaises(RecordFormatError, msg=(text, size)):
+                    list(iter_json_array(chunked(text, size)))
+
+    def test_malformed_lines_name_the_line(self):
+        with self.assertRaisesMessage(RecordFormatError, 'line 3'):
+            list(iter_json_lines(chunked('{"a": 1}\n\n{"a": \n', 2)))
+
+    def test_oversized_records_are_rejected(self):
+        record = json.dumps({'polymer_system': 'x' * 100, 'force_field': 'y'})
+        with mock.patch('evaluation_app.ingestion.MAX_RECORD_SIZE', 50):
+            with self.assertRaises(RecordFormatError):
+                list(iter_json_array(chunked(f'[{record}]', 10)))
+            with self.assertRaisesMessage(RecordFormatError, 'Line 1 is too long'):
+                list(iter_json_lines(chunked(record, 10)))
+
+    def test_json_file_starting_with_an_object_is_read_as_lines(self):
+        lines = '\n'.join(json.dumps(record) for record in self.RECORDS)
+        for text in [lines, '  \n' + lines, json.dumps(self.RECORDS)]:
+            upload = SimpleUploadedFile('records.json', text.encode())
+            self.assertEqual(list(RecordStream(upload)), self.RECORDS)
+
+    def test_records_need_the_entry_fields(self):
+        upload = SimpleUploadedFile('records.jsonl', b'{"polymer_system": "PS", "force_field": "GAFF"}\n[1]\n')
+        with self.assertRaisesMessage(RecordFormatError, 'Item 2: each item must be an object'):
+            list(RecordStream(upload))
+
+class UploadTests(TestCase):
+    def records(self, count, prefix='PS'):
+        return [
+            {'polymer_system': f'{prefix} {i}', 'force_field': 'OPLS-AA', 'Density (g/cm³)': f'1.{i}'}
+            for i in range(count)
+        ]
+
+    def upload(self, ground_truth, predictions):
+        return self.client.post(reverse('index'), {
+            'run_name': 'v1',
+            'ground_truth_file': SimpleUploadedFile('gt.json', json.dumps(ground_truth).encode()),
+            'predicted_file': SimpleUploadedFile('pred.json', json.dumps(predictions).encode()),
+        }, follow=True)
+
+    def test_records_are_inserted_in_batches(self):
+        with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+            total = bulk_load_entries('ground_truth', self.records(5), batch_size=2)
+        self.assertEqual(total, 5)
+        entry_inserts = [query for query in queries.captured_queries if 'INSERT INTO "evaluation_app_dataentry"' in query['sql']]
+        self.assertEqual(len(entry_inserts), 3)
+        self.assertEqual(PropertyValue.objects.count(), 5 * len(property_names(NUMERIC)))
+        self.assertEqual(DataEntry.objects.get(polymer_system='PS 3').get_property_value('Density (g/cm³)'), '1.3')
+
+    @override_settings(EVALUATION_INGEST_BATCH_SIZE=2)
+    def test_upload_reports_rows_per_second(self):
+        response = self.upload(self.records(5), self.records(5))
+        [success] = [str(message) for message in response.context['messages'] if message.level_tag == 'success']
+        self.assertRegex(success, r'^Successfully loaded 5 new ground truth and 5 predicted entries in [\d.]+s \([\d,]+ rows/s\)\.$')
+        self.assertEqual(DataEntry.objects.count(), 10)
+
+    @override_settings(EVALUATION_INGEST_BATCH_SIZE=2)
+    def test_a_bad_record_rolls_back_the_whole_upload(self):
+        predictions = self.records(6)
+        del predictions[4]['force_field']
+        response = self.upload(self.records(5), predictions)
+
+        errors = [str(message) for message in response.context['messages'] if message.level_tag == 'error']
+        self.assertEqual(len(errors), 1)
+        self.assertIn('Item 5', errors[0])
+        # The ground truth and the first batches of predictions are gone too
+        for model in (DataEntry, PropertyValue, PredictionRun):
+            self.assertFalse(model.objects.exists(), model)
+
+class ValueParserTests(SimpleTestCase):
+    def assertParses(self, raw, lo, hi, kind, dimension=None):
+        quantity = parse_quantity(raw, dimension)
+        self.assertEqual(quantity.kind, kind, raw)
+        self.assertAlmostEqual(quantity.lo, lo, msg=raw)
+        self.assertAlmostEqual(quantity.hi, hi, msg=raw)
+
+    def test_notations(self):
+        self.assertParses('1.2e-9', 1.2e-9, 1.2e-9, VALUE)
+        self.assertParses('1.2×10^-9', 1.2e-9, 1.2e-9, VALUE)
+        self.assertParses('1.2 x 10⁻⁹', 1.2e-9, 1.2e-9, VALUE)
+        self.assertParses('1e-9-2e-9', 1e-9, 2e-9, RANGE)
+        self.assertParses('600 – 700', 600, 700, RANGE)
+        self.assertParses('-5--3', -5, -3, RANGE)
+        self.assertParses('550 ± 20', 530, 570, UNCERTAIN)
+        self.assertParses('550 +/- 20 K', 530, 570, UNCERTAIN, TEMPERATURE)
+        self.assertParses('~600', 600, 600, APPROX)
+
+    def test_units_convert_to_the_property_unit(self):
+        self.assertParses('326.85 °C', 600, 600, VALUE, TEMPERATURE)
+        self.assertParses('1200 kg/m³', 1.2, 1.2, VALUE, DENSITY)
+        self.assertParses('2 mPa·s', 0.002, 0.002, VALUE, VISCOSITY)
+        self.assertParses('5 MPa', 0.005, 0.005, VALUE, MODULUS)
+
+    def test_units_of_another_dimension_are_invalid(self):
+        self.assertEqual(parse_quantity('600 K', DENSITY).kind, INVALID)
+        self.assertEqual(parse_quantity('1.2 nm', TEMPERATURE).kind, INVALID)
+        self.assertEqual(parse_quantity('600 K').kind, INVALID)
+        self.assertEqual(PropertyValue.parse(None, 'Density (g/cm³)', '1.05 K').lower, None)
+        self.assertEqual(
+            CODE_LABELS[compare_columns('Glass Transition Temperature (K)', ['1.2'], ['1.2 nm'])[0]], 'FN'
+        )
+
+    def test_missing_and_invalid(self):
+        self.assertEqual(parse_quantity('NA').kind, NA)
+        self.assertEqual(parse_quantity(None).kind, NA)
+        for raw in ['', 'abc', '5 bananas', '1-2-3', '5-nan']:
+            self.assertEqual(parse_quantity(raw).kind, INVALID, raw)
+
+    def test_column_matches_single_values(self):
+        values = ['650 ± 50', 'NA', '~600', '650 ± 50', 'abc']
+        lo, hi, kind = parse_column(values)
+        self.assertEqual(list(kind), [parse_quantity(value).kind for value in values])
+        self.assertEqual(list(lo[[0, 3]]), [600, 600])
+        self.assertEqual(list(hi[[0, 2]]), [700, 600])
+
+class ComparisonRuleTests(SimpleTestCase):
+    def classify(self, prop, gt, pred, rule=None):
+        return CODE_LABELS[compare_columns(prop, [gt], [pred], rule)[0]]
+
+    def test_relative_tolerance_uses_the_magnitude_of_negative_values(self):
+        self.assertEqual(self.classify('Density (g/cm³)', '-5', '-5.2'), 'TP')
+        self.assertEqual(self.classify('Density (g/cm³)', '-5', '-5.3'), 'FN')
+        self.assertEqual(self.classify('Density (g/cm³)', '-5', '5'), 'FN')
+
+    def test_log_scale_properties_compare_orders_of_magnitude(self):
+        diffusion = 'Diffusion Coefficient (m²/s)'
+        self.assertEqual(self.classify(diffusion, '1e-9', '1.2e-9'), 'TP')
+        self.assertEqual(self.classify(diffusion, '1e-9', '2.5e-9'), 'FN')
+        self.assertEqual(self.classify(diffusion, '1e-9', '-1e-9'), 'FN')
+
+    def test_rule_overrides_rescore_a_column(self):
+        gt, pred = ['1.00', '1.00', '600-700'], ['1.04', '1.10', '660-760']
+        loose = ComparisonRule(relative_tolerance=0, absolute_tolerance=0.15, log_scale=False, min_overlap=30)
+        pairs = [
+            MatchedPair(ground_truth=make_entry('ground_truth', g), predicted=make_entry('predicted', p))
+            for g, p in zip(gt, pred)
+        ]
+
+        self.assertEqual([CODE_LABELS[c] for c in compare_columns('Density (g/cm³)', gt, pred)], ['TP', 'FN', 'FN'])
+        codes = classify_pairs(pairs, ['Density (g/cm³)'], rules={'Density (g/cm³)': loose})
+        self.assertEqual([CODE_LABELS[c] for c in codes['Density (g/cm³)']], ['TP', 'TP', 'TP'])
+
+class PropertyValueTests(TestCase):
+    def test_values_are_stored_as_parsed_rows_and_loaded_in_one_query(self):
+        entries = [create_entry('ground_truth', f'PS {i}', density='1.2', glass_transition_temp='600-700') for i in range(3)]
+
+        self.assertEqual(PropertyValue.objects.count(), 3 * len(property_names(NUMERIC)))
+        stored = PropertyValue.objects.get(entry=entries[0], property_name='Glass Transition Temperature (K)')
+        self.assertEqual((stored.lower, stored.upper, stored.is_na, stored.is_range), (600.0, 700.0, False, True))
+
+        fresh = list(DataEntry.objects.order_by('id'))
+        with self.assertNumQueries(1):
+            load_property_values(fresh)
+            self.assertEqual([entry.get_property_value('Density (g/cm³)') for entry in fresh], ['1.2'] * 3)
+            self.assertEqual(fresh[0].get_parsed_value('Viscosity (Pa s)'), ('NA', None, None, True, False))
+            self.assertEqual(fresh[0].get_display_value('force_field'), 'OPLS-AA')
+
+class CandidateIndexTests(SimpleTestCase):
+    def test_partial_names_find_their_candidates(self):
+        names = ['Kapton (PMDA-ODA)', 'Polystyrene', 'Poly(methyl methacrylate)', 'Nylon-6,6', 'Polyéthylène']
+        predicted = [
+            DataEntry(id=i, entry_type='predicted', polymer_system=name, force_field='OPLS-AA')
+            for i, name in enumerate(names)
+        ]
+        index = CandidateIndex(predicted)
+
+        def best(name, force_field='OPLS-AA'):
+            gt = DataEntry(entry_type='ground_truth', polymer_system=name, force_field=force_field)
+            return index.query(gt, k=1)[0][1].polymer_system
+
+        self.assertEqual(best('Kapton'), 'Kapton (PMDA-ODA)')
+        self.assertEqual(best('polystyrene'), 'Polystyrene')
+        self.assertEqual(best('PMMA poly methyl methacrylate', 'GAFF'), 'Poly(methyl methacrylate)')
+        self.assertEqual(best('Polyethylene'), 'Polyéthylène')
+        self.assertEqual(index.query(DataEntry(polymer_system='', force_field='')), [])
+
+class EvaluationViewQueryTests(TestCase):
+    def create_pairs(self, count):
+        for i in range(count):
+            gt = create_entry(
+                'ground_truth', f'Polymer {i}',
+                density='1.20', glass_transition_temp='600-700'
+            )
+            pred = create_entry(
+                'predicted', f'Polymer {i} (pred)',
+                density='1.21', glass_transition_temp='650'
+            )
+            MatchedPair.objects.create(ground_truth=gt, predicted=pred)
+
+    def count_queries(self, url_name='evaluation'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        # Django splits bulk inserts by the SQLite parameter limit, so count one per statement kind
+        inserts = {query['sql'].split(' (')[0] for query in queries if query['sql'].startswith('INSERT')}
+        return len([query for query in queries if not query['sql'].startswith('INSERT')]) + len(inserts)
+
+    def test_query_count_is_independent_of_pair_count(self):
+        self.create_pairs(2)
+        first_load_small = self.count_queries()
+        reload_small = self.count_queries()
+
+        # More pairs than fit on one page
+        self.create_pairs(40)
+        Classification.objects.all().delete()
+        ClassificationCounter.objects.all().delete()
+        DataVersion.objects.all().delete()
+        first_load_large = self.count_queries()
+        reload_large = self.count_queries()
+
+        self.assertEqual(first_load_small, first_load_large)
+        self.assertEqual(reload_small, reload_large)
+        # Active run, pair total, one page of pairs, their property values and classifications
+        self.assertEqual(reload_large, 5)
+        self.assertEqual(self.count_queries('evaluation_pairs'), 4)
+
+    def test_missing_classifications_are_created_once(self):
+        self.create_pairs(3)
+        self.client.get(reverse('evaluation'))
+        version = get_data_version()
+        with mock.patch('evaluation_app.views.classify_pairs', wraps=classify_pairs) as classify:
+            self.client.get(reverse('evaluation'))
+
+        # Cells left for human review are not retried and reloading writes nothing
+        classify.assert_not_called()
+        self.assertEqual(get_data_version(), version)
+
+        # polymer_system differs between GT and prediction, so it stays unclassified
+        self.assertEqual(Classification.objects.count(), 3 * (len(PROPERTIES) - 1))
+        self.assertFalse(Classification.objects.filter(property_name='polymer_system').exists())
+
+    def test_pairs_api_pages_with_a_cursor(self):
+        self.create_pairs(30)
+        url = reverse('evaluation_pairs')
+
+        first = self.client.get(url, {'limit': 20}).json()
+        second = self.client.get(url, {'limit': 20, 'after': first['next_cursor']}).json()
+
+        self.assertEqual(first['count'], 20)
+        self.assertEqual(second['count'], 10)
+        self.assertIsNone(second['next_cursor'])
+
+    def test_pairs_api_filters(self):
+        self.create_pairs(3)
+        url = reverse('evaluation_pairs')
+        self.client.get(url)
+
+        unclassified = self.client.get(url, {'property': 'polymer_system', 'unclassified': '1'}).json()
+        true_positives = self.client.get(url, {'property': 'Density (g/cm³)', 'classification': 'TP'}).json()
+        false_positives = self.client.get(url, {'classification': 'FP'}).json()
+
+        self.assertEqual(unclassified['count'], 3)
+        self.assertEqual(true_positives['count'], 3)
+        self.assertEqual(false_positives['count'], 0)
+        self.assertEqual(self.client.get(url, {'property': 'Colour'}).status_code, 400)
+
+class StatisticsViewTests(TestCase):
+    def setUp(self):
+        # Versions restart in every test, so cached pages would leak between them
+        cache.clear()
+        gt = DataEntry.objects.create(entry_type='ground_truth', polymer_system='PS', force_field='OPLS-AA')
+        for i, labels in enumerate([('TP', 'FN'), ('TP', 'TN'), ('FP', 'TN')]):
+            pred = DataEntry.objects.create(entry_type='predicted', polymer_system=f'PS {i}', force_field='OPLS-AA')
+            pair = MatchedPair.objects.create(ground_truth=gt, predicted=pred)
+            Classification.objects.create(matched_pair=pair, property_name='Density (g/cm³)', classification=labels[0])
+            Classification.objects.create(matched_pair=pair, property_name='Viscosity (Pa s)', classification=labels[1])
+        other = DataEntry.objects.create(entry_type='ground_truth', polymer_system='PE', force_field='TraPPE')
+        pred = DataEntry.objects.create(entry_type='predicted', polymer_system='PE', force_field='TraPPE')
+        pair = MatchedPair.objects.create(ground_truth=other, predicted=pred)
+        Classification.objects.create(matched_pair=pair, property_name='Density (g/cm³)', classification='FN')
+        rebuild_counters()
+
+    def test_statistics_are_read_from_grouped_counts(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('statistics'))
+
+        self.assertEqual(response.context['stats'], {'TP': 2, 'FP': 1, 'TN': 2, 'FN': 2})
+        self.assertAlmostEqual(response.context['precision'], 2 / 3)
+        density, viscosity = response.context['property_stats']
+        self.assertEqual(density['counts'], {'TP': 2, 'FP': 1, 'TN': 0, 'FN': 1})
+        self.assertEqual(viscosity['metrics']['recall'], 0)
+
+    def test_force_field_metrics(self):
+        opls, trappe = self.client.get(reverse('statistics')).context['force_field_stats']
+        self.assertEqual((opls['force_field'], opls['total']), ('OPLS-AA', 6))
+        self.assertEqual(opls['counts'], {'TP': 2, 'FP': 1, 'TN': 2, 'FN': 1})
+        density_f1 = opls['property_f1'][PROPERTIES.index('Density (g/cm³)')]
+        self.assertAlmostEqual(density_f1, 0.8)
+        self.assertIsNone(opls['property_f1'][PROPERTIES.index('polymer_system')])
+        self.assertEqual(trappe['metrics']['recall'], 0)
+
+    def test_bootstrap_intervals(self):
+        overall = pair_label_counts()
+        self.assertEqual(overall.shape, (4, 4))
+        self.assertEqual(overall.sum(axis=0).tolist(), [2, 1, 2, 2])
+
+        intervals = bootstrap_intervals(overall)
+        for metric, value in calculate_metrics(2, 1, 2, 2).items():
+            low, high = intervals[metric]
+            self.assertLessEqual(low, value)
+            self.assertGreaterEqual(high, value)
+        self.assertEqual(bootstrap_intervals(overall), intervals)
+        self.assertIsNone(bootstrap_intervals([]))
+
+        # Per property the label totals give the same intervals as the per-pair rows
+        density = np.array([[1, 0, 0, 0], [1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
+        self.assertEqual(
+            property_intervals({'TP': 2, 'FP': 1, 'TN': 0, 'FN': 1}, 4), bootstrap_intervals(density)
+        )
+
+        # The page itself leaves the intervals to a separate request
+        self.assertNotIn('intervals', self.client.get(reverse('statistics')).context)
+        data = self.client.get(reverse('statistics_intervals')).json()
+        self.assertEqual(data['overall'], {metric: list(bounds) for metric, bounds in intervals.items()})
+        self.assertEqual(set(data['properties']), {'Density (g/cm³)', 'Viscosity (Pa s)'})
+
+    def test_bootstrap_matches_resampling_pairs(self):
+        rng = np.random.default_rng(1)
+        counts = np.eye(4, dtype=np.int32)[rng.integers(0, 4, 300)]
+        low, high = bootstrap_intervals(counts)['f1_score']
+        # Reference: resample pair indices directly
+        samples = counts[rng.integers(0, len(counts), (2000, len(counts)))].sum(axis=1)
+        f1 = [calculate_metrics(*row)['f1_score'] for row in samples]
+        reference_low, reference_high = np.quantile(f1, [0.025, 0.975])
+        self.assertAlmostEqual(low, reference_low, delta=0.02)
+        self.assertAlmostEqual(high, reference_high, delta=0.02)
+
+    def test_cached_until_the_data_version_changes(self):
+        self.client.get(reverse('statistics'))
+        # Only the data version and the active run are read
+        with self.assertNumQueries(2):
+            self.client.get(reverse('statistics'))
+
+        pair = MatchedPair.objects.get(ground_truth__force_field='TraPPE')
+        self.client.post(
+            reverse('save_classification'),
+            json.dumps({'pair_id': pair.id, 'property_name': 'Density (g/cm³)', 'classification': 'TP'}),
+            content_type='application/json'
+        )
+        response = self.client.get(reverse('statistics'))
+        self.assertEqual(response.context['stats']['TP'], 3)
+
+class ClassificationCounterTests(TestCase):
+    def post_json(self, url_name, data):
+        response = self.client.post(reverse(url_name), json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_default_session_rows_are_unique(self):
+        ClassificationCounter.objects.create(property_name='Density (g/cm³)', classification='TP', count=1)
+        PredictionRun.objects.create(name='v1')
+        for model, fields in [
+            (ClassificationCounter, {'property_name': 'Density (g/cm³)', 'classification': 'TP'}),
+            (PredictionRun, {'name': 'v1'}),
+        ]:
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                model.objects.create(**fields)
+
+        # A counter another request created meanwhile is updated, not duplicated
+        with mock.patch('django.db.models.query.QuerySet.update', side_effect=[0, 1]) as update:
+            apply_deltas({(None, 'Density (g/cm³)', 'TP'): 2})
+        self.assertEqual(update.call_count, 2)
+        self.assertEqual(ClassificationCounter.objects.filter(session=None).count(), 1)
+
+    def test_counters_follow_every_write_endpoint(self):
+        entries = {}
+        for i in range(3):
+            for entry_type, density in [('ground_truth', '1.20'), ('predicted', 'NA')]:
+                entries[entry_type, i] = create_entry(entry_type, f'PS {i}', density=density)
+        pair_ids = [
+            self.post_json('create_pair', {
+                'ground_truth_id': entries['ground_truth', i].id,
+                'predicted_id': entries['predicted', i].id,
+            })['pair_id']
+            for i in range(3)
+        ]
+        self.assertEqual(find_mismatches(), [])
+
+        self.post_json('save_classification', {
+            'pair_id': pair_ids[0], 'property_name': 'Density (g/cm³)', 'classification': 'TP'
+        })
+        self.post_json('save_classification', {
+            'pair_id': pair_ids[0], 'property_name': 'Radius of Gyration (nm)', 'classification': 'FP'
+        })
+        self.assertEqual(find_mismatches(), [])
+
+        self.post_json('delete_pair', {'pair_id': pair_ids[1]})
+        self.post_json('delete_entry', {'entry_id': entries['predicted', 2].id})
+        self.assertEqual(find_mismatches(), [])
+
+        call_command('rebuild_counters', '--verify', stdout=StringIO())
+
+    def test_rebuild_drops_cached_statistics(self):
+        cache.clear()
+        gt = create_entry('ground_truth', 'PS', density='1.20')
+        pred = create_entry('predicted', 'PS', density='1.20')
+        create_automatic_classifications_for_pairs([MatchedPair.objects.create(ground_truth=gt, predicted=pred)])
+        self.client.get(reverse('statistics'))
+        # Rows changed without going through the views, as before a rebuild
+        Classification.objects.update(classification='FN')
+        self.assertEqual(self.client.get(reverse('statistics')).context['stats']['FN'], 0)
+
+        call_command('rebuild_counters', stdout=StringIO())
+        self.assertEqual(self.client.get(reverse('statistics')).context['stats']['FN'], Classification.objects.count())
+
+class RescoreTests(TestCase):
+    def test_rescore_restores_automatic_cells_and_keeps_human_ones(self):
+        pairs = []
+        for i in range(4):
+            gt = create_entry('ground_truth', f'PS {i}', density='1.20')
+            pred = create_entry('predicted', f'PS {i}', density='1.21')
+            pairs.append(MatchedPair.objects.create(ground_truth=gt, predicted=pred))
+        create_automatic_classifications_for_pairs(pairs)
+        density = 'Density (g/cm³)'
+        # A stale automatic cell, a missing one and a human decision
+        Classification.objects.filter(matched_pair=pairs[0], property_name=density).update(classification='FN')
+        Classification.objects.filter(matched_pair=pairs[1], property_name=density).delete()
+        response = self.client.post(reverse('save_classification'), json.dumps({
+            'pair_id': pairs[2].id, 'property_name': density, 'classification': 'FP'
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        rebuild_counters()
+
+        out = StringIO()
+        call_command('rescore', workers=1, chunk_size=3, full=True, dry_run=True, stdout=out)
+        self.assertIn('Would change 2 classification(s)', out.getvalue())
+        self.assertEqual(Classification.objects.get(matched_pair=pairs[0], property_name=density).classification, 'FN')
+
+        out = StringIO()
+        call_command('rescore', workers=1, chunk_size=3, full=True, stdout=out)
+        self.assertIn(f'{density}: FN -> TP  1', out.getvalue())
+        self.assertIn(f'{density}: - -> TP  1', out.getvalue())
+        self.assertIn('Kept 1 human classification(s)', out.getvalue())
+
+        labels = dict(Classification.objects.filter(property_name=density).values_list('matched_pair_id', 'classification'))
+        self.assertEqual([labels[pair.id] for pair in pairs], ['TP', 'TP', 'FP', 'TP'])
+        self.assertEqual(Classification.objects.get(matched_pair=pairs[2], property_name=density).source, Classification.HUMAN)
+        self.assertEqual(find_mismatches(), [])
+
+    def test_incremental_rescore_only_touches_outdated_cells(self):
+        density = 'Density (g/cm³)'
+        pairs = []
+        for i in range(4):
+            gt = create_entry('ground_truth', f'PS {i}', density='1.20', viscosity='1e-3')
+            pred = create_entry('predicted', f'PS {i}', density='1.21', viscosity='1e-3')
+            pairs.append(MatchedPair.objects.create(ground_truth=gt, predicted=pred))
+        create_automatic_classifications_for_pairs(pairs)
+        self.assertEqual(rescore()['properties'], [])
+
+        register_rule(density, relative_tolerance=0, absolute_tolerance=0.001)
+        self.addCleanup(register_rule, density)
+        untouched = dict(Classification.objects.exclude(property_name=density).values_list('id', 'rule_version'))
+        summary = rescore()
+
+        self.assertEqual(summary['properties'], [density])
+        self.assertEqual(summary['changes'], {(density, 'TP', 'FN'): 4})
+        self.assertEqual(dict(Classification.objects.exclude(property_name=density).values_list('id', 'rule_version')), untouched)
+        self.assertEqual(set(Classification.objects.filter(property_name=density).values_list('rule_version', flat=True)), {rule_version(density)})
+        self.assertEqual(rescore()['properties'], [])
+
+        # New values for one entry make only its pair's automatic cells stale
+        entry = pairs[0].predicted
+        entry.set_property_values({density: '1.20', 'Viscosity (Pa s)': '1e-3'})
+        entry.save()
+        summary = rescore()
+        self.assertEqual(summary['pairs'], 1)
+        self.assertEqual(summary['changes'], {(density, 'FN', 'TP'): 1})
+        self.assertEqual(find_mismatches(), [])
+
+    def test_labels_saved_after_scoring_are_kept(self):
+        density = 'Density (g/cm³)'
+        pairs = []
+        for i in range(2):
+            gt = create_entry('ground_truth', f'PS {i}', density='1.20')
+            pred = create_entry('predicted', f'PS {i}', density='1.21')
+            pairs.append(MatchedPair.objects.create(ground_truth=gt, predicted=pred))
+        create_automatic_classifications_for_pairs(pairs)
+        Classification.objects.filter(matched_pair=pairs[1], property_name=density).delete()
+        rebuild_counters()
+        register_rule(density, relative_tolerance=0, absolute_tolerance=0.001)
+        self.addCleanup(register_rule, density)
+
+        _, _, changes = score_range((pairs[0].id, pairs[1].id), [density])
+        # A reviewer labels both cells before the rescored chunk is written
+        for pair in pairs:
+            self.client.post(reverse('save_classification'), json.dumps({
+                'pair_id': pair.id, 'property_name': density, 'classification': 'TP'
+            }), content_type='application/json')
+        apply_changes(changes)
+
+        cells = Classification.objects.filter(property_name=density)
+        self.assertEqual(set(cells.values_list('classification', 'source')), {('TP', Classification.HUMAN)})
+        self.assertEqual(find_mismatches(), [])
+
+@skipUnless(parallel_scoring_available(), 'worker processes need fork')
+class ParallelRescoreTests(TransactionTestCase):
+    """Rescore with forked workers, which need a database they can reopen"""
+
+    def setUp(self):
+        # The in-memory test database is private to this process, and closing
+        # its last connection would drop it, so set that connection aside
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        original_name, memory = connection.settings_dict['NAME'], connection.connection
+        connection.connection = None
+        connection.settings_dict['NAME'] = os.path.join(directory.name, 'rescore.sqlite3')
+        self.addCleanup(self.restore_connection, original_name, memory)
+        call_command('migrate', verbosity=0)
+
+    def restore_connection(self, name, memory):
+        connection.close()
+        connection.settings_dict['NAME'] = name
+        connection.connection = memory
+
+    def test_workers_score_every_chunk(self):
+        density = 'Density (g/cm³)'
+        pairs = []
+        for i in range(10):
+            gt = create_entry('ground_truth', f'PS {i}', density='1.20')
+            pred = create_entry('predicted', f'PS {i}', density='1.21')
+            pairs.append(MatchedPair.objects.create(ground_truth=gt, predicted=pred))
+        create_automatic_classifications_for_pairs(pairs)
+        Classification.objects.filter(property_name=density).update(classification='FN')
+        rebuild_counters()
+
+        out = StringIO()
+        call_command('rescore', workers=2, chunk_size=3, full=True, stdout=out)
+        self.assertIn(f'{density}: FN -> TP  10', out.getvalue())
+        self.assertEqual(set(Classification.objects.filter(property_name=density).values_list('classification', flat=True)), {'TP'})
+        self.assertEqual(find_mismatches(), [])
+
+class SuggestCandidatesViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_only_unmatched_predictions_are_suggested(self):
+        gt = DataEntry.objects.create(entry_type='ground_truth', polymer_system='Kapton', force_field='OPLS-AA')
+        other_gt = DataEntry.objects.create(entry_type='ground_truth', polymer_system='PS', force_field='OPLS-AA')
+        kapton = DataEntry.objects.create(
+            entry_type='predicted', polymer_system='Kapton (PMDA-ODA)', force_field='OPLS-AA'
+        )
+        matched = DataEntry.objects.create(entry_type='predicted', polymer_system='Kapton', force_field='OPLS-AA')
+        MatchedPair.objects.create(ground_truth=other_gt, predicted=matched)
+
+        data = self.client.get(reverse('suggest_candidates'), {'k': 3}).json()
+
+        self.assertEqual(list(data['candidates']), [str(gt.id)])
+        self.assertEqual([c['id'] for c in data['candidates'][str(gt.id)]], [kapton.id])
+        self.assertEqual(self.client.get(reverse('suggest_candidates'), {'k': 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('suggest_candidates'), {'ground_truth_id': 'x'}).status_code, 400)
+
+    def test_index_is_built_once_per_data_version(self):
+        gt = DataEntry.objects.create(entry_type='ground_truth', polymer_system='Kapton', force_field='OPLS-AA')
+        DataEntry.objects.create(entry_type='predicted', polymer_system='Kapton', force_field='OPLS-AA')
+        self.client.get(reverse('suggest_candidates'), {'ground_truth_id': gt.id})
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(reverse('suggest_candidates'), {'ground_truth_id': gt.id}).json()
+        self.assertEqual(len(data['candidates'][str(gt.id)]), 1)
+        # The cached index answers without reading the predicted entries again
+        self.assertFalse(any("'predicted'" in query['sql'] for query in queries.captured_queries))
+
+class MatchingDeltaTests(TestCase):
+    def post_json(self, url_name, data):
+        response = self.client.post(reverse(url_name), json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_endpoints_return_changes_and_bump_the_version(self):
+        gt = DataEntry.objects.create(entry_type='ground_truth', polymer_system='PS', force_field='OPLS-AA')
+        pred = DataEntry.objects.create(entry_type='predicted', polymer_system='PS', force_field='OPLS-AA')
+        extra = DataEntry.objects.create(entry_type='predicted', polymer_system='PE', force_field='OPLS-AA')
+
+        created = self.post_json('create_pair', {'ground_truth_id': gt.id, 'predicted_id': pred.id})
+        self.assertEqual(created['removed_entry_ids'], [gt.id, pred.id])
+        self.assertIn(f'data-pair-id="{created["pair_id"]}"', created['pair_html'])
+
+        deleted = self.post_json('delete_pair', {'pair_id': created['pair_id']})
+        self.assertEqual(deleted['removed_pair_ids'], [created['pair_id']])
+        self.assertEqual({record['id'] for record in deleted['restored_entries']}, {gt.id, pred.id})
+        self.assertGreater(deleted['version'], created['version'])
+
+        marked = self.post_json('mark_no_match', {'entry_id': extra.id})
+        self.assertEqual(marked['removed_entry_ids'], [extra.id])
+
+        pair_id = self.post_json('create_pair', {'ground_truth_id': gt.id, 'predicted_id': pred.id})['pair_id']
+        removed = self.post_json('delete_entry', {'entry_id': gt.id})
+        self.assertEqual(removed['removed_pair_ids'], [pair_id])
+        self.assertEqual([record['id'] for record in removed['restored_entries']], [pred.id])
+
+    def test_data_version_supports_conditional_requests(self):
+        url = reverse('data_version')
+        etag = self.client.get(url)['ETag']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        DataEntry.objects.create(entry_type='predicted', polymer_system='PE', force_field='OPLS-AA')
+        self.post_json('mark_no_match', {'entry_id': DataEntry.objects.get().id})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+class PredictionRunTests(TestCase):
+    GROUND_TRUTH = [
+        {'polymer_system': 'PS', 'force_field': 'OPLS-AA', 'Density (g/cm³)': '1.05'},
+        {'polymer_system': 'PMMA', 'force_field': 'OPLS-AA', 'Density (g/cm³)': '1.18'},
+    ]
+
+    def upload(self, run_name, predictions, ground_truth=None, replace=False):
+        data = {
+            'run_name': run_name,
+            'predicted_file': SimpleUploadedFile('pred.json', json.dumps(predictions).encode()),
+        }
+        if ground_truth is not None:
+            data['ground_truth_file'] = SimpleUploadedFile('gt.json', json.dumps(ground_truth).encode())
+        if replace:
+            data['replace_existing'] = 'on'
+        response = self.client.post(reverse('index'), data)
+        self.assertEqual(response.status_code, 302)
+
+    def predictions(self, density):
+        return [
+            {'polymer_system': 'PS', 'force_field': 'OPLS-AA', 'Density (g/cm³)': density},
+            {'polymer_system': 'PMMA', 'force_field': 'OPLS-AA', 'Density (g/cm³)': '1.18'},
+        ]
+
+    def test_runs_share_the_ground_truth_and_carry_over_matches(self):
+        self.upload('v1', self.predictions('1.05'), self.GROUND_TRUTH)
+        self.client.post(reverse('auto_match'))
+        self.assertEqual(MatchedPair.objects.count(), 2)
+
+        # The same ground truth again adds nothing; v2 is matched like v1
+        self.upload('v2', self.predictions('2.0'), self.GROUND_TRUTH)
+        self.assertEqual(DataEntry.objects.filter(entry_type='ground_truth').count(), 2)
+        v2_pairs = MatchedPair.objects.filter(predicted__run__name='v2')
+        self.assertEqual(
+            set(v2_pairs.values_list('ground_truth__polymer_system', 'predicted__polymer_system')),
+            {('PS', 'PS'), ('PMMA', 'PMMA')}
+        )
+        self.assertEqual(find_mismatches(), [])
+
+        matching = self.client.get(reverse('matching')).context
+        self.assertEqual(matching['active_run'].name, 'v2')
+        self.assertEqual((matching['gt_remaining'], matching['pair_count']), (0, 2))
+
+        cache.clear()
+        context = self.client.get(reverse('statistics')).context
+        runs = {row['run']: row for row in context['run_stats']}
+        density = PROPERTIES.index('Density (g/cm³)')
+        self.assertEqual(runs['v1']['property_f1'][density], 1)
+        self.assertLess(runs['v2']['property_f1'][density], 1)
+        # The headline covers the active run only
+        self.assertEqual(context['matched_pairs_count'], 2)
+        self.assertEqual(context['stats'], runs['v2']['counts'])
+        v1 = PredictionRun.objects.get(name='v1')
+        self.assertEqual(self.client.get(reverse('statistics'), {'run': v1.id}).context['stats'], runs['v1']['counts'])
+
+        # Every export row says which run it belongs to
+        rows = list(csv.DictReader(b''.join(
+            self.client.get(reverse('export_results'), {'format': 'csv'}).streaming_content
+        ).decode('utf-8').splitlines()))
+        self.assertEqual(sorted(row['run'] for row in rows), ['v1', 'v1', 'v2', 'v2'])
+        summary = json.loads(b''.join(self.client.get(reverse('export_results')).streaming_content))['summary']
+        self.assertEqual([(run['run'], run['total_pairs']) for run in summary['runs']], [('v1', 2), ('v2', 2)])
+
+    def test_replace_only_clears_one_run(self):
+        self.upload('v1', self.predictions('1.05'), self.GROUND_TRUTH)
+        self.client.post(reverse('auto_match'))
+        self.upload('v2', self.predictions('1.05'))
+
+        # The new v2 predictions are matched again from v1's pairs
+        self.upload('v2', self.predictions('2.0')[:1], replace=True)
+        self.assertEqual(DataEntry.objects.filter(run__name='v1').count(), 2)
+        self.assertEqual(DataEntry.objects.filter(run__name='v2').count(), 1)
+        self.assertEqual(MatchedPair.objects.filter(predicted__run__name='v2').count(), 1)
+        self.assertEqual(find_mismatches(), [])
+
+    def test_no_match_marks_stay_in_their_run(self):
+        self.upload('v1', self.predictions('1.05'), self.GROUND_TRUTH)
+        self.client.post(reverse('auto_match'))
+        self.upload('v2', self.predictions('1.05')[:1])
+        pmma = DataEntry.objects.get(entry_type='ground_truth', polymer_system='PMMA')
+        response = self.client.post(
+            reverse('mark_no_match'), json.dumps({'entry_id': pmma.id}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        # More v2 predictions are not matched to the marked entry
+        self.upload('v2', self.predictions('1.05')[1:])
+        self.assertFalse(MatchedPair.objects.filter(predicted__run__name='v2', ground_truth=pmma).exists())
+        self.assertEqual(self.client.get(reverse('matching')).context['gt_remaining'], 0)
+
+        # v1 still lists the entry once its pair is gone
+        v1 = PredictionRun.objects.get(name='v1')
+        MatchedPair.objects.filter(predicted__run=v1, ground_truth=pmma).delete()
+        self.assertEqual(self.client.get(reverse('matching'), {'run': v1.id}).context['gt_remaining'], 1)
+
+class EvaluationSessionTests(TestCase):
+    GROUND_TRUTH = PredictionRunTests.GROUND_TRUTH
+    upload = PredictionRunTests.upload
+    predictions = PredictionRunTests.predictions
+
+    def setUp(self):
+        cache.clear()
+        self.upload('v1', self.predictions('1.05'), self.GROUND_TRUTH)
+        self.client.post(reverse('auto_match'))
+
+        self.client.post(reverse('create_session'), {'name': 'Second', 'description': ''})
+        self.session = EvaluationSession.objects.get(name='Second')
+        self.upload('v1', self.predictions('2.0'), self.GROUND_TRUTH)
+        self.client.post(reverse('auto_match'))
+
+    def test_sessions_are_isolated(self):
+        self.assertEqual(DataEntry.objects.filter(session=self.session).count(), 4)
+        self.assertEqual(DataEntry.objects.filter(session=None).count(), 4)
+        self.assertEqual(self.session.pairs.count(), 2)
+        self.assertEqual(
+            self.session.classifications.count(),
+            Classification.objects.filter(matched_pair__session=self.session).count()
+        )
+        self.assertEqual(find_mismatches(), [])
+
+        def density_counts(context):
+            rows = {row['property_name']: row['counts'] for row in context['property_stats']}
+            return rows['Density (g/cm³)']
+
+        second = self.client.get(reverse('statistics')).context
+        default = self.client.get(reverse('statistics'), {'session': 'default'}).context
+        self.assertEqual((second['matched_pairs_count'], default['matched_pairs_count']), (2, 2))
+        self.assertEqual(self.session.get_statistics(), second['stats'])
+        self.assertEqual(density_counts(default)['TP'], 2)
+        self.assertEqual(density_counts(second)['TP'], 1)
+
+    def test_entries_of_other_sessions_are_not_found(self):
+        entry = DataEntry.objects.filter(session=self.session).first()
+        self.client.get(reverse('index'), {'session': 'default'})
+        response = self.client.post(
+            reverse('mark_no_match'), json.dumps({'entry_id': entry.id}), content_type='application/json'
+        )
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_clear_only_deletes_the_active_session(self):
+        response = self.client.post(reverse('clear_all_data'), {}, content_type='application/json').json()
+        self.assertEqual(response['removed']['entries'], 4)
+        self.assertEqual(response['removed']['property_values'], 4 * len(property_names(NUMERIC)))
+        self.assertFalse(DataEntry.objects.filter(session=self.session).exists())
+        self.assertFalse(ClassificationCounter.objects.filter(session=self.session).exists())
+        self.assertEqual(DataEntry.objects.filter(session=None).count(), 4)
+        self.assertEqual(MatchedPair.objects.filter(session=None).count(), 2)
+        self.assertEqual(find_mismatches(), [])
+
+    def test_clear_everything(self):
+        response = self.client.post(reverse('clear_all_data'), {'scope': 'all'}, content_type='application/json')
+        self.assertEqual(response.json()['removed']['sessions'], 1)
+        for model in (Classification, ClassificationCounter, MatchedPair, PropertyValue, DataEntry, EvaluationSession):
+            self.assertFalse(model.objects.exists())
+        self.assertEqual(self.client.get(reverse('index')).context['gt_count'], 0)
+
+    def test_clear_data_command(self):
+        out = StringIO()
+        call_command('clear_data', session='default', stdout=out)
+        self.assertIn('Cleared the default session', out.getvalue())
+        self.assertFalse(DataEntry.objects.filter(session=None).exists())
+        self.assertEqual(DataEntry.objects.filter(session=self.session).count(), 4)
+        self.assertEqual(find_mismatches(), [])
+
+class AutoMatchTests(TestCase):
+    def test_greedy_assignment_is_one_to_one(self):
+        edges = [(0, 0, 0.9), (0, 1, 0.8), (1, 0, 0.85)]
+        self.assertEqual(greedy_assignment(edges), [(0, 0, 0.9)])
+
+    @skipUnless(optimal_assignment_available(), 'scipy is not installed')
+    def test_optimal_assignment_maximizes_total_score(self):
+        edges = [(0, 0, 0.9), (0, 1, 0.8), (1, 0, 0.85), (2, 1, 0.1)]
+        self.assertEqual(sorted(optimal_assignment(edges, 3, 2)), [(0, 1, 0.8), (1, 0, 0.85)])
+
+    def test_auto_match_pairs_within_force_fields(self):
+        for entry_type, names in [
+            ('ground_truth', ['Kapton', 'Polystyrene', 'PMMA']),
+            ('predicted', ['Polystyrene (atactic)', 'Kapton (PMDA-ODA)', 'Nylon-6']),
+        ]:
+            for name in names:
+                create_entry(entry_type, name, density='1.1')
+        DataEntry.objects.create(entry_type='predicted', polymer_system='PMMA', force_field='GAFF')
+
+        data = self.client.post(reverse('auto_match')).json()
+
+        self.assertEqual(data['pairs_created'], 2)
+        pairs = set(MatchedPair.objects.values_list('ground_truth__polymer_system', 'predicted__polymer_system'))
+        self.assertEqual(pairs, {('Kapton', 'Kapton (PMDA-ODA)'), ('Polystyrene', 'Polystyrene (atactic)')})
+        self.assertEqual(Classification.objects.filter(property_name='Density (g/cm³)').count(), 2)
+        self.assertEqual(find_mismatches(), [])
+
+class CreatePairsTests(TestCase):
+    def test_batch_reports_every_item(self):
+        gts = [
+            create_entry('ground_truth', f'PS {i}', density='1.2')
+            for i in range(3)
+        ]
+        preds = [
+            create_entry('predicted', f'PS {i}', density='1.2')
+            for i in range(3)
+        ]
+        MatchedPair.objects.create(ground_truth=gts[2], predicted=preds[2])
+        items = [
+            {'ground_truth_id': gts[0].id, 'predicted_id': preds[0].id},
+            {'ground_truth_id': gts[1].id, 'predicted_id': preds[1].id},
+            {'ground_truth_id': gts[1].id, 'predicted_id': preds[1].id},
+            {'ground_truth_id': gts[2].id, 'predicted_id': preds[2].id},
+            {'ground_truth_id': preds[0].id, 'predicted_id': preds[1].id},
+            {'ground_truth_id': 'x'},
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('create_pairs'), json.dumps({'pairs': items}), content_type='application/json')
+        data = response.json()
+
+        # Entries of each type, existing pairs and property values are read with one query each
+        reads = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len([sql for sql in reads if 'dataversion' not in sql]), 4)
+
+        self.assertEqual((data['created'], data['failed']), (2, 4))
+        self.assertEqual([result['success'] for result in data['results']], [True, True, False, False, False, False])
+        self.assertEqual(data['results'][2]['error'], 'Duplicate pair in request')
+        self.assertEqual(data['results'][3]['error'], 'Pair already exists')
+        self.assertTrue(MatchedPair.objects.filter(id=data['results'][0]['pair_id'], ground_truth=gts[0]).exists())
+        self.assertEqual(Classification.objects.filter(property_name='Density (g/cm³)').count(), 2)
+        self.assertEqual(find_mismatches(), [])
+
+class ExportTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            gt = create_entry('ground_truth', f'PS {i}', density='1.20')
+            pred = create_entry('predicted', f'PS {i}', density='1.21')
+            self.client.post(
+                reverse('create_pair'),
+                json.dumps({'ground_truth_id': gt.id, 'predicted_id': pred.id}),
+                content_type='application/json'
+            )
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_results'), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_json_export_streams_a_complete_document(self):
+        results = json.loads(self.export())
+
+        self.assertEqual(results['summary']['total_pairs'], 5)
+        [run] = results['summary']['runs']
+        self.assertEqual((run['run'], run['total_pairs']), (None, 5))
+        self.assertEqual(run['statistics']['TP'], 5 * 3)
+        self.assertEqual(len(results['detailed_results']), 5)
+        first = results['detailed_results'][0]
+        self.assertIsNone(first['run'])
+        self.assertEqual(first['ground_truth']['properties']['Density (g/cm³)'], '1.20')
+        self.assertEqual(first['classifications']['Density (g/cm³)'], 'TP')
+
+    def test_json_lines_and_csv_have_one_record_per_pair(self):
+        lines = self.export(format='jsonl').splitlines()
+        rows = list(csv.reader(self.export(format='csv').splitlines()))
+
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])['prediction']['properties']['Density (g/cm³)'], '1.21')
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][rows[0].index('Density (g/cm³) [classification]')], 'TP')
+
+    @skipUnless(columnar_export_available(), 'pyarrow is not installed')
+    def test_parquet_export_has_one_row_per_pair_and_property(self):
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+        response = self.client.get(reverse('export_results'), {'format': 'parquet'})
+        table = pq.read_table(BytesIO(b''.join(response.streaming_content)))
+
+        self.assertEqual(table.num_rows, 5 * len(PROPERTIES))
+        density = table.filter(pc.equal(table['property'], 'Density (g/cm³)')).to_pylist()[0]
+        self.assertEqual(density['gt_lower'], 1.2)
+        self.assertEqual(density['classification'], 'TP')
+        self.assertIsNone(density['run'])
+
+    def test_unknown_format_is_rejected(self):
+        self.assertEqual(self.client.get(reverse('export_results'), {'format': 'xml'}).status_code, 400)
+
+class LegacyMigrationTests(TransactionTestCase):
+    """Migrate a database populated before this series to the latest schema"""
+    LEGACY = ('evaluation_app', '0003_remove_unique_together')
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([target])
+        return executor.loader.project_state([target]).apps
+
+    def setUp(self):
+        apps = self.migrate(self.LEGACY)
+        DataEntry = apps.get_model('evaluation_app', 'DataEntry')
+        MatchedPair = apps.get_model('evaluation_app', 'MatchedPair')
+        Classification = apps.get_model('evaluation_app', 'Classification')
+        gt = DataEntry.objects.create(entry_type='ground_truth', polymer_system='PS', force_field='OPLS-AA', density='1.05')
+        pred = DataEntry.objects.create(entry_type='predicted', polymer_system='Polystyrene', force_field='OPLS', density='2.0')
+        pair = MatchedPair.objects.create(ground_truth=gt, predicted=pred)
+        # A reviewer's labels: the text cells need judgment, the density is an override
+        for prop, label in [('polymer_system', 'TP'), ('force_field', 'TP'), ('Density (g/cm³)', 'TP'),
+                            ('Viscosity (Pa s)', 'TN')]:
+            Classification.objects.create(matched_pair=pair, property_name=prop, classification=label)
+        self.reviewed_pair = pair.id
+
+        # Labels of the engine of the time that later rules disagree with
+        gt = DataEntry.objects.create(
+            entry_type='ground_truth', polymer_system='PE', force_field='OPLS-AA',
+            density='-1.0', diffusion_coefficient='1e-9'
+        )
+        pred = DataEntry.objects.create(
+            entry_type='predicted', polymer_system='PE', force_field='OPLS-AA',
+            density='-1.02', diffusion_coefficient='1.2e-9'
+        )
+        pair = MatchedPair.objects.create(ground_truth=gt, predicted=pred)
+        for prop in ['Density (g/cm³)', 'Diffusion Coefficient (m²/s)']:
+            Classification.objects.create(matched_pair=pair, property_name=prop, classification='FN')
+        self.engine_pair = pair.id
+
+        self.latest = max(
+            key for key in MigrationExecutor(connection).loader.graph.leaf_nodes() if key[0] == 'evaluation_app'
+        )
+        self.migrate(self.latest)
+
+    def test_counters_start_from_existing_classifications(self):
+        overall, _ = counter_matrices()
+        self.assertEqual(overall, {'TP': 3, 'FP': 0, 'TN': 1, 'FN': 2})
+        self.assertEqual(find_mismatches(), [])
+
+    def test_default_session_duplicates_are_merged(self):
+        apps = self.migrate(('evaluation_app', '0015_dataentry_no_match_runs'))
+        Counter = apps.get_model('evaluation_app', 'ClassificationCounter')
+        Run = apps.get_model('evaluation_app', 'PredictionRun')
+        Counter.objects.create(property_name='Density (g/cm³)', classification='TP', count=2)
+        first, second = Run.objects.create(name='v1'), Run.objects.create(name='v1')
+
+        self.migrate(self.latest)
+        counter = ClassificationCounter.objects.get(session=None, property_name='Density (g/cm³)', classification='TP')
+        self.assertEqual(counter.count, 3)
+        self.assertEqual(
+            dict(PredictionRun.objects.filter(id__in=[first.id, second.id]).values_list('id', 'name')),
+            {first.id: 'v1', second.id: f'v1 ({second.id})'}
+        )
+
+    def cells(self, pair_id, field):
+        return dict(Classification.objects.filter(matched_pair_id=pair_id).values_list('property_name', field))
+
+    def test_reviewer_labels_are_kept_by_rescore(self):
+        self.assertEqual(self.cells(self.reviewed_pair, 'source'), {
+            'polymer_system': Classification.HUMAN,
+            'force_field': Classification.HUMAN,
+            'Density (g/cm³)': Classification.HUMAN,
+            'Viscosity (Pa s)': Classification.AUTOMATIC,
+        })
+        # Judged by the rules that wrote them, the engine's labels stay automatic
+        self.assertEqual(set(self.cells(self.engine_pair, 'source').values()), {Classification.AUTOMATIC})
+
+        # Cells from before provenance tracking are not stale for the incremental rescore
+        self.assertEqual(rescore()['properties'], [])
+
+        summary = rescore(full=True)
+        self.assertEqual(summary['human'], 3)
+        # Besides the cells the legacy pairs never had, only the engine's labels change
+        self.assertEqual({change for change in summary['changes'] if change[1] is not None}, {
+            ('Density (g/cm³)', 'FN', 'TP'),
+            ('Diffusion Coefficient (m²/s)', 'FN', 'TP'),
+        })
+        self.assertEqual(self.cells(self.reviewed_pair, 'classification')['Density (g/cm³)'], 'TP')
+        self.assertEqual(find_mismatches(), [])
@@ -3,14 +3,21 @@ from . import views
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('sessions/create/', views.create_session, name='create_session'),
     path('matching/', views.matching, name='matching'),
     path('evaluation/', views.evaluation, name='evaluation'),
     path('statistics/', views.statistics, name='statistics'),
+    path('api/statistics-intervals/', views.statistics_intervals, name='statistics_intervals'),
     path('export/', views.export_results, name='export_results'),
     path('api/create-pair/', views.create_pair, name='create_pair'),
+    path('api/create-pairs/', views.create_pairs, name='create_pairs'),
+    path('api/auto-match/', views.auto_match, name='auto_match'),
     path('api/delete-pair/', views.delete_pair, name='delete_pair'),
     path('api/delete-entry/', views.delete_entry, name='delete_entry'),
     path('api/mark-no-match/', views.mark_no_match, name='mark_no_match'),
     path('api/clear-all-data/', views.clear_all_data, name='clear_all_data'),
     path('api/save-classification/', views.save_classification, name='save_classification'),
+    path('api/suggest-candidates/', views.suggest_candidates, name='suggest_candidates'),
+    path('api/data-version/', views.data_version, name='data_version'),
+    path('api/evaluation-pairs/', views.evaluation_pairs, name='evaluation_pairs'),
 ] 
\ No newline at end of file
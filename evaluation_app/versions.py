@@ -0,0 +1,28 @@
+from django.db.models import F
+from django.utils import timezone
+from .models import DataVersion
+
+VERSION_ROW_ID = 1
+
+def get_data_version():
+    """Return the current data version, 0 before anything has changed"""
+    version = DataVersion.objects.filter(pk=VERSION_ROW_ID).values_list('version', flat=True).first()
+    return version or 0
+
+def bump_data_version():
+    """Record that the data changed and return the new version
+
+    Call inside the transaction that makes the change so readers never see
+    new data under an old version.
+    """
+    updated = DataVersion.objects.filter(pk=VERSION_ROW_ID).update(
+        version=F('version') + 1,
+        updated_at=timezone.now()
+    )
+    if not updated:
+        DataVersion.objects.create(pk=VERSION_ROW_ID, version=1)
+    return get_data_version()
+
+def version_etag(request, *args, **kwargs):
+    """ETag for views whose output only depends on the data version"""
+    return str(get_data_version())
@@ -1,274 +1,364 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+from django.template.loader import render_to_string
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib import messages
-from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.core.cache import cache
+from django.views.decorators.http import etag, require_http_methods
 from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
 import json
-from .models import DataEntry, MatchedPair, Classification, EvaluationSession
-from .forms import JSONFileUploadForm, EvaluationSessionForm, ClassificationForm
-
-# Helper functions for automatic comparison
-def is_numeric(value):
-    """Check if a value is numeric"""
-    if value is None or value == 'NA':
-        return False
-    
-    # Handle ranges like "600-700"
-    if isinstance(value, str) and '-' in value and not value.startswith('-'):
-        parts = value.split('-')
-        if len(parts) == 2:
-            try:
-                float(parts[0].strip())
-                float(parts[1].strip())
-                return True
-            except ValueError:
-                pass
-    
-    try:
-        float(value)
-        return True
-    except (ValueError, TypeError):
-        return False
-
-def parse_range(value):
-    """Parse a range value like '600-700' and return (min, max)"""
-    if isinstance(value, str) and '-' in value and not value.startswith('-'):
-        parts = value.split('-')
-        if len(parts) == 2:
-            try:
-                return (float(parts[0].strip()), float(parts[1].strip()))
-            except ValueError:
-                pass
-    return None
-
-def calculate_range_overlap(range1, range2):
-    """Calculate overlap percentage between two ranges"""
-    if not range1 or not range2:
-        return 0
-    
-    min1, max1 = range1
-    min2, max2 = range2
-    
-    overlap_start = max(min1, min2)
-    overlap_end = min(max1, max2)
-    
-    if overlap_start >= overlap_end:
-        return 0
-    
-    overlap_length = overlap_end - overlap_start
-    range1_length = max1 - min1
-    range2_length = max2 - min2
-    
-    # Calculate overlap percentage based on the smaller range
-    smaller_range = min(range1_length, range2_length)
-    if smaller_range == 0:
-        return 0
-    
-    return (overlap_length / smaller_range) * 100
-
-def within_tolerance(gt_value, pred_value, tolerance_percent=5):
-    """Check if values are within tolerance or range overlap"""
-    if gt_value == pred_value:
-        return True
-    
-    # Handle NA cases
-    if gt_value == 'NA' or pred_value == 'NA':
-        return False
-    
-    # Check if both are numeric
-    if is_numeric(gt_value) and is_numeric(pred_value):
-        # Handle ranges
-        gt_range = parse_range(gt_value)
-        pred_range = parse_range(pred_value)
-        
-        if gt_range and pred_range:
-            # Both are ranges - check 80% overlap
-            overlap = calculate_range_overlap(gt_range, pred_range)
-            return overlap >= 80
-        
-        elif gt_range:
-            # GT is range, pred is single value
-            try:
-                pred_float = float(pred_value)
-                return gt_range[0] <= pred_float <= gt_range[1]
-            except ValueError:
-                return False
-        
-        elif pred_range:
-            # Pred is range, GT is single value
-            try:
-                gt_float = float(gt_value)
-                return pred_range[0] <= gt_float <= pred_range[1]
-            except ValueError:
-                return False
-        
-        else:
-            # Both are single numeric values - check ±5% tolerance
-            try:
-                gt_float = float(gt_value)
-                pred_float = float(pred_value)
-                diff = abs(gt_float - pred_float)
-                return diff <= (gt_float * tolerance_percent / 100)
-            except ValueError:
-                return False
-    
-    return False
-
-def perform_automatic_comparison(pair, property_name):
-    """Perform automatic comparison and return classification"""
-    gt_value = pair.ground_truth.get_property_value(property_name)
-    pred_value = pair.predicted.get_property_value(property_name)
-    
-    # Handle NA cases - these are always clear
-    gt_is_na = gt_value == 'NA' or gt_value is None
-    pred_is_na = pred_value == 'NA' or pred_value is None
-    
-    if gt_is_na and pred_is_na:
-        return 'TN'  # True Negative
-    if gt_is_na and not pred_is_na:
-        return 'FP'  # False Positive
-    if not gt_is_na and pred_is_na:
-        return 'FN'  # False Negative
-    
-    # For string-based properties (polymer_system, force_field), only classify exact matches
-    if property_name in ['polymer_system', 'force_field']:
-        if gt_value == pred_value:
-            return 'TP'  # True Positive - exact match
-        else:
-            return None  # Ambiguous - needs human judgment
-    
-    # For numeric properties, check tolerance
-    if within_tolerance(gt_value, pred_value):
-        return 'TP'  # True Positive
-    else:
-        return 'FN'  # False Negative
+import time
+from .models import (
+    DataEntry, MatchedPair, Classification, EvaluationSession, PredictionRun,
+    load_pair_values, load_property_values
+)
+from .forms import JSONFileUploadForm, EvaluationSessionForm
+from .ingestion import bulk_load_entries, get_batch_size
+from .candidates import CandidateIndex, DEFAULT_TOP_K, MAX_TOP_K
+from .assignment import assign_entries, optimal_assignment_available
+from .comparison import PROPERTIES, CODE_LABELS, classify_pairs, input_hash, input_hashes
+from .metrics import (
+    CLASSIFICATION_LABELS, bootstrap_intervals, calculate_metrics, confusion_matrices, force_field_matrices,
+    grouped_table, metrics_table, pair_label_counts, property_intervals, run_matrices
+)
+from .exporters import (
+    COLUMNAR_FORMATS, EXPORT_FORMATS, columnar_export_available, iter_pairs,
+    stream_columnar, stream_csv, stream_json, stream_json_lines
+)
+from . import counters
+from .properties import NUMERIC, get_property, property_names
+from .rules import rule_version
+from .runs import carry_over_matches, clear_run, get_active_run, new_ground_truth, run_choices, set_active_run
+from .sessions import DEFAULT_SESSION_PARAM, get_active_session, set_active_session
+from .teardown import teardown
+from .versions import bump_data_version, get_data_version, version_etag
+
+# Matched pairs rendered per evaluation page request
+EVALUATION_PAGE_SIZE = 25
+MAX_EVALUATION_PAGE_SIZE = 200
+
+# Largest batch accepted by the create-pairs endpoint
+MAX_PAIRS_PER_REQUEST = 10000
+
+# Seconds a statistics page context stays cached; keys carry the data
+# version, so a write makes the cached copy unreachable rather than stale
+STATISTICS_CACHE_TIMEOUT = 60 * 60
+
+# Seconds a built candidate index stays cached, keyed the same way
+CANDIDATE_INDEX_CACHE_TIMEOUT = 60 * 60
+
+def cache_key(name, session, *parts):
+    """Cache key of a result of one session at the current data version"""
+    session_part = counters.session_id(session) or DEFAULT_SESSION_PARAM
+    return ':'.join(str(part) for part in (name, session_part, *parts, get_data_version()))
 
 def create_automatic_classifications(pair):
     """Create automatic classifications for all properties of a pair"""
-    properties = [
-        'polymer_system',
-        'force_field',
-        'Density (g/cm³)',
-        'Glass Transition Temperature (K)',
-        'Radius of Gyration (nm)',
-        'Young\'s Modulus (GPa)',
-        'Diffusion Coefficient (m²/s)',
-        'Viscosity (Pa s)'
-    ]
-    
-    for prop in properties:
-        # Only create if classification doesn't exist
-        if not Classification.objects.filter(matched_pair=pair, property_name=prop).exists():
-            classification = perform_automatic_comparison(pair, prop)
-            if classification:  # Only create if we got a valid classification
-                Classification.objects.create(
+    create_automatic_classifications_for_pairs([pair])
+
+def create_automatic_classifications_for_pairs(pairs, existing=None):
+    """Classify all pairs in one batch and create any missing classifications
+    
+    ``existing`` is an optional set of (pair_id, property_name) keys that are
+    already classified; when omitted it is read with a single query.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+    
+    # Only create classifications that don't exist yet
+    if existing is None:
+        existing = set(Classification.objects.filter(
+            matched_pair__in=pairs
+        ).values_list('matched_pair_id', 'property_name'))
+    
+    load_pair_values(pairs)
+    codes = classify_pairs(pairs)
+    new_classifications = []
+    for prop in PROPERTIES:
+        version = rule_version(prop)
+        for pair, code, digest in zip(pairs, codes[prop], input_hashes(pairs, prop)):
+            # Skip ambiguous cells that need human judgment
+            if code and (pair.id, prop) not in existing:
+                new_classifications.append(Classification(
+                    session_id=pair.session_id,
                     matched_pair=pair,
                     property_name=prop,
-                    classification=classification
-                )
+                    classification=CODE_LABELS[code],
+                    rule_version=version,
+                    input_hash=digest
+                ))
+    
+    # Nothing was written, so the data version stays and cached pages remain valid
+    if not new_classifications:
+        return []
+    
+    with transaction.atomic():
+        created = Classification.objects.bulk_create(new_classifications)
+        counters.record_created(created)
+        bump_data_version()
+    return created
 
 def index(request):
     """Home page with data upload and session management"""
+    session = get_active_session(request)
     if request.method == 'POST':
-        form = JSONFileUploadForm(request.POST, request.FILES)
+        form = JSONFileUploadForm(request.POST, request.FILES, session=session)
         if form.is_valid():
             try:
                 with transaction.atomic():
-                    # Check if user wants to replace existing data
-                    replace_existing = form.cleaned_data.get('replace_existing', False)
+                    run, created = PredictionRun.objects.get_or_create(session=session, name=form.cleaned_data['run_name'])
                     
-                    if replace_existing:
-                        # Clear existing data and related objects
-                        Classification.objects.all().delete()
-                        MatchedPair.objects.all().delete()
-                        DataEntry.objects.all().delete()
-                        messages.info(request, 'Replaced all existing data.')
+                    # Check if user wants to replace this run's predictions
+                    if form.cleaned_data.get('replace_existing', False) and not created:
+                        removed = clear_run(run)
+                        messages.info(
+                            request,
+                            f'Replaced the predictions of run "{run.name}" '
+                            f'({sum(removed.values()):,} rows removed).'
+                        )
                     else:
-                        messages.info(request, 'Updating existing data entries.')
+                        messages.info(request, f'Adding predictions to run "{run.name}".')
                     
-                    # Load ground truth data
-                    gt_data = form.cleaned_data['ground_truth_file']
-                    for item in gt_data:
-                        DataEntry.objects.create(
-                            entry_type='ground_truth',
-                            polymer_system=item['polymer_system'],
-                            force_field=item['force_field'],
-                            density=item.get('Density (g/cm³)', 'NA'),
-                            glass_transition_temp=item.get('Glass Transition Temperature (K)', 'NA'),
-                            radius_of_gyration=item.get('Radius of Gyration (nm)', 'NA'),
-                            youngs_modulus=item.get('Young\'s Modulus (GPa)', 'NA'),
-                            diffusion_coefficient=item.get('Diffusion Coefficient (m²/s)', 'NA'),
-                            viscosity=item.get('Viscosity (Pa s)', 'NA'),
+                    # Load ground truth and predicted data in bulk batches;
+                    # the ground truth is shared, so stored records are skipped
+                    started = time.perf_counter()
+                    gt_count = 0
+                    if form.cleaned_data['ground_truth_file']:
+                        gt_count = bulk_load_entries(
+                            'ground_truth',
+                            new_ground_truth(form.cleaned_data['ground_truth_file'], session),
+                            session=session
                         )
+                    pred_count = bulk_load_entries('predicted', form.cleaned_data['predicted_file'], run=run, session=session)
+                    elapsed = time.perf_counter() - started
+                    bump_data_version()
                     
-                    # Load predicted data
-                    pred_data = form.cleaned_data['predicted_file']
-                    for item in pred_data:
-                        DataEntry.objects.create(
-                            entry_type='predicted',
-                            polymer_system=item['polymer_system'],
-                            force_field=item['force_field'],
-                            density=item.get('Density (g/cm³)', 'NA'),
-                            glass_transition_temp=item.get('Glass Transition Temperature (K)', 'NA'),
-                            radius_of_gyration=item.get('Radius of Gyration (nm)', 'NA'),
-                            youngs_modulus=item.get('Young\'s Modulus (GPa)', 'NA'),
-                            diffusion_coefficient=item.get('Diffusion Coefficient (m²/s)', 'NA'),
-                            viscosity=item.get('Viscosity (Pa s)', 'NA'),
-                        )
+                    # Reuse the matches other runs already made
+                    carried_pairs, _ = bulk_create_pairs(carry_over_matches(run))
                 
-                messages.success(request, f'Successfully loaded {len(gt_data)} ground truth and {len(pred_data)} predicted entries.')
+                set_active_run(request, run)
+                rows_per_second = (gt_count + pred_count) / elapsed if elapsed > 0 else 0
+                messages.success(
+                    request,
+                    f'Successfully loaded {gt_count} new ground truth and {pred_count} predicted entries '
+                    f'in {elapsed:.2f}s ({rows_per_second:,.0f} rows/s).'
+                )
+                if carried_pairs:
+                    messages.info(request, f'Carried over {len(carried_pairs)} matches from other runs.')
                 return redirect('matching')
                 
             except Exception as e:
                 messages.error(request, f'Error loading data: {str(e)}')
     else:
-        form = JSONFileUploadForm()
+        form = JSONFileUploadForm(session=session)
     
     # Get existing sessions
     sessions = EvaluationSession.objects.all().order_by('-created_at')
+    entries = DataEntry.objects.filter(session=session)
     
     context = {
         'form': form,
+        'session_form': EvaluationSessionForm(),
         'sessions': sessions,
-        'gt_count': DataEntry.objects.filter(entry_type='ground_truth').count(),
-        'pred_count': DataEntry.objects.filter(entry_type='predicted').count(),
+        'active_session': session,
+        'default_session_param': DEFAULT_SESSION_PARAM,
+        'gt_count': entries.filter(entry_type='ground_truth').count(),
+        'pred_count': entries.filter(entry_type='predicted').count(),
     }
     return render(request, 'evaluation_app/index.html', context)
 
+@require_http_methods(["POST"])
+def create_session(request):
+    """Create an evaluation session and switch to it"""
+    form = EvaluationSessionForm(request.POST)
+    if form.is_valid():
+        session = form.save()
+        set_active_session(request, session)
+        messages.success(request, f'Created evaluation session "{session.name}".')
+    else:
+        messages.error(request, 'Could not create the session: ' + ' '.join(
+            error for errors in form.errors.values() for error in errors
+        ))
+    return redirect('index')
+
+def unmatched_entries(entry_type, run=None, session=None):
+    """Entries of one type in ``session`` that are neither paired in ``run`` nor marked as no match
+    
+    Predicted entries are those of ``run``; ground truth entries are shared
+    by the session's runs, so one is unmatched while it has no pair in
+    ``run`` and is not marked as no match in it.
+    """
+    matched_ids = MatchedPair.objects.filter(session=session, predicted__run=run).values(
+        'ground_truth_id' if entry_type == 'ground_truth' else 'predicted_id'
+    )
+    entries = DataEntry.objects.filter(
+        session=session,
+        entry_type=entry_type,
+        marked_no_match=False
+    )
+    if entry_type == 'predicted':
+        entries = entries.filter(run=run)
+    elif run is not None:
+        entries = entries.exclude(no_match_runs=run)
+    return entries.exclude(
+        id__in=matched_ids
+    )
+
 def matching(request):
     """Manual pair matching interface"""
-    # Get all matched pairs to identify which entries are already matched
-    matched_pairs = MatchedPair.objects.all().order_by('-created_at')
+    session = get_active_session(request)
+    run = get_active_run(request, session)
+    
+    # Get the run's matched pairs to identify which entries are already matched
+    matched_pairs = MatchedPair.objects.filter(session=session, predicted__run=run).select_related(
+        'ground_truth', 'predicted'
+    ).order_by('-created_at')
     
     # Get IDs of entries that are already matched
     matched_gt_ids = set(matched_pairs.values_list('ground_truth_id', flat=True))
     matched_pred_ids = set(matched_pairs.values_list('predicted_id', flat=True))
     
     # Only show unmatched entries that are not marked as "no match"
-    ground_truth_entries = DataEntry.objects.filter(
-        entry_type='ground_truth',
-        marked_no_match=False
-    ).exclude(
-        id__in=matched_gt_ids
-    ).order_by('polymer_system', 'force_field')
-    
-    predicted_entries = DataEntry.objects.filter(
-        entry_type='predicted',
-        marked_no_match=False
-    ).exclude(
-        id__in=matched_pred_ids
-    ).order_by('polymer_system', 'force_field')
+    ground_truth_entries = list(unmatched_entries('ground_truth', run, session).order_by('polymer_system', 'force_field'))
+    predicted_entries = list(unmatched_entries('predicted', run, session).order_by('polymer_system', 'force_field'))
+    matched_pairs = list(matched_pairs)
+    load_property_values(ground_truth_entries + predicted_entries)
     
     context = {
         'ground_truth_entries': ground_truth_entries,
         'predicted_entries': predicted_entries,
         'matched_pairs': matched_pairs,
+        'gt_remaining': len(ground_truth_entries),
+        'pred_remaining': len(predicted_entries),
+        'pair_count': len(matched_pairs),
+        'data_version': get_data_version(),
         'matched_gt_ids': matched_gt_ids,
         'matched_pred_ids': matched_pred_ids,
+        'runs': run_choices(run),
+        'active_run': run,
+        'active_session': session,
     }
     return render(request, 'evaluation_app/matching.html', context)
 
+def entry_card_records(entry_ids, run=None, session=None):
+    """Render the cards of entries that are back in the unmatched lists of ``run``
+    
+    Used after a pair goes away so the page can re-insert its entries
+    without reloading.
+    """
+    records = []
+    for entry_type, side in (('ground_truth', 'gt'), ('predicted', 'pred')):
+        entries = load_property_values(unmatched_entries(entry_type, run, session).filter(id__in=entry_ids))
+        for entry in entries:
+            records.append({
+                'id': entry.id,
+                'side': side,
+                'html': render_to_string('evaluation_app/entry_card.html', {'entry': entry, 'side': side}),
+            })
+    return records
+
+@require_http_methods(["GET"])
+@etag(version_etag)
+def data_version(request):
+    """Current data version; answers 304 when the client's ETag is still current"""
+    return JsonResponse({'version': get_data_version()})
+
+def candidate_record(score, entry):
+    return {
+        'id': entry.id,
+        'polymer_system': entry.polymer_system,
+        'force_field': entry.force_field,
+        'score': round(score, 4),
+    }
+
+def candidate_index(run, session=None):
+    """CandidateIndex over the unmatched predictions of ``run``, built once per data version"""
+    key = cache_key('candidates', session, run.id if run else 'none')
+    index = cache.get(key)
+    if index is None:
+        index = CandidateIndex(unmatched_entries('predicted', run, session).only('id', 'polymer_system', 'force_field'))
+        cache.set(key, index, CANDIDATE_INDEX_CACHE_TIMEOUT)
+    return index
+
+@require_http_methods(["GET"])
+def suggest_candidates(request):
+    """AJAX endpoint suggesting unmatched predicted entries for ground truth entries
+    
+    With ``ground_truth_id`` the top-k candidates of that entry are returned,
+    otherwise those of every unmatched ground truth entry.
+    """
+    try:
+        k = min(int(request.GET.get('k', DEFAULT_TOP_K)), MAX_TOP_K)
+        if k < 1:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'error': 'k must be a positive integer'}, status=400)
+    
+    gt_id = request.GET.get('ground_truth_id')
+    if gt_id and not gt_id.isdigit():
+        return JsonResponse({'error': 'ground_truth_id must be an integer'}, status=400)
+    
+    session = get_active_session(request)
+    run = get_active_run(request, session)
+    if gt_id:
+        ground_truth_entries = [get_object_or_404(DataEntry, id=gt_id, session=session, entry_type='ground_truth')]
+    else:
+        ground_truth_entries = unmatched_entries('ground_truth', run, session).only('id', 'polymer_system', 'force_field')
+    
+    suggestions = candidate_index(run, session).suggest(ground_truth_entries, k)
+    
+    return JsonResponse({
+        'success': True,
+        'candidates': {
+            str(entry_id): [candidate_record(score, entry) for score, entry in candidates]
+            for entry_id, candidates in suggestions.items()
+        },
+    })
+
+def bulk_create_pairs(entry_pairs):
+    """Insert (ground_truth, predicted) entry pairs and classify them in one transaction
+    
+    Each pair joins the session of its entries.
+    """
+    with transaction.atomic():
+        pairs = MatchedPair.objects.bulk_create(
+            [MatchedPair(session_id=gt.session_id, ground_truth=gt, predicted=pred) for gt, pred in entry_pairs],
+            batch_size=get_batch_size()
+        )
+        # The pairs are new, so none of them has classifications yet
+        classifications = create_automatic_classifications_for_pairs(pairs, existing=set())
+        bump_data_version()
+    return pairs, classifications
+
+@require_http_methods(["POST"])
+def auto_match(request):
+    """AJAX endpoint pairing all unmatched entries of the active run in one global assignment"""
+    try:
+        start = time.perf_counter()
+        session = get_active_session(request)
+        run = get_active_run(request, session)
+        matches = assign_entries(
+            list(unmatched_entries('ground_truth', run, session)),
+            list(unmatched_entries('predicted', run, session))
+        )
+        
+        pairs, classifications = bulk_create_pairs((gt, pred) for gt, pred, _ in matches)
+        
+        elapsed = time.perf_counter() - start
+        return JsonResponse({
+            'success': True,
+            'pairs_created': len(pairs),
+            'classifications_created': len(classifications),
+            'elapsed_seconds': round(elapsed, 3),
+            'solver': 'optimal' if optimal_assignment_available() else 'greedy',
+            'version': get_data_version(),
+            'message': f'Auto-matched {len(pairs)} pairs in {elapsed:.2f}s'
+        })
+        
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
 @require_http_methods(["POST"])
 def create_pair(request):
     """AJAX endpoint to create a matched pair"""
@@ -280,27 +370,116 @@ def create_pair(request):
         if not gt_id or not pred_id:
             return JsonResponse({'error': 'Missing ground truth or predicted ID'}, status=400)
         
-        ground_truth = get_object_or_404(DataEntry, id=gt_id, entry_type='ground_truth')
-        predicted = get_object_or_404(DataEntry, id=pred_id, entry_type='predicted')
+        session = get_active_session(request)
+        ground_truth = get_object_or_404(DataEntry, id=gt_id, session=session, entry_type='ground_truth')
+        predicted = get_object_or_404(DataEntry, id=pred_id, session=session, entry_type='predicted')
         
         # Check if pair already exists
         if MatchedPair.objects.filter(ground_truth=ground_truth, predicted=predicted).exists():
             return JsonResponse({'error': 'Pair already exists'}, status=400)
         
-        pair = MatchedPair.objects.create(ground_truth=ground_truth, predicted=predicted)
-        
-        # Automatically create classifications for this pair
-        create_automatic_classifications(pair)
+        with transaction.atomic():
+            pair = MatchedPair.objects.create(session=session, ground_truth=ground_truth, predicted=predicted)
+            
+            # Automatically create classifications for this pair
+            create_automatic_classifications(pair)
+            version = bump_data_version()
         
         return JsonResponse({
             'success': True,
             'pair_id': pair.id,
+            'pair_html': render_to_string('evaluation_app/pair_row.html', {'pair': pair}),
+            'removed_entry_ids': [ground_truth.id, predicted.id],
+            'version': version,
             'message': f'Created pair: {ground_truth.polymer_system} ↔ {predicted.polymer_system}'
         })
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+def validate_pair_items(items, session=None):
+    """Check requested pairs of entries in ``session`` with set-based queries
+    
+    Returns ``(results, valid)`` where ``results`` has one dict per item and
+    ``valid`` holds (index, ground_truth, predicted) for the items that can
+    be created.
+    """
+    results = []
+    requested = []
+    for index, item in enumerate(items):
+        try:
+            gt_id = int(item['ground_truth_id'])
+            pred_id = int(item['predicted_id'])
+        except (KeyError, TypeError, ValueError):
+            results.append({'index': index, 'success': False, 'error': 'Missing or invalid ground truth or predicted ID'})
+            continue
+        results.append({'index': index, 'success': True})
+        requested.append((index, gt_id, pred_id))
+    
+    gt_ids = {gt_id for _, gt_id, _ in requested}
+    pred_ids = {pred_id for _, _, pred_id in requested}
+    entries = DataEntry.objects.filter(session=session)
+    ground_truths = entries.filter(entry_type='ground_truth').in_bulk(gt_ids)
+    predictions = entries.filter(entry_type='predicted').in_bulk(pred_ids)
+    existing = set(MatchedPair.objects.filter(
+        ground_truth_id__in=gt_ids,
+        predicted_id__in=pred_ids
+    ).values_list('ground_truth_id', 'predicted_id'))
+    
+    valid = []
+    seen = set()
+    for index, gt_id, pred_id in requested:
+        if gt_id not in ground_truths:
+            error = f'Ground truth entry {gt_id} not found'
+        elif pred_id not in predictions:
+            error = f'Predicted entry {pred_id} not found'
+        elif (gt_id, pred_id) in existing:
+            error = 'Pair already exists'
+        elif (gt_id, pred_id) in seen:
+            error = 'Duplicate pair in request'
+        else:
+            seen.add((gt_id, pred_id))
+            valid.append((index, ground_truths[gt_id], predictions[pred_id]))
+            continue
+        results[index] = {'index': index, 'success': False, 'error': error}
+    
+    return results, valid
+
+@require_http_methods(["POST"])
+def create_pairs(request):
+    """AJAX endpoint to create many matched pairs in one request
+    
+    Expects ``{"pairs": [{"ground_truth_id": ..., "predicted_id": ...}, ...]}``
+    and reports the outcome of every item; invalid items do not stop the
+    valid ones from being created.
+    """
+    try:
+        data = json.loads(request.body)
+        items = data.get('pairs')
+        
+        if not isinstance(items, list) or not items:
+            return JsonResponse({'error': 'Missing pairs list'}, status=400)
+        if len(items) > MAX_PAIRS_PER_REQUEST:
+            return JsonResponse({'error': f'At most {MAX_PAIRS_PER_REQUEST} pairs per request'}, status=400)
+        
+        results, valid = validate_pair_items(items, get_active_session(request))
+        pairs, classifications = bulk_create_pairs((gt, pred) for _, gt, pred in valid)
+        for (index, _, _), pair in zip(valid, pairs):
+            results[index]['pair_id'] = pair.id
+        
+        return JsonResponse({
+            'success': True,
+            'created': len(pairs),
+            'failed': len(items) - len(pairs),
+            'classifications_created': len(classifications),
+            'results': results,
+            'version': get_data_version(),
+            'message': f'Created {len(pairs)} of {len(items)} pairs'
+        })
+        
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
 @require_http_methods(["POST"])
 def delete_pair(request):
     """AJAX endpoint to delete a matched pair"""
@@ -311,10 +490,21 @@ def delete_pair(request):
         if not pair_id:
             return JsonResponse({'error': 'Missing pair ID'}, status=400)
         
-        pair = get_object_or_404(MatchedPair, id=pair_id)
-        pair.delete()
+        session = get_active_session(request)
+        pair = get_object_or_404(MatchedPair.objects.select_related('predicted'), id=pair_id, session=session)
+        entry_ids = [pair.ground_truth_id, pair.predicted_id]
+        with transaction.atomic():
+            counters.record_deleted(pair.classifications.all())
+            pair.delete()
+            version = bump_data_version()
         
-        return JsonResponse({'success': True, 'message': 'Pair deleted successfully'})
+        return JsonResponse({
+            'success': True,
+            'removed_pair_ids': [int(pair_id)],
+            'restored_entries': entry_card_records(entry_ids, pair.predicted.run_id, session),
+            'version': version,
+            'message': 'Pair deleted successfully'
+        })
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -329,7 +519,8 @@ def delete_entry(request):
         if not entry_id:
             return JsonResponse({'error': 'Missing entry ID'}, status=400)
         
-        entry = get_object_or_404(DataEntry, id=entry_id)
+        session = get_active_session(request)
+        entry = get_object_or_404(DataEntry, id=entry_id, session=session)
         
         # Check if this entry is part of any matched pairs
         if entry.entry_type == 'ground_truth':
@@ -337,17 +528,35 @@ def delete_entry(request):
         else:
             related_pairs = MatchedPair.objects.filter(predicted=entry)
         
-        if related_pairs.exists():
+        # Partners of the deleted pairs go back to the unmatched lists
+        pair_ids = []
+        partner_ids = []
+        for pair_id, gt_id, pred_id in related_pairs.values_list('id', 'ground_truth_id', 'predicted_id'):
+            pair_ids.append(pair_id)
+            partner_ids.append(pred_id if entry.entry_type == 'ground_truth' else gt_id)
+        
+        with transaction.atomic():
             # Delete related classifications and pairs
-            for pair in related_pairs:
-                Classification.objects.filter(matched_pair=pair).delete()
+            related_classifications = Classification.objects.filter(matched_pair__in=related_pairs)
+            counters.record_deleted(related_classifications)
+            related_classifications.delete()
             related_pairs.delete()
-        
-        # Delete the entry
-        entry.delete()
+            
+            # Delete the entry
+            entry_id = entry.id
+            entry.delete()
+            version = bump_data_version()
         
         return JsonResponse({
             'success': True, 
+            'removed_entry_ids': [entry_id],
+            'removed_pair_ids': pair_ids,
+            'restored_entries': entry_card_records(
+                partner_ids,
+                entry.run_id if entry.entry_type == 'predicted' else get_active_run(request, session),
+                session
+            ),
+            'version': version,
             'message': f'Deleted {entry.entry_type} entry: {entry.polymer_system}'
         })
         
@@ -356,7 +565,10 @@ def delete_entry(request):
 
 @require_http_methods(["POST"])
 def mark_no_match(request):
-    """AJAX endpoint to mark an entry as 'no match'"""
+    """AJAX endpoint to mark an entry as 'no match'
+    
+    Ground truth entries are marked in the active run only.
+    """
     try:
         data = json.loads(request.body)
         entry_id = data.get('entry_id')
@@ -364,12 +576,25 @@ def mark_no_match(request):
         if not entry_id:
             return JsonResponse({'error': 'Missing entry ID'}, status=400)
         
-        entry = get_object_or_404(DataEntry, id=entry_id)
-        entry.marked_no_match = True
-        entry.save()
+        session = get_active_session(request)
+        entry = get_object_or_404(DataEntry, id=entry_id, session=session)
+        run = None
+        if entry.entry_type == 'ground_truth':
+            run = get_active_run(request, session)
+            if run is None:
+                return JsonResponse({'error': 'No prediction run to mark the entry in'}, status=400)
+        with transaction.atomic():
+            if run is None:
+                entry.marked_no_match = True
+                entry.save()
+            else:
+                entry.no_match_runs.add(run)
+            version = bump_data_version()
         
         return JsonResponse({
             'success': True,
+            'removed_entry_ids': [entry.id],
+            'version': version,
             'message': f'Marked {entry.entry_type} entry as "no match": {entry.polymer_system}'
         })
         
@@ -378,64 +603,177 @@ def mark_no_match(request):
 
 @require_http_methods(["POST"])
 def clear_all_data(request):
-    """AJAX endpoint to clear all data"""
+    """AJAX endpoint to clear all data of the active session
+    
+    Other sessions are kept unless the body is ``{"scope": "all"}``, which
+    empties every table, the sessions included.
+    """
     try:
-        with transaction.atomic():
-            # Delete all data in the correct order to avoid foreign key constraints
-            Classification.objects.all().delete()
-            MatchedPair.objects.all().delete()
-            DataEntry.objects.all().delete()
-            
+        data = json.loads(request.body) if request.body else {}
+        everything = data.get('scope') == 'all'
+        session = None if everything else get_active_session(request)
+        summary = teardown(session, everything=everything)
+        
+        scope = 'all sessions' if everything else (session or 'the default session')
         return JsonResponse({
             'success': True,
-            'message': 'All data cleared successfully'
+            'version': get_data_version(),
+            'removed': summary['rows'],
+            'elapsed_seconds': round(summary['elapsed'], 3),
+            'message': f'Cleared {scope}: removed {summary["total"]:,} rows in {summary["elapsed"]:.2f}s'
         })
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+def load_classifications(pairs):
+    """Return {pair_id: {property: classification}} for the given pairs
+    
+    Existing classifications are read with one query and any missing
+    automatic classifications are created in one batch.
+    """
+    classifications = {pair.id: dict.fromkeys(PROPERTIES) for pair in pairs}
+    for pair_id, prop, classification in Classification.objects.filter(
+        matched_pair_id__in=list(classifications)
+    ).values_list('matched_pair_id', 'property_name', 'classification'):
+        classifications[pair_id][prop] = classification
+    
+    # Numeric cells always get a label from the engine, so only a pair missing
+    # one has not been classified yet; missing text cells were left for review
+    pending = [
+        pair for pair in pairs
+        if any(classifications[pair.id][prop] is None for prop in property_names(NUMERIC))
+    ]
+    existing = {
+        (pair.id, prop)
+        for pair in pending
+        for prop, classification in classifications[pair.id].items()
+        if classification is not None
+    }
+    for created in create_automatic_classifications_for_pairs(pending, existing=existing):
+        classifications[created.matched_pair_id][created.property_name] = created.classification
+    
+    return classifications
+
+def parse_evaluation_filters(params):
+    """Validate the cursor, page size and filter query parameters"""
+    try:
+        after = int(params['after']) if params.get('after') else None
+        start = int(params.get('start') or 1)
+        limit = int(params.get('limit') or EVALUATION_PAGE_SIZE)
+    except ValueError:
+        raise ValueError('after, start and limit must be integers')
+    
+    property_name = params.get('property') or None
+    if property_name and property_name not in PROPERTIES:
+        raise ValueError(f'Unknown property: {property_name}')
+    
+    classification = params.get('classification') or None
+    if classification and classification not in dict(Classification.CLASSIFICATION_CHOICES):
+        raise ValueError(f'Invalid classification: {classification}')
+    
+    return {
+        'after': after,
+        'start': max(start, 1),
+        'limit': min(max(limit, 1), MAX_EVALUATION_PAGE_SIZE),
+        'property': property_name,
+        'classification': classification,
+        'unclassified': params.get('unclassified') in ('1', 'true', 'on'),
+    }
+
+def get_evaluation_page(filters, run=None, session=None):
+    """Fetch one cursor page of the matched pairs of ``run`` in ``session`` for the evaluation page
+    
+    Pairs are ordered newest first by id, so ``after`` is the id of the last
+    pair on the previous page and each request touches at most ``limit``
+    pairs no matter how many exist.
+    """
+    pairs = MatchedPair.objects.filter(session=session, predicted__run=run).select_related(
+        'ground_truth', 'predicted'
+    ).order_by('-id')
+    property_name = filters['property']
+    
+    if filters['unclassified']:
+        if property_name:
+            pairs = pairs.exclude(classifications__property_name=property_name)
+        else:
+            pairs = pairs.annotate(
+                classified_count=Count('classifications')
+            ).filter(classified_count__lt=len(PROPERTIES))
+    elif filters['classification']:
+        # A correlated EXISTS lets the database walk pairs newest first and
+        # stop after one page instead of collecting and sorting every match
+        matching = Classification.objects.filter(
+            matched_pair=OuterRef('pk'),
+            classification=filters['classification']
+        )
+        if property_name:
+            matching = matching.filter(property_name=property_name)
+        pairs = pairs.filter(Exists(matching))
+    
+    if filters['after'] is not None:
+        pairs = pairs.filter(id__lt=filters['after'])
+    
+    page = list(pairs[:filters['limit'] + 1])
+    has_more = len(page) > filters['limit']
+    page = page[:filters['limit']]
+    load_pair_values(page)
+    
+    return {
+        'matched_pairs': page,
+        'properties': [property_name] if property_name else PROPERTIES,
+        'classifications': load_classifications(page),
+        'start': filters['start'],
+        'next_cursor': page[-1].id if has_more else None,
+    }
+
 def evaluation(request):
     """Evaluation interface for classifying TP/FP/TN/FN with automatic comparison"""
-    matched_pairs = MatchedPair.objects.all().order_by('-created_at')
+    session = get_active_session(request)
+    run = get_active_run(request, session)
+    total_pairs = MatchedPair.objects.filter(session=session, predicted__run=run).count()
     
-    if not matched_pairs.exists():
+    if not total_pairs:
         messages.warning(request, 'No matched pairs found. Please create pairs first.')
         return redirect('matching')
     
-    # Automatically create classifications for any pairs that don't have them
-    for pair in matched_pairs:
-        create_automatic_classifications(pair)
-    
-    # Get properties list
-    properties = [
-        'polymer_system',
-        'force_field',
-        'Density (g/cm³)',
-        'Glass Transition Temperature (K)',
-        'Radius of Gyration (nm)',
-        'Young\'s Modulus (GPa)',
-        'Diffusion Coefficient (m²/s)',
-        'Viscosity (Pa s)'
-    ]
-    
-    # Get existing classifications
-    classifications = {}
-    for pair in matched_pairs:
-        classifications[pair.id] = {}
-        for prop in properties:
-            try:
-                classification = Classification.objects.get(matched_pair=pair, property_name=prop)
-                classifications[pair.id][prop] = classification.classification
-            except Classification.DoesNotExist:
-                classifications[pair.id][prop] = None
-    
-    context = {
-        'matched_pairs': matched_pairs,
-        'properties': properties,
-        'classifications': classifications,
-    }
+    try:
+        filters = parse_evaluation_filters(request.GET)
+    except ValueError as e:
+        messages.error(request, str(e))
+        filters = parse_evaluation_filters({})
+    
+    context = get_evaluation_page(filters, run, session)
+    context.update({
+        'runs': run_choices(run),
+        'active_run': run,
+        'active_session': session,
+        'total_pairs': total_pairs,
+        'all_properties': PROPERTIES,
+        'classification_choices': Classification.CLASSIFICATION_CHOICES,
+        'filters': filters,
+    })
     return render(request, 'evaluation_app/evaluation.html', context)
 
+@require_http_methods(["GET"])
+def evaluation_pairs(request):
+    """AJAX endpoint returning one rendered page of evaluation cards"""
+    try:
+        filters = parse_evaluation_filters(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    session = get_active_session(request)
+    page = get_evaluation_page(filters, get_active_run(request, session), session)
+    html = render_to_string('evaluation_app/pair_cards.html', page, request=request)
+    
+    return JsonResponse({
+        'success': True,
+        'html': html,
+        'count': len(page['matched_pairs']),
+        'next_cursor': page['next_cursor'],
+    })
+
 @require_http_methods(["POST"])
 def save_classification(request):
     """AJAX endpoint to save a classification"""
@@ -451,17 +789,40 @@ def save_classification(request):
         if classification not in ['TP', 'FP', 'TN', 'FN']:
             return JsonResponse({'error': 'Invalid classification'}, status=400)
         
-        pair = get_object_or_404(MatchedPair, id=pair_id)
-        
-        # Update or create classification
-        classification_obj, created = Classification.objects.update_or_create(
-            matched_pair=pair,
-            property_name=property_name,
-            defaults={'classification': classification}
+        pair = get_object_or_404(
+            MatchedPair.objects.select_related('ground_truth', 'predicted'),
+            id=pair_id,
+            session=get_active_session(request)
+        )
+        # Record the values the reviewer saw; human cells have no rule version
+        digest = input_hash(
+            pair.ground_truth.get_property_value(property_name),
+            pair.predicted.get_property_value(property_name)
         )
         
+        with transaction.atomic():
+            previous = Classification.objects.select_for_update().filter(
+                matched_pair=pair, property_name=property_name
+            ).values_list('classification', flat=True).first()
+            
+            # Update or create classification
+            classification_obj, created = Classification.objects.update_or_create(
+                matched_pair=pair,
+                property_name=property_name,
+                defaults={
+                    'session_id': pair.session_id,
+                    'classification': classification,
+                    'source': Classification.HUMAN,
+                    'rule_version': '',
+                    'input_hash': digest
+                }
+            )
+            counters.record_changed(property_name, previous, classification, pair.session_id)
+            version = bump_data_version()
+        
         return JsonResponse({
             'success': True,
+            'version': version,
             'message': f'Saved {classification} for {property_name}',
             'created': created
         })
@@ -469,95 +830,122 @@ def save_classification(request):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-def statistics(request):
-    """Statistics and metrics page"""
-    matched_pairs = MatchedPair.objects.all()
-    classifications = Classification.objects.all()
-    
-    # Calculate statistics
-    stats = {'TP': 0, 'FP': 0, 'TN': 0, 'FN': 0}
-    for classification in classifications:
-        stats[classification.classification] += 1
-    
+def run_classifications(session=None, run=None):
+    """Classifications of the pairs of ``run`` in ``session``"""
+    return Classification.objects.filter(session=session, matched_pair__predicted__run=run)
+
+def statistics_context(session=None, run=None):
+    """Counts and metric tables of one session for the statistics page
+    
+    The headline counts, metrics and force field table cover the active
+    ``run``; the run table compares every run of the session.
+    """
+    # The grouped tables aggregate over the session's (session, ...) index range
+    per_run, run_properties = run_matrices(Classification.objects.filter(session=session))
+    # The headline is the active run's row of the run comparison, so it costs no query
+    run_name = run.name if run else None
+    stats = per_run.get(run_name, dict.fromkeys(CLASSIFICATION_LABELS, 0))
+    per_property = dict(sorted(run_properties.get(run_name, {}).items()))
+    per_force_field, force_field_properties = force_field_matrices(run_classifications(session, run))
+    matched_pairs_count = MatchedPair.objects.filter(session=session, predicted__run=run).count()
     total = sum(stats.values())
-    precision = stats['TP'] / (stats['TP'] + stats['FP']) if (stats['TP'] + stats['FP']) > 0 else 0
-    recall = stats['TP'] / (stats['TP'] + stats['FN']) if (stats['TP'] + stats['FN']) > 0 else 0
-    f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
-    accuracy = (stats['TP'] + stats['TN']) / total if total > 0 else 0
     
-    context = {
+    return {
         'stats': stats,
         'total': total,
-        'precision': precision,
-        'recall': recall,
-        'f1_score': f1_score,
-        'accuracy': accuracy,
-        'matched_pairs_count': matched_pairs.count(),
+        'property_stats': metrics_table(per_property),
+        'property_labels': [get_property(prop).label for prop in PROPERTIES],
+        'force_field_stats': grouped_table(per_force_field, force_field_properties, PROPERTIES, 'force_field'),
+        'run_stats': grouped_table(per_run, run_properties, PROPERTIES, 'run'),
+        'matched_pairs_count': matched_pairs_count,
+        'active_session': session,
+        'active_run': run,
+        **calculate_metrics(stats['TP'], stats['FP'], stats['TN'], stats['FN']),
     }
+
+def statistics(request):
+    """Statistics and metrics page, cached per session, run and data version"""
+    session = get_active_session(request)
+    run = get_active_run(request, session)
+    key = cache_key('statistics', session, run and run.id)
+    context = cache.get(key)
+    if context is None:
+        context = statistics_context(session, run)
+        cache.set(key, context, STATISTICS_CACHE_TIMEOUT)
     return render(request, 'evaluation_app/statistics.html', context)
 
-def export_results(request):
-    """Export results as JSON"""
-    matched_pairs = MatchedPair.objects.all()
-    classifications = Classification.objects.all()
-    
-    results = {
-        'summary': {
-            'total_pairs': matched_pairs.count(),
-            'total_classifications': classifications.count(),
-            'statistics': {'TP': 0, 'FP': 0, 'TN': 0, 'FN': 0}
+def statistics_intervals_context(session=None, run=None):
+    """Bootstrap confidence intervals of one run's metrics, overall and per property"""
+    classifications = run_classifications(session, run)
+    matched_pairs_count = MatchedPair.objects.filter(session=session, predicted__run=run).count()
+    # Per property the label totals suffice; only the overall intervals read per-pair counts
+    _, per_property = confusion_matrices(classifications)
+    return {
+        'overall': bootstrap_intervals(pair_label_counts(classifications, matched_pairs_count)),
+        'properties': {
+            name: property_intervals(counts, matched_pairs_count) for name, counts in per_property.items()
         },
-        'detailed_results': []
     }
-    
-    # Calculate statistics
-    for classification in classifications:
-        results['summary']['statistics'][classification.classification] += 1
-    
-    # Detailed results
-    for pair in matched_pairs:
-        pair_data = {
-            'pair_id': pair.id,
-            'ground_truth': {
-                'polymer_system': pair.ground_truth.polymer_system,
-                'force_field': pair.ground_truth.force_field,
-                'properties': {
-                    'polymer_system': pair.ground_truth.polymer_system,
-                    'force_field': pair.ground_truth.force_field,
-                    'Density (g/cm³)': pair.ground_truth.density,
-                    'Glass Transition Temperature (K)': pair.ground_truth.glass_transition_temp,
-                    'Radius of Gyration (nm)': pair.ground_truth.radius_of_gyration,
-                    'Young\'s Modulus (GPa)': pair.ground_truth.youngs_modulus,
-                    'Diffusion Coefficient (m²/s)': pair.ground_truth.diffusion_coefficient,
-                    'Viscosity (Pa s)': pair.ground_truth.viscosity,
-                }
-            },
-            'prediction': {
-                'polymer_system': pair.predicted.polymer_system,
-                'force_field': pair.predicted.force_field,
-                'properties': {
-                    'polymer_system': pair.predicted.polymer_system,
-                    'force_field': pair.predicted.force_field,
-                    'Density (g/cm³)': pair.predicted.density,
-                    'Glass Transition Temperature (K)': pair.predicted.glass_transition_temp,
-                    'Radius of Gyration (nm)': pair.predicted.radius_of_gyration,
-                    'Young\'s Modulus (GPa)': pair.predicted.youngs_modulus,
-                    'Diffusion Coefficient (m²/s)': pair.predicted.diffusion_coefficient,
-                    'Viscosity (Pa s)': pair.predicted.viscosity,
-                }
-            },
-            'classifications': {}
+
+def statistics_intervals(request):
+    """AJAX endpoint with the statistics page's confidence intervals, fetched after the page
+
+    Cached per session, run and data version like the page itself.
+    """
+    session = get_active_session(request)
+    run = get_active_run(request, session)
+    key = cache_key('statistics_intervals', session, run and run.id)
+    intervals = cache.get(key)
+    if intervals is None:
+        intervals = statistics_intervals_context(session, run)
+        cache.set(key, intervals, STATISTICS_CACHE_TIMEOUT)
+    return JsonResponse(intervals)
+
+def run_summaries(session=None):
+    """Pair and classification counts of each run of a session, for the export summary"""
+    per_run, run_properties = run_matrices(Classification.objects.filter(session=session))
+    pair_counts = MatchedPair.objects.filter(session=session).order_by('predicted__run__name').values_list(
+        'predicted__run__name'
+    ).annotate(n=Count('id'))
+    return [
+        {
+            'run': name,
+            'total_pairs': pair_count,
+            'total_classifications': sum(per_run.get(name, {}).values()),
+            'statistics': per_run.get(name, dict.fromkeys(CLASSIFICATION_LABELS, 0)),
+            'property_statistics': dict(sorted(run_properties.get(name, {}).items())),
         }
-        
-        # Add classifications for this pair
-        for classification in pair.classifications.all():
-            pair_data['classifications'][classification.property_name] = classification.classification
-        
-        results['detailed_results'].append(pair_data)
+        for name, pair_count in pair_counts
+    ]
+
+def export_results(request):
+    """Export results as a streamed JSON, JSON Lines or CSV download"""
+    export_format = request.GET.get('format', 'json')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Unsupported export format: {export_format}'}, status=400)
+    
+    if export_format in COLUMNAR_FORMATS and not columnar_export_available():
+        return JsonResponse({'error': f'{export_format} export requires pyarrow to be installed'}, status=400)
+    
+    content_type, filename = EXPORT_FORMATS[export_format]
+    session = get_active_session(request)
+    pairs = iter_pairs(session=session)
+    
+    if export_format == 'json':
+        # Runs are reported apart so model versions are never pooled
+        runs = run_summaries(session)
+        summary = {
+            'total_pairs': sum(run['total_pairs'] for run in runs),
+            'runs': runs,
+        }
+        content = stream_json(summary, pairs)
+    elif export_format == 'jsonl':
+        content = stream_json_lines(pairs)
+    elif export_format == 'csv':
+        content = stream_csv(pairs)
+    else:
+        content = stream_columnar(pairs, export_format)
     
-    response = HttpResponse(
-        json.dumps(results, indent=2, default=str),
-        content_type='application/json'
-    )
-    response['Content-Disposition'] = 'attachment; filename="evaluation_results.json"'
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
@@ -121,3 +121,6 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Number of rows inserted per bulk_create batch when loading uploaded files
+EVALUATION_INGEST_BATCH_SIZE = 2000
@@ -7,6 +7,7 @@ from django.db.models import Count, Q
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'polymer_evaluation.settings')
 django.setup()
 
+from evaluation_app.metrics import bootstrap_intervals, pair_label_counts
 from evaluation_app.models import Classification, MatchedPair, DataEntry
 
 def calculate_metrics(tp, fp, tn, fn):
@@ -23,6 +24,13 @@ def calculate_metrics(tp, fp, tn, fn):
         'accuracy': round(accuracy, 4)
     }
 
+def print_intervals(intervals):
+    """Print 95% bootstrap confidence intervals of the metrics"""
+    print("95% CI (bootstrap over matched pairs):")
+    for metric, label in [('precision', 'Precision'), ('recall', 'Recall'), ('f1_score', 'F1 Score'), ('accuracy', 'Accuracy')]:
+        low, high = intervals[metric]
+        print(f"  {label + ':':<10} [{low:.4f}, {high:.4f}]")
+
 def analyze_property_metrics():
     """Comprehensive property-wise analysis"""
     print("=" * 80)
@@ -59,6 +67,9 @@ def analyze_property_metrics():
         total_count=Count('classification')
     ).order_by('property_name')
     
+    # Per-pair label counts for the bootstrap confidence intervals
+    pair_counts, property_pair_counts = pair_label_counts(pair_count=total_pairs)
+    
     # Calculate overall totals
     overall_tp = 0
     overall_fp = 0
@@ -92,6 +103,7 @@ def analyze_property_metrics():
         print(f"  Recall:    {metrics['recall']:.4f}")
         print(f"  F1 Score:  {metrics['f1_score']:.4f}")
         print(f"  Accuracy:  {metrics['accuracy']:.4f}")
+        print_intervals(bootstrap_intervals(property_pair_counts[property_name]))
         
         # Add some interpretation
         if metrics['f1_score'] >= 0.8:
@@ -120,6 +132,7 @@ def analyze_property_metrics():
     print(f"  Recall:    {overall_metrics['recall']:.4f}")
     print(f"  F1 Score:  {overall_metrics['f1_score']:.4f}")
     print(f"  Accuracy:  {overall_metrics['accuracy']:.4f}")
+    print_intervals(bootstrap_intervals(pair_counts))
     
     # Classification distribution
     print("\n" + "=" * 80)
@@ -64,19 +64,13 @@ def test_duplicate_entries():
         DataEntry.objects.all().delete()
         
         for item in test_data:
-            DataEntry.objects.update_or_create(
+            entry, _ = DataEntry.objects.update_or_create(
                 entry_type='ground_truth',
                 polymer_system=item['polymer_system'],
-                force_field=item['force_field'],
-                defaults={
-                    'density': item.get('Density (g/cm³)', 'NA'),
-                    'glass_transition_temp': item.get('Glass Transition Temperature (K)', 'NA'),
-                    'radius_of_gyration': item.get('Radius of Gyration (nm)', 'NA'),
-                    'youngs_modulus': item.get('Young\'s Modulus (GPa)', 'NA'),
-                    'diffusion_coefficient': item.get('Diffusion Coefficient (m²/s)', 'NA'),
-                    'viscosity': item.get('Viscosity (Pa s)', 'NA'),
-                }
+                force_field=item['force_field']
             )
+            entry.set_property_values(item)
+            entry.save()
     
     count_update_or_create = DataEntry.objects.filter(entry_type='ground_truth').count()
     print(f"Entries created with update_or_create: {count_update_or_create}")
@@ -84,7 +78,7 @@ def test_duplicate_entries():
     # Show what was actually created
     entries = DataEntry.objects.filter(entry_type='ground_truth')
     for entry in entries:
-        print(f"  - {entry.polymer_system} ({entry.force_field}): Density={entry.density}")
+        print(f"  - {entry.polymer_system} ({entry.force_field}): Density={entry.get_property_value('Density (g/cm³)')}")
     
     # Test with create (should create all entries)
     print("\n=== TESTING WITH create (SHOULD CREATE ALL) ===")
@@ -92,17 +86,13 @@ def test_duplicate_entries():
         DataEntry.objects.all().delete()
         
         for item in test_data:
-            DataEntry.objects.create(
+            entry = DataEntry(
                 entry_type='ground_truth',
                 polymer_system=item['polymer_system'],
-                force_field=item['force_field'],
-                density=item.get('Density (g/cm³)', 'NA'),
-                glass_transition_temp=item.get('Glass Transition Temperature (K)', 'NA'),
-                radius_of_gyration=item.get('Radius of Gyration (nm)', 'NA'),
-                youngs_modulus=item.get('Young\'s Modulus (GPa)', 'NA'),
-                diffusion_coefficient=item.get('Diffusion Coefficient (m²/s)', 'NA'),
-                viscosity=item.get('Viscosity (Pa s)', 'NA'),
+                force_field=item['force_field']
             )
+            entry.set_property_values(item)
+            entry.save()
     
     count_create = DataEntry.objects.filter(entry_type='ground_truth').count()
     print(f"Entries created with create: {count_create}")
@@ -110,7 +100,7 @@ def test_duplicate_entries():
     # Show what was actually created
     entries = DataEntry.objects.filter(entry_type='ground_truth')
     for entry in entries:
-        print(f"  - {entry.polymer_system} ({entry.force_field}): Density={entry.density}")
+        print(f"  - {entry.polymer_system} ({entry.force_field}): Density={entry.get_property_value('Density (g/cm³)')}")
     
     print(f"\n=== SUMMARY ===")
     print(f"Expected entries: {len(test_data)}")
@@ -25,33 +25,33 @@ def test_no_unique_constraint():
     print("\nTesting duplicate entry creation...")
     
     # Create first entry
-    entry1 = DataEntry.objects.create(
+    entry1 = DataEntry(
         entry_type='ground_truth',
         polymer_system='Kapton',
-        force_field='OPLS-AA',
-        density='1.2',
-        glass_transition_temp='600'
+        force_field='OPLS-AA'
     )
+    entry1.set_property_values({'Density (g/cm³)': '1.2', 'Glass Transition Temperature (K)': '600'})
+    entry1.save()
     print(f"Created entry 1: {entry1}")
     
     # Create duplicate entry (should work now)
-    entry2 = DataEntry.objects.create(
+    entry2 = DataEntry(
         entry_type='ground_truth',
         polymer_system='Kapton',
-        force_field='OPLS-AA',
-        density='1.3',
-        glass_transition_temp='650'
+        force_field='OPLS-AA'
     )
+    entry2.set_property_values({'Density (g/cm³)': '1.3', 'Glass Transition Temperature (K)': '650'})
+    entry2.save()
     print(f"Created entry 2: {entry2}")
     
     # Create another duplicate
-    entry3 = DataEntry.objects.create(
+    entry3 = DataEntry(
         entry_type='ground_truth',
         polymer_system='Kapton',
-        force_field='OPLS-AA',
-        density='1.4',
-        glass_transition_temp='700'
+        force_field='OPLS-AA'
     )
+    entry3.set_property_values({'Density (g/cm³)': '1.4', 'Glass Transition Temperature (K)': '700'})
+    entry3.save()
     print(f"Created entry 3: {entry3}")
     
     # Check total count
@@ -90,31 +90,23 @@ def test_no_unique_constraint():
         
         # Create ground truth entries
         for item in gt_data:
-            DataEntry.objects.create(
+            entry = DataEntry(
                 entry_type='ground_truth',
                 polymer_system=item['polymer_system'],
-                force_field=item['force_field'],
-                density=item.get('Density (g/cm³)', 'NA'),
-                glass_transition_temp=item.get('Glass Transition Temperature (K)', 'NA'),
-                radius_of_gyration=item.get('Radius of Gyration (nm)', 'NA'),
-                youngs_modulus=item.get('Young\'s Modulus (GPa)', 'NA'),
-                diffusion_coefficient=item.get('Diffusion Coefficient (m²/s)', 'NA'),
-                viscosity=item.get('Viscosity (Pa s)', 'NA'),
+                force_field=item['force_field']
             )
+            entry.set_property_values(item)
+            entry.save()
         
         # Create predicted entries
         for item in pred_data:
-            DataEntry.objects.create(
+            entry = DataEntry(
                 entry_type='predicted',
                 polymer_system=item['polymer_system'],
-                force_field=item['force_field'],
-                density=item.get('Density (g/cm³)', 'NA'),
-                glass_transition_temp=item.get('Glass Transition Temperature (K)', 'NA'),
-                radius_of_gyration=item.get('Radius of Gyration (nm)', 'NA'),
-                youngs_modulus=item.get('Young\'s Modulus (GPa)', 'NA'),
-                diffusion_coefficient=item.get('Diffusion Coefficient (m²/s)', 'NA'),
-                viscosity=item.get('Viscosity (Pa s)', 'NA'),
+                force_field=item['force_field']
             )
+            entry.set_property_values(item)
+            entry.save()
     
     # Check results
     total_gt = DataEntry.objects.filter(entry_type='ground_truth').count()
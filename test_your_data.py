@@ -113,17 +113,13 @@ def test_your_data():
         DataEntry.objects.all().delete()
         
         for item in your_data:
-            DataEntry.objects.create(
+            entry = DataEntry(
                 entry_type='ground_truth',
                 polymer_system=item['polymer_system'],
-                force_field=item['force_field'],
-                density=item.get('Density (g/cm³)', 'NA'),
-                glass_transition_temp=item.get('Glass Transition Temperature (K)', 'NA'),
-                radius_of_gyration=item.get('Radius of Gyration (nm)', 'NA'),
-                youngs_modulus=item.get('Young\'s Modulus (GPa)', 'NA'),
-                diffusion_coefficient=item.get('Diffusion Coefficient (m²/s)', 'NA'),
-                viscosity=item.get('Viscosity (Pa s)', 'NA'),
+                force_field=item['force_field']
             )
+            entry.set_property_values(item)
+            entry.save()
     
     count_created = DataEntry.objects.filter(entry_type='ground_truth').count()
     print(f"Entries created: {count_created}")
@@ -133,7 +129,7 @@ def test_your_data():
     entries = DataEntry.objects.filter(entry_type='ground_truth').order_by('polymer_system', 'force_field')
     for i, entry in enumerate(entries, 1):
         print(f"{i}. {entry.polymer_system} ({entry.force_field})")
-        print(f"   Density: {entry.density}, Glass Transition: {entry.glass_transition_temp}, Radius: {entry.radius_of_gyration}")
+        print(f"   Density: {entry.get_property_value('Density (g/cm³)')}, Glass Transition: {entry.get_property_value('Glass Transition Temperature (K)')}, Radius: {entry.get_property_value('Radius of Gyration (nm)')}")
     
     print(f"\n=== SUMMARY ===")
     print(f"Expected entries: {len(your_data)}")